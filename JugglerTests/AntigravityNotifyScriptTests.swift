@@ -8,20 +8,42 @@ import Testing
 /// untestable from Swift except by executing the script.
 @Suite("antigravity-notify.sh — hook contract")
 struct AntigravityNotifyScriptTests {
-    private static var scriptPath: String {
+    private static var resourcesDirectory: URL {
         URL(fileURLWithPath: #filePath)
             .deletingLastPathComponent() // JugglerTests/
             .deletingLastPathComponent() // repo root
-            .appendingPathComponent("juggler/Resources/antigravity-hooks/antigravity-notify.sh")
-            .path
+            .appendingPathComponent("juggler/Resources")
+    }
+
+    /// Copies the script and the hook_payload.py module it imports into `dir`, the way
+    /// AntigravityHooksInstaller lays them out, and returns the script's path.
+    private func installScript(in dir: URL) throws -> String {
+        let script = Self.resourcesDirectory.appendingPathComponent("antigravity-hooks/antigravity-notify.sh")
+        try #require(FileManager.default.fileExists(atPath: script.path), "notify script missing at \(script.path)")
+        let installed = dir.appendingPathComponent("notify.sh")
+        try FileManager.default.copyItem(at: script, to: installed)
+        try FileManager.default.copyItem(
+            at: Self.resourcesDirectory.appendingPathComponent("hook_payload.py"),
+            to: dir.appendingPathComponent("hook_payload.py")
+        )
+        return installed.path
     }
 
     /// Runs the script with `event` and `stdinJSON`. `port` defaults to a dead port so the
     /// POST fails fast and the stdout response is exercised in isolation. Terminal/tmux env
-    /// is stripped so payloads are deterministic regardless of where the test runs.
-    private func runNotify(event: String, stdinJSON: String, port: String = "1") throws -> String {
-        let script = Self.scriptPath
-        try #require(FileManager.default.fileExists(atPath: script), "notify script missing at \(script)")
+    /// is stripped so payloads are deterministic regardless of where the test runs, and
+    /// coalescing is off (heartbeat 0) unless `extraEnv` turns it back on.
+    private func runNotify(
+        event: String,
+        stdinJSON: String,
+        port: String = "1",
+        extraEnv: [String: String] = [:]
+    ) throws -> String {
+        let hooksDir = FileManager.default.temporaryDirectory
+            .appendingPathComponent("ag-hooks-\(UUID().uuidString)")
+        try FileManager.default.createDirectory(at: hooksDir, withIntermediateDirectories: true)
+        defer { try? FileManager.default.removeItem(at: hooksDir) }
+        let script = try installScript(in: hooksDir)
 
         // Feed stdin from a temp file, not a Pipe: writing to a pipe whose reader (the
         // script) has already exited raises SIGPIPE and would crash the test runner.
@@ -37,10 +59,12 @@ struct AntigravityNotifyScriptTests {
         proc.arguments = [script, event]
         var env = ProcessInfo.processInfo.environment
         env["JUGGLER_PORT"] = port
+        env["JUGGLER_HOOK_HEARTBEAT_SECONDS"] = "0"
         for key in ["ITERM_SESSION_ID", "KITTY_WINDOW_ID", "KITTY_LISTEN_ON", "KITTY_PID",
                     "WEZTERM_PANE", "TMUX", "TMUX_PANE", "SSH_CONNECTION"] {
             env.removeValue(forKey: key)
         }
+        env.merge(extraEnv) { _, new in new }
         proc.environment = env
 
         let stdout = Pipe(), stderr = Pipe()
@@ -110,9 +134,9 @@ struct AntigravityNotifyScriptTests {
     conn.close()
     """
 
-    /// Runs the notify script against a real one-shot capture server and returns the decoded
-    /// JSON body it POSTed.
-    private func capturePayload(event: String, stdinJSON: String) throws -> [String: Any] {
+    /// Runs the notify script against a real one-shot capture server and returns the body it
+    /// POSTed, or nil when it posted nothing.
+    private func captureBody(event: String, stdinJSON: String, extraEnv: [String: String] = [:]) throws -> Data? {
         let dir = FileManager.default.temporaryDirectory
             .appendingPathComponent("ag-notify-\(UUID().uuidString)")
         try FileManager.default.createDirectory(at: dir, withIntermediateDirectories: true)
@@ -129,14 +153,20 @@ struct AntigravityNotifyScriptTests {
         defer { if server.isRunning { server.terminate() } }
 
         let port = try waitForPort(file: portFile)
-        _ = try runNotify(event: event, stdinJSON: stdinJSON, port: port)
+        _ = try runNotify(event: event, stdinJSON: stdinJSON, port: port, extraEnv: extraEnv)
+        // curl has had its reply by the time the script exits, so the server has written the body
+        guard FileManager.default.fileExists(atPath: bodyFile) else { return nil }
         server.waitUntilExit()
+        return try Data(contentsOf: URL(fileURLWithPath: bodyFile))
+    }
 
-        try #require(
-            FileManager.default.fileExists(atPath: bodyFile),
+    /// Runs the notify script against a real one-shot capture server and returns the decoded
+    /// JSON body it POSTed.
+    private func capturePayload(event: String, stdinJSON: String) throws -> [String: Any] {
+        let data = try #require(
+            try captureBody(event: event, stdinJSON: stdinJSON),
             "capture server wrote no body (curl never connected)"
         )
-        let data = try Data(contentsOf: URL(fileURLWithPath: bodyFile))
         return try #require(
             JSONSerialization.jsonObject(with: data) as? [String: Any],
             "captured body was not a JSON object"
@@ -177,4 +207,22 @@ struct AntigravityNotifyScriptTests {
         #expect(hookInput["session_id"] as? String == "abc-123")
         #expect(hookInput["transcript_path"] as? String == "/t/x.jsonl")
     }
+
+    // MARK: - coalescing
+
+    @Test func repeatedPreInvocation_isCoalesced() throws {
+        let stdinJSON = #"{"conversationId":"coalesce-\#(UUID().uuidString)"}"#
+        let heartbeat = ["JUGGLER_HOOK_HEARTBEAT_SECONDS": "60"]
+        _ = try runNotify(event: "PreInvocation", stdinJSON: stdinJSON, extraEnv: heartbeat)
+        #expect(try captureBody(event: "PreInvocation", stdinJSON: stdinJSON, extraEnv: heartbeat) == nil)
+    }
+
+    @Test func stopAfterPreInvocation_isAlwaysPosted() throws {
+        let stdinJSON = #"{"conversationId":"coalesce-\#(UUID().uuidString)"}"#
+        let heartbeat = ["JUGGLER_HOOK_HEARTBEAT_SECONDS": "60"]
+        _ = try runNotify(event: "PreInvocation", stdinJSON: stdinJSON, extraEnv: heartbeat)
+        let data = try #require(try captureBody(event: "Stop", stdinJSON: stdinJSON, extraEnv: heartbeat))
+        let payload = try #require(try JSONSerialization.jsonObject(with: data) as? [String: Any])
+        #expect(payload["event"] as? String == "Stop")
+    }
 }
@@ -21,6 +21,9 @@ struct BundleResourcesTests {
         ("iterm2_daemon", "py"), // iTerm2Bridge
         // Sibling resources copied by the install scripts above:
         ("notify", "sh"), // install.sh copies it to ~/.claude/hooks/juggler/
+        ("hook_relay", "py"), // install scripts and hook installers copy it next to notify.sh
+        ("hook_relay", "sh"), // sourced by notify.sh to reach the relay; copied next to it
+        ("hook_payload", "py"), // notify.sh imports it; install scripts and hook installers copy it
         ("juggler_watcher", "py") // install_kitty_watcher.sh copies it to kitty config
     ])
     func resourceIsBundled(resource: String, ext: String) {
@@ -35,7 +38,7 @@ struct BundleResourcesTests {
         ("notify", "sh", "--max-time 2 \\"),
         ("codex-notify", "sh", "--max-time 2 \\"),
         ("antigravity-notify", "sh", "--max-time 2 \\"),
-        ("juggler_watcher", "py", "\"--max-time\", \"2\","),
+        ("juggler_watcher", "py", "REQUEST_TIMEOUT_SECONDS = 2"),
         ("juggler-opencode", "txt", "signal: AbortSignal.timeout(2000),"),
         ("juggler-pi", "txt", "signal: AbortSignal.timeout(2000),")
     ])
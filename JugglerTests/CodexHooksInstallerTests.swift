@@ -870,6 +870,68 @@ struct CodexInstallHooksTests {
             #expect(readFile(notifyPath) == "FRESH")
         }
     }
+
+    @Test func installHooks_placesRelayNextToScript() throws {
+        try withTempDir { dir in
+            let bundledScript = dir.appendingPathComponent("codex-notify.sh")
+            try "#!/bin/bash\necho hi\n".write(to: bundledScript, atomically: true, encoding: .utf8)
+            let bundledRelay = dir.appendingPathComponent("hook_relay.py")
+            try "RELAY".write(to: bundledRelay, atomically: true, encoding: .utf8)
+            let bundledRelayClient = dir.appendingPathComponent("hook_relay.sh")
+            try "CLIENT".write(to: bundledRelayClient, atomically: true, encoding: .utf8)
+            let hooksDir = dir.appendingPathComponent("hooks/juggler").path
+
+            let error = CodexHooksInstaller.installHooks(
+                bundledScriptURL: bundledScript,
+                bundledRelayURL: bundledRelay,
+                bundledRelayClientURL: bundledRelayClient,
+                hooksDirectory: hooksDir,
+                notifyScriptPath: hooksDir + "/notify.sh",
+                hooksJSONPath: dir.appendingPathComponent("hooks.json").path
+            )
+            #expect(error == nil)
+            #expect(readFile(hooksDir + "/hook_relay.py") == "RELAY")
+            #expect(readFile(hooksDir + "/hook_relay.sh") == "CLIENT")
+        }
+    }
+
+    @Test func installHooks_placesPayloadModuleNextToScript() throws {
+        try withTempDir { dir in
+            let bundledScript = dir.appendingPathComponent("codex-notify.sh")
+            try "#!/bin/bash\necho hi\n".write(to: bundledScript, atomically: true, encoding: .utf8)
+            let bundledModule = dir.appendingPathComponent("hook_payload.py")
+            try "PAYLOAD".write(to: bundledModule, atomically: true, encoding: .utf8)
+            let hooksDir = dir.appendingPathComponent("hooks/juggler").path
+
+            let error = CodexHooksInstaller.installHooks(
+                bundledScriptURL: bundledScript,
+                bundledPayloadModuleURL: bundledModule,
+                hooksDirectory: hooksDir,
+                notifyScriptPath: hooksDir + "/notify.sh",
+                hooksJSONPath: dir.appendingPathComponent("hooks.json").path
+            )
+            #expect(error == nil)
+            #expect(readFile(hooksDir + "/hook_payload.py") == "PAYLOAD")
+        }
+    }
+
+    @Test func installHooks_missingPayloadModule_returnsError() throws {
+        try withTempDir { dir in
+            let bundledScript = dir.appendingPathComponent("codex-notify.sh")
+            try "#!/bin/bash\necho hi\n".write(to: bundledScript, atomically: true, encoding: .utf8)
+            let hooksDir = dir.appendingPathComponent("hooks/juggler").path
+
+            let error = CodexHooksInstaller.installHooks(
+                bundledScriptURL: bundledScript,
+                bundledPayloadModuleURL: nil,
+                hooksDirectory: hooksDir,
+                notifyScriptPath: hooksDir + "/notify.sh",
+                hooksJSONPath: dir.appendingPathComponent("hooks.json").path
+            )
+            #expect(error != nil)
+            #expect(!FileManager.default.fileExists(atPath: hooksDir + "/notify.sh"))
+        }
+    }
 }
 
 // MARK: - SessionEnd timeout clamp
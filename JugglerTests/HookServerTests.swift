@@ -110,6 +110,22 @@ struct HookServerTests {
         #expect(request == nil)
     }
 
+    @Test func parse_keepAliveHeader_setsKeepAlive() {
+        let raw = "POST /kitty-event HTTP/1.1\r\nConnection: Keep-Alive\r\nContent-Length: 2\r\n\r\n{}"
+        let request = HTTPRequest.parse(Data(raw.utf8))
+
+        #expect(request?.keepAlive == true)
+        #expect(request?.body == "{}")
+    }
+
+    @Test func parse_noConnectionHeader_closes() {
+        let raw = "POST /hook HTTP/1.1\r\nHost: localhost\r\n\r\n{\"connection\": \"keep-alive\"}"
+        let request = HTTPRequest.parse(Data(raw.utf8))
+
+        // HTTP/1.1 would default to keep-alive; only an explicit header opts in, never the body
+        #expect(request?.keepAlive == false)
+    }
+
     // MARK: - HTTPResponse.serialize Tests
 
     @Test func serialize_200OK() {
@@ -138,6 +154,19 @@ struct HookServerTests {
         #expect(string.contains("HTTP/1.1 405 Method Not Allowed"))
     }
 
+    @Test func serialize_defaultsToConnectionClose() {
+        let string = String(decoding: HTTPResponse(status: 200, body: "{}").serialize(), as: UTF8.self)
+
+        #expect(string.contains("Connection: close\r\n"))
+    }
+
+    @Test func serialize_keepAlive() {
+        let string = String(decoding: HTTPResponse(status: 200, body: "{}").serialize(keepAlive: true), as: UTF8.self)
+
+        #expect(string.contains("Connection: keep-alive\r\n"))
+        #expect(!string.contains("Connection: close"))
+    }
+
     @Test func serialize_bodyContentLengthMatchesUTF8() {
         let body = "{\"message\":\"hello world\"}"
         let response = HTTPResponse(status: 200, body: body)
@@ -370,6 +399,29 @@ struct HookServerTests {
         #expect(payload.windowID == "99")
     }
 
+    @Test func decodeKittyEventPayload_terminalInfo() throws {
+        let json = """
+        {
+            "event": "terminal_info",
+            "windows": [
+                {"window_id": "7", "tab_name": "zsh", "window_name": "Window 3", "tab_index": 1,
+                 "pane_index": 0, "pane_count": 2},
+                {"window_id": "8", "pane_count": 2}
+            ]
+        }
+        """
+
+        let payload = try JSONDecoder().decode(KittyEventPayload.self, from: Data(json.utf8))
+
+        #expect(payload.event == "terminal_info")
+        #expect(payload.windowID.isEmpty)
+        #expect(payload.windows.map(\.windowID) == ["7", "8"])
+        #expect(payload.windows[0].tabName == "zsh")
+        #expect(payload.windows[0].tabIndex == 1)
+        #expect(payload.windows[1].tabName == nil)
+        #expect(payload.windows[1].paneCount == 2)
+    }
+
     // MARK: - HookEventMapper Agent-Aware Tests
 
     @Test func mapOpenCode_sessionCreated_mapsToIdle() {
@@ -852,6 +904,23 @@ struct HookServerTests {
         #expect(manager.sessions.map(\.terminalSessionID) == ["99"])
     }
 
+    @Test @MainActor func processRequest_postKittyEvent_terminalInfo_updatesTerminalInfo() async {
+        let manager = SessionManager()
+        manager.testSetSessions([makeSession("kitty-info-42")])
+        let server = HookServer(sessionManager: manager)
+        let body = #"{"event":"terminal_info","windows":[{"window_id":"kitty-info-42","tab_name":"build","#
+            + #""window_name":"Window 5","tab_index":0,"pane_index":1,"pane_count":3}]}"#
+
+        let response = await server.processRequest(HTTPRequest(method: "POST", path: "/kitty-event", body: body))
+
+        #expect(response.status == 200)
+        #expect(manager.sessions.first?.terminalTabName == "build")
+        #expect(manager.sessions.first?.terminalWindowName == "Window 5")
+        #expect(manager.sessions.first?.paneIndex == 1)
+        #expect(manager.sessions.first?.paneCount == 3)
+        await KittyBridge.shared.forgetPushedInfo(windowID: "kitty-info-42")
+    }
+
     @Test @MainActor func processRequest_postKittyEvent_unknownEvent_isNoOp() async {
         let manager = SessionManager()
         manager.testSetSessions([makeSession("42")])
@@ -80,6 +80,54 @@ struct ITerm2BridgeTests {
         let event = try JSONDecoder().decode(DaemonEvent.self, from: Data(json.utf8))
         #expect(event.event == "session_terminated")
         #expect(event.sessionID == nil)
+        #expect(event.seq == nil)
+    }
+
+    @Test func daemonEvent_decodesSeqAndResyncReason() throws {
+        let focus = try JSONDecoder().decode(
+            DaemonEvent.self, from: Data(#"{"event":"focus_changed","session_id":"s1","seq":42}"#.utf8)
+        )
+        #expect(focus.seq == 42)
+        let resync = try JSONDecoder().decode(
+            DaemonEvent.self, from: Data(#"{"event":"resync_required","reason":"overflow"}"#.utf8)
+        )
+        #expect(resync.reason == "overflow")
+        #expect(resync.seq == nil)
+    }
+
+    // MARK: - EventResumeCursor Tests
+
+    @Test func eventResumeCursor_firstSubscribeHasNoCursor() {
+        #expect(EventResumeCursor().subscribeRequest() == "{\"command\": \"subscribe\"}\n")
+    }
+
+    @Test func eventResumeCursor_resumesFromLastSeenSeq() throws {
+        let cursor = EventResumeCursor()
+        cursor.acknowledge(epoch: "e1", seq: 10)
+        cursor.advance(to: 12)
+        cursor.advance(to: 11)
+        let request = try JSONSerialization.jsonObject(with: Data(cursor.subscribeRequest().utf8)) as? [String: Any]
+        #expect(request?["since_seq"] as? Int == 12)
+        #expect(request?["epoch"] as? String == "e1")
+    }
+
+    @Test func eventResumeCursor_sameEpochAckKeepsPosition() throws {
+        let cursor = EventResumeCursor()
+        cursor.acknowledge(epoch: "e1", seq: 0)
+        cursor.advance(to: 5)
+        cursor.acknowledge(epoch: "e1", seq: 9)
+        let request = try JSONSerialization.jsonObject(with: Data(cursor.subscribeRequest().utf8)) as? [String: Any]
+        #expect(request?["since_seq"] as? Int == 5)
+    }
+
+    @Test func eventResumeCursor_newEpochRestartsNumbering() throws {
+        let cursor = EventResumeCursor()
+        cursor.acknowledge(epoch: "e1", seq: 0)
+        cursor.advance(to: 500)
+        cursor.acknowledge(epoch: "e2", seq: 3)
+        let request = try JSONSerialization.jsonObject(with: Data(cursor.subscribeRequest().utf8)) as? [String: Any]
+        #expect(request?["since_seq"] as? Int == 3)
+        #expect(request?["epoch"] as? String == "e2")
     }
 
     // MARK: - shouldAttemptRecovery Tests
@@ -198,6 +198,71 @@ struct IntegrationConfigSafetyTests {
         #expect(try String(contentsOf: managedConfig, encoding: .utf8).isEmpty)
     }
 
+    @Test func codexCleanupCleansEveryConfigInOneInvocation() throws {
+        let home = try temporaryDirectory()
+        defer { try? FileManager.default.removeItem(at: home) }
+        var arguments = [Self.resourcesDirectory.appendingPathComponent("codex_config_cleanup.py").path]
+        var configs: [URL] = []
+        for name in [".codex", ".codex-work"] {
+            let codex = home.appendingPathComponent(name)
+            try FileManager.default.createDirectory(at: codex, withIntermediateDirectories: true)
+            let config = codex.appendingPathComponent("config.toml")
+            let hooksJSON = codex.appendingPathComponent("hooks.json")
+            let notify = codex.appendingPathComponent("hooks/juggler/notify.sh").path
+            let hash = CodexHooksInstaller.computeTrustedHash(event: "Stop", command: "\(notify) Stop")
+            let contents = """
+            [features]
+            hooks = true
+
+            [hooks.state."\(hooksJSON.path):stop:0:0"]
+            trusted_hash = "\(hash)"
+            """
+            try Data(contents.utf8).write(to: config)
+            arguments += [config.path, hooksJSON.path, notify]
+            configs.append(config)
+        }
+
+        let result = try run(executable: "/usr/bin/env", arguments: ["python3"] + arguments, home: home)
+
+        try #require(result.status == 0, Comment(rawValue: result.output))
+        for config in configs {
+            let updated = try String(contentsOf: config, encoding: .utf8)
+            #expect(updated.contains("hooks = true"))
+            #expect(!updated.contains("hooks.state"))
+        }
+    }
+
+    @Test func codexCleanupDryRunReportsWithoutWriting() throws {
+        let home = try temporaryDirectory()
+        defer { try? FileManager.default.removeItem(at: home) }
+        let codex = home.appendingPathComponent(".codex")
+        try FileManager.default.createDirectory(at: codex, withIntermediateDirectories: true)
+        let config = codex.appendingPathComponent("config.toml")
+        let hooksJSON = codex.appendingPathComponent("hooks.json")
+        let notify = codex.appendingPathComponent("hooks/juggler/notify.sh").path
+        let key = "\(hooksJSON.path):stop:0:0"
+        let hash = CodexHooksInstaller.computeTrustedHash(event: "Stop", command: "\(notify) Stop")
+        let contents = "[hooks.state.\"\(key)\"]\ntrusted_hash = \"\(hash)\"\n"
+        try Data(contents.utf8).write(to: config)
+
+        let result = try run(
+            executable: "/usr/bin/env",
+            arguments: [
+                "python3",
+                Self.resourcesDirectory.appendingPathComponent("codex_config_cleanup.py").path,
+                "--dry-run",
+                config.path,
+                hooksJSON.path,
+                notify
+            ],
+            home: home
+        )
+
+        try #require(result.status == 0, Comment(rawValue: result.output))
+        #expect(result.output.contains(key))
+        #expect(try String(contentsOf: config, encoding: .utf8) == contents)
+    }
+
     private func temporaryDirectory() throws -> URL {
         let directory = FileManager.default.temporaryDirectory
             .appendingPathComponent("juggler-config-safety-\(UUID().uuidString)")
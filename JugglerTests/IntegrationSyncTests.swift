@@ -36,6 +36,24 @@ struct IntegrationSyncTests {
         #expect(IntegrationSync.isStale(installedPath: missing, bundledResource: "notify", ext: "sh") == false)
     }
 
+    // MARK: - payloadModuleIsStale
+
+    @Test func payloadModuleIsStale_notifyNotInstalled_false() {
+        let missing = FileManager.default.temporaryDirectory
+            .appendingPathComponent("juggler-nonexistent-\(UUID().uuidString)/notify.sh").path
+        #expect(IntegrationSync.payloadModuleIsStale(notifyScriptPath: missing) == false)
+    }
+
+    @Test func payloadModuleIsStale_moduleMissingNextToNotify_true() throws {
+        // An install from before the module existed: notify.sh alone, which the new one can't run without.
+        let dir = FileManager.default.temporaryDirectory.appendingPathComponent("juggler-sync-\(UUID().uuidString)")
+        try FileManager.default.createDirectory(at: dir, withIntermediateDirectories: true)
+        defer { try? FileManager.default.removeItem(at: dir) }
+        let notify = dir.appendingPathComponent("notify.sh")
+        try "#!/bin/bash\n".write(to: notify, atomically: true, encoding: .utf8)
+        #expect(IntegrationSync.payloadModuleIsStale(notifyScriptPath: notify.path) == true)
+    }
+
     // MARK: - codexNeedsReinstall
 
     // Without the scriptInstalled guard, a user who has their own ~/.codex/hooks.json but never
@@ -235,6 +235,45 @@ struct KittyBridgeTests {
         )
     }
 
+    @Test func applyPushedInfo_mergesDeltas_andAnswersGetSessionInfo() async throws {
+        let bridge = KittyBridge.shared
+        let first = KittyWindowInfo(
+            windowID: "pushed-1", tabName: "zsh", windowName: "Window 9", tabIndex: 2, paneIndex: 0, paneCount: 1
+        )
+        let second = KittyWindowInfo(
+            windowID: "pushed-1", tabName: "vim", windowName: nil, tabIndex: nil, paneIndex: nil, paneCount: 2
+        )
+        _ = await bridge.applyPushedInfo([first])
+        let updated = await bridge.applyPushedInfo([second])
+
+        #expect(updated.first?.tabName == "vim")
+        #expect(updated.first?.windowName == "Window 9")
+        #expect(updated.first?.tabIndex == 2)
+        #expect(updated.first?.paneCount == 2)
+
+        // No socket is registered: the answer comes from the pushed cache, not `kitten @ ls`
+        let info = try await bridge.getSessionInfo(sessionID: "pushed-1")
+        #expect(info?.tabName == "vim")
+
+        await bridge.forgetPushedInfo(windowID: "pushed-1")
+        let forgotten = try await bridge.getSessionInfo(sessionID: "pushed-1")
+        #expect(forgotten == nil)
+    }
+
+    @Test func applyPushedInfo_partialFirstDelta_usesFallbacks() async {
+        let bridge = KittyBridge.shared
+        let delta = KittyWindowInfo(
+            windowID: "pushed-2", tabName: nil, windowName: nil, tabIndex: 1, paneIndex: nil, paneCount: nil
+        )
+
+        let info = await bridge.applyPushedInfo([delta]).first
+
+        #expect(info?.tabName == "Tab 2")
+        #expect(info?.windowName == "Kitty")
+        #expect(info?.paneCount == 1)
+        await bridge.forgetPushedInfo(windowID: "pushed-2")
+    }
+
     @Test func stop_clearsRegisteredSockets() async throws {
         let bridge = KittyBridge.shared
         await bridge.registerSocket(windowID: "window-1", socketPath: "unix:/tmp/kitty-test")
@@ -642,6 +642,26 @@ struct SessionManagerTests {
         #expect(cyclable.count == 2)
     }
 
+    // MARK: - updateSessionTerminalInfo Tests
+
+    @Test func updateSessionTerminalInfo_bareUUID_updatesCompositeSession() {
+        let manager = SessionManager()
+
+        manager.testSetSessions([
+            makeSession("w0t0p1:abc-123"),
+            makeSession("w0t0p0:def-456")
+        ])
+
+        // The daemon pushes terminal_info with the bare UUID
+        manager.updateSessionTerminalInfo(
+            terminalSessionID: "abc-123", tabName: "tab", windowName: "Window 1", paneIndex: 1, paneCount: 2
+        )
+
+        #expect(manager.sessions[0].terminalTabName == "tab")
+        #expect(manager.sessions[0].paneIndex == 1)
+        #expect(manager.sessions[1].terminalTabName == nil)
+    }
+
     // MARK: - removeSessionsByTerminalID Tests
 
     @Test func removeSessionsByTerminalID_exactMatch_removesSession() {
@@ -937,8 +937,11 @@ final class SessionManager {
         paneIndex: Int,
         paneCount: Int
     ) {
-        // Update all sessions sharing this iTerm2 session (multiple tmux panes may share one)
-        for index in sessions.indices where sessions[index].terminalSessionID == terminalSessionID {
+        // Update all sessions sharing this iTerm2 session (multiple tmux panes may share one).
+        // The daemon's pushed terminal_info carries a bare UUID; hooks supply `w0t0p0:UUID`.
+        for index in sessions.indices
+            where sessions[index].terminalSessionID == terminalSessionID
+            || sessions[index].terminalSessionID.hasSuffix(":\(terminalSessionID)") {
             sessions[index].terminalTabName = tabName
             sessions[index].terminalWindowName = windowName
             sessions[index].paneIndex = paneIndex
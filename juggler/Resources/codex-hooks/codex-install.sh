@@ -15,17 +15,32 @@ HOOK_TIMEOUT=5
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 SOURCE_NOTIFY="$SCRIPT_DIR/codex-notify.sh"
+SOURCE_PAYLOAD="$SCRIPT_DIR/hook_payload.py"
 
 if [ ! -f "$SOURCE_NOTIFY" ]; then
     echo "Error: codex-notify.sh not found next to install.sh ($SOURCE_NOTIFY)" >&2
     exit 1
 fi
+if [ ! -f "$SOURCE_PAYLOAD" ]; then
+    echo "Error: hook_payload.py not found next to install.sh ($SOURCE_PAYLOAD)" >&2
+    exit 1
+fi
 
 echo "Installing Juggler hooks for Codex..."
 
 mkdir -p "$JUGGLER_HOOKS_DIR"
 cp "$SOURCE_NOTIFY" "$NOTIFY_SCRIPT"
 chmod +x "$NOTIFY_SCRIPT"
+# Payload builder notify.sh imports; precompiled so the first event skips the compile
+cp "$SOURCE_PAYLOAD" "$JUGGLER_HOOKS_DIR/hook_payload.py"
+python3 -m py_compile "$JUGGLER_HOOKS_DIR/hook_payload.py" 2>/dev/null || true
+# Optional resident relay and the client notify.sh sources to reach it; notify.sh takes
+# the direct path without them
+for RELAY_FILE in hook_relay.py hook_relay.sh; do
+    if [ -f "$SCRIPT_DIR/$RELAY_FILE" ]; then
+        cp "$SCRIPT_DIR/$RELAY_FILE" "$JUGGLER_HOOKS_DIR/$RELAY_FILE"
+    fi
+done
 
 export JUGGLER_HOOKS_JSON="$HOOKS_JSON"
 export JUGGLER_CONFIG_TOML="$CONFIG_TOML"
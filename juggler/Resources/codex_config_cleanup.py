@@ -1,3 +1,17 @@
+"""
+Removes Juggler's [hooks.state."..."] trust entries from Codex config.toml files.
+
+Usage: codex_config_cleanup.py [--dry-run] CONFIG HOOKS_JSON NOTIFY_SCRIPT [CONFIG HOOKS_JSON NOTIFY_SCRIPT ...]
+
+Each (config, hooks.json, notify script) triple is cleaned in turn. A section is
+Juggler's when its key is one of Juggler's current hooks.json registrations, or
+when it is keyed to that hooks.json and carries the hash Juggler would have
+trusted for its event. The config is streamed once, with retained lines written
+straight to a temporary file that replaces it only if something was removed.
+--dry-run lists the entries that would be removed and changes nothing.
+"""
+
+import functools
 import hashlib
 import json
 import os
@@ -6,7 +20,6 @@ import stat
 import sys
 import tempfile
 
-
 EVENTS = {
     "session_start": ("SessionStart", 5),
     "user_prompt_submit": ("UserPromptSubmit", 5),
@@ -18,16 +31,19 @@ EVENTS = {
     "stop": ("Stop", 5),
     "session_end": ("SessionEnd", 3),
 }
+EVENT_SNAKE = {name: snake for snake, (name, _) in EVENTS.items()}
 
 HOOK_STATE_HEADER = re.compile(r'^\[hooks\.state\."(.*)"\]$')
 TRUSTED_HASH = re.compile(r'^trusted_hash\s*=\s*"([^"]+)"')
 
+USAGE = (
+    "Usage: codex_config_cleanup.py [--dry-run] CONFIG HOOKS_JSON NOTIFY_SCRIPT"
+    " [CONFIG HOOKS_JSON NOTIFY_SCRIPT ...]"
+)
+
 
 def snake_case_event(event):
-    for snake, (name, _) in EVENTS.items():
-        if name == event:
-            return snake
-    return event.lower()
+    return EVENT_SNAKE.get(event, event.lower())
 
 
 def expected_hash(event, notify_script_path):
@@ -48,17 +64,24 @@ def expected_hash(event, notify_script_path):
     return "sha256:" + hashlib.sha256(encoded.encode()).hexdigest()
 
 
+@functools.lru_cache(maxsize=None)
+def expected_hashes(notify_script_path):
+    """The hash Juggler trusts for each event (by snake_case name), computed once per notify script."""
+    return {snake: expected_hash(name, notify_script_path) for snake, (name, _) in EVENTS.items()}
+
+
+@functools.lru_cache(maxsize=None)
 def current_juggler_keys(hooks_json_path, notify_script_path):
     try:
         with open(hooks_json_path) as file:
             root = json.load(file)
     except (FileNotFoundError, OSError, json.JSONDecodeError):
-        return set()
+        return frozenset()
 
     keys = set()
     hooks = root.get("hooks", {}) if isinstance(root, dict) else {}
     if not isinstance(hooks, dict):
-        return keys
+        return frozenset()
 
     for event, groups in hooks.items():
         if not isinstance(groups, list):
@@ -71,90 +94,132 @@ def current_juggler_keys(hooks_json_path, notify_script_path):
                 command = handler.get("command") if isinstance(handler, dict) else None
                 if isinstance(command, str) and notify_script_path in command:
                     keys.add(f"{hooks_json_path}:{snake_case_event(event)}:{group_index}:{handler_index}")
-    return keys
+    return frozenset(keys)
 
 
-def section_key(section):
-    if not section:
-        return None
-    match = HOOK_STATE_HEADER.match(section[0].strip())
-    return match.group(1) if match else None
-
-
-def section_hash(section):
-    for line in section[1:]:
-        match = TRUSTED_HASH.match(line.strip())
-        if match:
-            return match.group(1)
-    return None
-
-
-def is_juggler_section(section, hooks_json_path, notify_script_path, current_keys):
-    key = section_key(section)
-    if key is None:
-        return False
-    if key in current_keys:
-        return True
-
+def candidate_hash(key, hooks_json_path, notify_script_path):
+    """The hash that marks a section keyed `key` as Juggler's, or None when its key rules that out."""
     try:
         path, event, _, _ = key.rsplit(":", 3)
     except ValueError:
-        return False
-    if path != hooks_json_path or event not in EVENTS:
-        return False
+        return None
+    if path != hooks_json_path:
+        return None
+    return expected_hashes(notify_script_path).get(event)
+
 
-    event_name, _ = EVENTS[event]
-    return section_hash(section) == expected_hash(event_name, notify_script_path)
+def filter_sections(lines, hooks_json_path, notify_script_path, write):
+    """Pass every line not in a Juggler section to `write`; return the removed sections' keys.
 
+    Only a section whose fate hangs on its trusted_hash line is held back, and
+    only until that line: a few lines at most.
+    """
+    current_keys = current_juggler_keys(hooks_json_path, notify_script_path)
+    removed = []
+    dropping = False
+    pending = None  # Lines of an undecided section
+    pending_key = pending_hash = None
 
-def split_sections(contents):
-    sections = [[]]
-    for line in contents.splitlines(keepends=True):
+    for line in lines:
         stripped = line.strip()
         if stripped.startswith("[") and stripped.endswith("]"):
-            sections.append([])
-        sections[-1].append(line)
-    return sections
+            if pending is not None:
+                write("".join(pending))  # Never showed Juggler's hash
+                pending = None
+            dropping = False
+            match = HOOK_STATE_HEADER.match(stripped)
+            if match:
+                key = match.group(1)
+                if key in current_keys:
+                    removed.append(key)
+                    dropping = True
+                    continue
+                pending_hash = candidate_hash(key, hooks_json_path, notify_script_path)
+                if pending_hash is not None:
+                    pending, pending_key = [line], key
+                    continue
+            write(line)
+        elif dropping:
+            continue
+        elif pending is not None:
+            pending.append(line)
+            match = TRUSTED_HASH.match(stripped)
+            if match:
+                if match.group(1) == pending_hash:
+                    removed.append(pending_key)
+                    dropping = True
+                else:
+                    write("".join(pending))
+                pending = None
+        else:
+            write(line)
+
+    if pending is not None:
+        write("".join(pending))
+    return removed
+
+
+def clean_config(config_path, hooks_json_path, notify_script_path, dry_run=False):
+    """Remove Juggler's trust entries from one config; returns the removed keys."""
+    try:
+        source = open(config_path, encoding="utf-8", newline="")
+    except FileNotFoundError:
+        return []
 
+    with source:
+        if dry_run:
+            return filter_sections(source, hooks_json_path, notify_script_path, lambda line: None)
 
-def atomic_write(path, contents):
-    directory = os.path.dirname(path)
-    descriptor, temporary_path = tempfile.mkstemp(prefix=".config.toml.juggler-", dir=directory)
-    try:
-        with os.fdopen(descriptor, "w") as file:
-            file.write(contents)
-            file.flush()
-            os.fsync(file.fileno())
-        os.chmod(temporary_path, stat.S_IMODE(os.stat(path).st_mode))
-        os.replace(temporary_path, path)
-    except BaseException:
+        # Replace the file a symlinked config points at, not the link
+        path = os.path.realpath(config_path)
+        descriptor, temporary_path = tempfile.mkstemp(prefix=".config.toml.juggler-", dir=os.path.dirname(path))
         try:
-            os.unlink(temporary_path)
-        except FileNotFoundError:
-            pass
-        raise
+            with os.fdopen(descriptor, "w", encoding="utf-8", newline="") as file:
+                removed = filter_sections(source, hooks_json_path, notify_script_path, file.write)
+                if removed:
+                    file.flush()
+                    os.fsync(file.fileno())
+            if not removed:
+                os.unlink(temporary_path)
+                return removed
+            os.chmod(temporary_path, stat.S_IMODE(os.stat(path).st_mode))
+            os.replace(temporary_path, path)
+        except BaseException:
+            try:
+                os.unlink(temporary_path)
+            except FileNotFoundError:
+                pass
+            raise
+    return removed
 
 
 def main():
-    config_path, hooks_json_path, notify_script_path = sys.argv[1:]
-    try:
-        with open(config_path) as file:
-            contents = file.read()
-    except FileNotFoundError:
-        return
-
-    current_keys = current_juggler_keys(hooks_json_path, notify_script_path)
-    sections = split_sections(contents)
-    retained = [
-        section
-        for section in sections
-        if not is_juggler_section(section, hooks_json_path, notify_script_path, current_keys)
-    ]
-    updated = "".join("".join(section) for section in retained)
-    if updated != contents:
-        atomic_write(os.path.realpath(config_path), updated)
-        print("  Removed Juggler trust entries from Codex config.toml")
+    args = sys.argv[1:]
+    dry_run = args[:1] == ["--dry-run"]
+    if dry_run:
+        args = args[1:]
+    if not args or len(args) % 3:
+        print(USAGE, file=sys.stderr)
+        return 2
+
+    failed = False
+    for index in range(0, len(args), 3):
+        config_path, hooks_json_path, notify_script_path = args[index:index + 3]
+        try:
+            removed = clean_config(config_path, hooks_json_path, notify_script_path, dry_run)
+        except (OSError, UnicodeDecodeError) as error:
+            # Leave this config as it was and carry on with the others
+            print(f"  Failed to clean {config_path}: {error}", file=sys.stderr)
+            failed = True
+            continue
+        if dry_run:
+            print(f"  {config_path}: would remove {len(removed)} Juggler trust entries")
+            for key in removed:
+                print(f"    {key}")
+        elif removed:
+            print(f"  Removed {len(removed)} Juggler trust entries from {config_path}")
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
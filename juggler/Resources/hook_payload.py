@@ -0,0 +1,489 @@
+"""
+Unified /hook payload builder for Juggler's agent hook scripts.
+
+notify.sh and its Codex/Antigravity variants import this module, installed next
+to them, instead of each carrying its own copy of the builder. They launch it as
+
+    python3 -I -S -c 'import sys; sys.path.append(sys.argv[1]); import hook_payload; ...' \
+        <hooks-dir> <event> <cwd>
+
+so Python loads its cached bytecode from __pycache__ (written at install time, or
+by the first event) rather than compiling the source on every event, and -I -S
+skip site-packages and the user's environment. Interpreter startup is most of a
+hook's cost: keep module-level imports to what the builder needs. The standard
+modules imported here are built in or already loaded by `json`.
+
+The resident relay (hook_relay.py) imports the same scanner, git cache and
+coalescing code, so both paths build and coalesce payloads identically.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+# Stop looking for wanted keys after this many bytes of hook JSON
+MAX_HOOK_INPUT_BYTES = 4 << 20
+READ_CHUNK_BYTES = 65536
+# Rest of a JSON string body, escapes included, up to its closing quote
+STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+# Bytes that matter while skipping a nested object or array
+STRUCTURAL = re.compile(rb'["\[\]{}]')
+SCALAR_END = re.compile(rb"[\s,\]}]")
+# Per-user cache of cwd -> branch and repository name, revalidated against HEAD
+GIT_CACHE_PATH = os.path.join(os.environ.get("TMPDIR") or "/tmp", "juggler-git-heads-%d.json" % os.getuid())
+# Entries kept in the git cache; the least recently resolved are dropped first
+GIT_CACHE_MAX_ENTRIES = 64
+# Per-user directory holding each agent session's last posted state
+HOOK_STATE_DIR = os.path.join(os.environ.get("TMPDIR") or "/tmp", "juggler-hook-state-%d" % os.getuid())
+# Post an unchanged working state again after this many seconds anyway, so a
+# restarted Juggler relearns the session. JUGGLER_HOOK_HEARTBEAT_SECONDS
+# overrides it; 0 posts every event.
+DEFAULT_HEARTBEAT_SECONDS = 10
+
+# Top-level hook JSON keys kept per agent, and the hookInput key each maps to.
+# PostToolUse includes full tool_input/tool_response, which can be megabytes; the
+# scanner never holds or parses those. Antigravity's stdin is camelCase, and it
+# runs hooks from its own config dir, so its workspacePaths[0] replaces the cwd.
+HOOK_INPUT_KEYS = {
+    "claude-code": {"session_id": "session_id", "transcript_path": "transcript_path", "tool_name": "tool_name"},
+    "codex": {"session_id": "session_id", "transcript_path": "transcript_path", "tool_name": "tool_name"},
+    "antigravity": {"conversationId": "session_id", "transcriptPath": "transcript_path"},
+}
+WORKSPACE_KEY = "workspacePaths"
+
+# HookEventMapper's state for each event, per agent. Only COALESCED_EVENTS are
+# ever skipped; UserPromptSubmit is always posted, as it is what takes a session
+# off the backburner.
+EVENT_STATES = {
+    "claude-code": {
+        "SessionStart": "idle",
+        "Stop": "idle",
+        "StopFailure": "idle",
+        "UserPromptSubmit": "working",
+        "PreToolUse": "working",
+        "PostToolUse": "working",
+        "PostToolUseFailure": "working",
+        "SubagentStart": "working",
+        "PermissionRequest": "permission",
+        "PreCompact": "compacting",
+        "SessionEnd": "end",
+    },
+    "codex": {
+        "SessionStart": "idle",
+        "Stop": "idle",
+        "UserPromptSubmit": "working",
+        "PreToolUse": "working",
+        "PostToolUse": "working",
+        "PostCompact": "working",
+        "PermissionRequest": "permission",
+        "PreCompact": "compacting",
+        "SessionEnd": "end",
+    },
+    "antigravity": {"Stop": "idle", "PreInvocation": "working"},
+}
+COALESCED_EVENTS = {
+    "claude-code": {"PreToolUse", "PostToolUse", "PostToolUseFailure", "SubagentStart"},
+    "codex": {"PreToolUse", "PostToolUse"},
+    "antigravity": {"PreInvocation"},
+}
+
+
+class HookInputScanner:
+    """Pulls top-level keys out of a JSON object as it streams in.
+
+    Values of other keys are skipped without being kept or parsed, so large
+    tool output costs neither memory nor a full parse. By default reading
+    stops once every wanted key is found, or after MAX_HOOK_INPUT_BYTES;
+    with `to_end` the scan runs to the end of the object instead, so the
+    relay knows the request is complete.
+    """
+
+    def __init__(self, read, keys, buffer=b"", to_end=False):
+        self.read = read
+        self.keys = set(keys)
+        self.buffer = buffer
+        self.to_end = to_end
+        self.pos = 0
+        self.keep = None
+        self.total = len(buffer)
+        self.complete = False
+
+    def drain(self):
+        """Discard the rest of the input so the writer never fails with EPIPE."""
+        try:
+            while self.read(READ_CHUNK_BYTES):
+                pass
+        except OSError:
+            pass
+
+    def _fill(self):
+        if not self.to_end and self.total >= MAX_HOOK_INPUT_BYTES:
+            raise EOFError
+        chunk = self.read(READ_CHUNK_BYTES)
+        if not chunk:
+            raise EOFError
+        self.total += len(chunk)
+        start = self.pos if self.keep is None else self.keep
+        self.buffer = self.buffer[start:] + chunk
+        self.pos -= start
+        if self.keep is not None:
+            self.keep = 0
+
+    def _next(self):
+        while True:
+            while self.pos >= len(self.buffer):
+                self._fill()
+            byte = self.buffer[self.pos]
+            self.pos += 1
+            if byte not in b" \t\r\n":
+                return byte
+
+    def _skip_string(self):
+        while True:
+            end = STRING_BODY.match(self.buffer, self.pos).end()
+            if end < len(self.buffer) and self.buffer[end] == ord('"'):
+                self.pos = end + 1
+                return
+            self.pos = end  # Out of data, possibly mid-escape
+            self._fill()
+
+    def _skip_value(self):
+        byte = self._next()
+        if byte == ord('"'):
+            self._skip_string()
+        elif byte in b"[{":
+            depth = 1
+            while depth:
+                match = STRUCTURAL.search(self.buffer, self.pos)
+                if match is None:
+                    self.pos = len(self.buffer)
+                    self._fill()
+                    continue
+                self.pos = match.end()
+                if match.group() == b'"':
+                    self._skip_string()
+                else:
+                    depth += 1 if match.group() in b"[{" else -1
+        else:
+            while True:
+                match = SCALAR_END.search(self.buffer, self.pos)
+                if match is not None:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buffer)
+                self._fill()
+
+    def scan(self):
+        found = {}
+        try:
+            if self._next() != ord("{"):
+                return found
+            while self.to_end or self.keys - found.keys():
+                byte = self._next()
+                if byte == ord("}"):
+                    self.complete = True
+                    break
+                if byte != ord('"'):
+                    break
+                self.keep = self.pos - 1
+                self._skip_string()
+                key = json.loads(self.buffer[self.keep:self.pos])
+                if self._next() != ord(":"):
+                    break
+                wanted = key in self.keys and key not in found and self.total <= MAX_HOOK_INPUT_BYTES
+                self.keep = self.pos if wanted else None
+                self._skip_value()
+                if wanted:
+                    try:
+                        found[key] = json.loads(self.buffer[self.keep:self.pos])
+                    except ValueError:
+                        pass
+                self.keep = None
+                byte = self._next()
+                if byte == ord("}"):
+                    self.complete = True
+                    break
+                if byte != ord(","):
+                    break
+        except (EOFError, OSError, ValueError):
+            pass
+        return found
+
+
+def scanned_keys(agent):
+    """The top-level hook JSON keys to pull out for this agent."""
+    keys = set(HOOK_INPUT_KEYS.get(agent, ()))
+    if agent == "antigravity":
+        keys.add(WORKSPACE_KEY)
+    return keys
+
+
+def find_repository(cwd):
+    """(worktree root, path of HEAD) for cwd, or None outside a repository.
+
+    In linked worktrees and submodules `.git` is a file whose `gitdir:` line
+    names the real git directory.
+    """
+    path = os.path.realpath(cwd)
+    while True:
+        dot_git = os.path.join(path, ".git")
+        git_dir = None
+        if os.path.isdir(dot_git):
+            git_dir = dot_git
+        elif os.path.isfile(dot_git):
+            try:
+                with open(dot_git) as f:
+                    line = f.readline().strip()
+            except OSError:
+                line = ""
+            if line.startswith("gitdir:"):
+                git_dir = os.path.join(path, line[len("gitdir:"):].strip())
+        if git_dir is not None:
+            head = os.path.normpath(os.path.join(git_dir, "HEAD"))
+            if os.path.isfile(head):
+                return path, head
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def read_branch(head):
+    """The branch HEAD points at; "HEAD" when detached, as `git rev-parse --abbrev-ref` prints it."""
+    with open(head) as f:
+        line = f.readline().strip()
+    if not line.startswith("ref:"):
+        return "HEAD"
+    ref = line[len("ref:"):].strip()
+    return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+
+
+def head_stamp(head):
+    info = os.stat(head)
+    return [info.st_mtime_ns, info.st_ino, info.st_size]
+
+
+def load_git_cache():
+    try:
+        with open(GIT_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_git_cache(cache):
+    """Replace the cache file atomically; a failed write only costs the next hook a walk."""
+    while len(cache) > GIT_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    temp = "%s.%d" % (GIT_CACHE_PATH, os.getpid())
+    try:
+        with os.fdopen(os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(cache, f)
+        os.replace(temp, GIT_CACHE_PATH)
+    except OSError:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+
+
+def git_info(cwd):
+    """Branch and repository name for cwd, read from the repository without running git.
+
+    Results are cached per cwd and reused while HEAD keeps its mtime, inode and
+    size, so a repeat lookup is one stat. Switching branches rewrites HEAD.
+    """
+    if not cwd:
+        return {"branch": "", "repo": ""}
+    cache = load_git_cache()
+    entry = cache.get(cwd)
+    try:
+        if head_stamp(entry["head"]) == entry["stamp"]:
+            return {"branch": entry["branch"], "repo": entry["repo"]}
+    except (OSError, KeyError, TypeError):
+        pass
+    found = find_repository(cwd)
+    if found is None:
+        return {"branch": "", "repo": ""}
+    root, head = found
+    try:
+        stamp = head_stamp(head)  # Before the read: a racing checkout then fails the next check
+        branch = read_branch(head)
+    except OSError:
+        return {"branch": "", "repo": ""}
+    repo = os.path.basename(root)
+    cache.pop(cwd, None)  # Re-inserted last, so eviction drops the stalest entries
+    cache[cwd] = {"head": head, "stamp": stamp, "branch": branch, "repo": repo}
+    save_git_cache(cache)
+    return {"branch": branch, "repo": repo}
+
+
+def remote_host(env):
+    """user@host for an SSH session, as Juggler labels remote sessions."""
+    user = env.get("USER")
+    if not user:
+        import pwd  # Only when $USER is unset, which is rare
+
+        try:
+            user = pwd.getpwuid(os.getuid()).pw_name
+        except KeyError:
+            user = ""
+    hostname = env.get("HOSTNAME") or os.uname().nodename or "unknown"
+    # Strip the FQDN suffix from the host only — not the user, which may contain dots.
+    return "%s@%s" % (user, hostname.split(".")[0])
+
+
+def build_payload(agent, event, found, cwd, env, tmux_session=""):
+    """The unified /hook payload for one event.
+
+    `found` holds the keys scanned from the hook JSON, `env` the hook's
+    terminal environment (KITTY_WINDOW_ID, TMUX_PANE, SSH_CONNECTION, ...),
+    and `tmux_session` the name of the session TMUX_PANE belongs to.
+    """
+    hook_input = {}
+    for source, target in HOOK_INPUT_KEYS.get(agent, {}).items():
+        if source in found:
+            hook_input[target] = found[source]
+
+    workspaces = found.get(WORKSPACE_KEY)
+    if isinstance(workspaces, list) and workspaces and isinstance(workspaces[0], str) and workspaces[0]:
+        cwd = workspaces[0]
+
+    if env.get("KITTY_WINDOW_ID"):
+        terminal_type, terminal_session_id = "kitty", env["KITTY_WINDOW_ID"]
+    elif env.get("ITERM_SESSION_ID"):
+        terminal_type, terminal_session_id = "iterm2", env["ITERM_SESSION_ID"]
+    elif env.get("WEZTERM_PANE"):
+        terminal_type, terminal_session_id = "wezterm", env["WEZTERM_PANE"]
+    else:
+        terminal_type, terminal_session_id = "", ""
+
+    terminal_info = {"sessionId": terminal_session_id, "cwd": cwd}
+    if terminal_type:
+        terminal_info["terminalType"] = terminal_type
+    if env.get("KITTY_LISTEN_ON"):
+        terminal_info["kittyListenOn"] = env["KITTY_LISTEN_ON"]
+    if env.get("KITTY_PID"):
+        terminal_info["kittyPid"] = env["KITTY_PID"]
+
+    payload = {
+        "agent": agent,
+        "event": event,
+        "hookInput": hook_input,
+        "terminal": terminal_info,
+        "git": git_info(cwd),
+    }
+
+    tmux_pane = env.get("TMUX_PANE", "")
+    if tmux_pane:
+        tmux_info = {"pane": tmux_pane}
+        if tmux_session:
+            tmux_info["sessionName"] = tmux_session
+        payload["tmux"] = tmux_info
+
+    if env.get("SSH_CONNECTION"):
+        payload["remoteHost"] = remote_host(env)
+
+    return payload
+
+
+def heartbeat_seconds(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return DEFAULT_HEARTBEAT_SECONDS
+
+
+def event_state(payload):
+    """(state, coalescible) for the payload's event."""
+    agent, event = payload["agent"], payload["event"]
+    state = EVENT_STATES.get(agent, {}).get(event)
+    if agent == "codex" and event == "PreToolUse" and payload["hookInput"].get("tool_name") == "request_user_input":
+        state = "idle"  # Codex is asking the user a question
+    return state, event in COALESCED_EVENTS.get(agent, ()) and state == "working"
+
+
+def should_post(payload, state, coalescible, heartbeat):
+    """Record the event as its session's last posted state; False when it need not be posted.
+
+    A coalescible event is skipped only when the session was last posted in the
+    same state, with the same metadata, less than `heartbeat` seconds ago. A
+    state of None leaves the record alone, and "end" deletes it.
+    """
+    session_id = payload["hookInput"].get("session_id")
+    if state is None or not isinstance(session_id, str) or not session_id:
+        return True
+    name = "".join(c if c.isascii() and c.isalnum() or c in "._-" else "_" for c in session_id)
+    path = os.path.join(HOOK_STATE_DIR, "%s-%s.json" % (payload["agent"], name))
+    if state == "end":
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        return True
+
+    # Everything Juggler keeps for the session besides its state
+    key = {field: value for field, value in payload.items() if field != "event"}
+    key["hookInput"] = {field: value for field, value in payload["hookInput"].items() if field != "tool_name"}
+    now = time.time()
+    if coalescible and heartbeat > 0:
+        try:
+            with open(path) as f:
+                last = json.load(f)
+            if last["state"] == state and last["key"] == key and 0 <= now - last["at"] < heartbeat:
+                return False
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    temp = "%s.%d" % (path, os.getpid())
+    try:
+        os.makedirs(HOOK_STATE_DIR, mode=0o700, exist_ok=True)
+        with os.fdopen(os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump({"state": state, "at": now, "key": key}, f)
+        os.replace(temp, path)
+    except OSError:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+    return True
+
+
+def read_stdin(size):
+    return os.read(0, size)
+
+
+def run_hook(agent, event, cwd):
+    """Build the payload for one hook event and print it, unless it is coalesced.
+
+    The hook JSON is streamed from stdin and the terminal environment read from
+    os.environ; notify.sh passes the tmux session name in JUGGLER_TMUX_SESSION.
+    """
+    scanner = HookInputScanner(read_stdin, scanned_keys(agent))
+    found = scanner.scan()
+    payload = build_payload(agent, event, found, cwd, os.environ, os.environ.get("JUGGLER_TMUX_SESSION", ""))
+    heartbeat = heartbeat_seconds(os.environ.get("JUGGLER_HOOK_HEARTBEAT_SECONDS"))
+    if should_post(payload, *event_state(payload), heartbeat):
+        sys.stdout.write(json.dumps(payload) + "\n")
+    # Hand the output on (EOF to its reader) before draining stdin
+    sys.stdout.flush()
+    os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+    scanner.drain()
+
+
+def claude_code(event, cwd):
+    """Entry point for Claude Code's notify.sh."""
+    run_hook("claude-code", event, cwd)
+
+
+def codex(event, cwd):
+    """Entry point for Codex's notify.sh."""
+    run_hook("codex", event, cwd)
+
+
+def antigravity(event, cwd):
+    """Entry point for Antigravity's notify.sh; its stdout response is printed by the script."""
+    run_hook("antigravity", event, cwd)
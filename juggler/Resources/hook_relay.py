@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Resident hook relay for Juggler.
+
+The agent hook scripts (notify.sh and its Codex/Antigravity variants) fork
+python3 and curl (plus tmux, inside tmux) for every event. While this relay
+is running they instead stream the raw event to it over a per-user Unix
+socket with `nc` (see hook_relay.sh) and exit. The relay does the tmux lookup, builds the same
+unified `/hook` payload with hook_payload.py (the module the direct path
+runs), and forwards it over a kept-alive HTTP connection.
+
+A hook that finds no relay holding the pid file starts one in the background
+and takes the direct path itself. The relay exits after IDLE_EXIT_SECONDS
+without events, or once this file or hook_payload.py is replaced by a newer
+install. One that cannot listen holds its pid file for RESPAWN_BACKOFF_SECONDS
+first, so hooks do not start a new one per event.
+
+Request format: NUL-terminated `NAME=value` entries (agent, event, port, cwd,
+the spool path, the hook's terminal environment and its heartbeat setting),
+an empty entry, then the hook's stdin JSON verbatim. The hook tees that JSON
+into the spool path, inside the relay's owner-only spool directory. Once the
+relay has read all of it, it removes the spool copy: that is the handoff. A
+hook whose copy is still there takes the direct path with it.
+
+Usage: python3 -I -S hook_relay.py <socket-path>
+"""
+
+from __future__ import annotations
+
+import fcntl
+import http.client
+import json
+import os
+import queue
+import shutil
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+# Started isolated (-I -S), so this script's directory is not on sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import hook_payload  # noqa: E402
+from hook_payload import (  # noqa: E402
+    READ_CHUNK_BYTES,
+    HookInputScanner,
+    event_state,
+    heartbeat_seconds,
+    scanned_keys,
+    should_post,
+)
+
+JUGGLER_HOST = "127.0.0.1"
+DEFAULT_JUGGLER_PORT = "7483"
+
+# Socket timeout for connecting to Juggler and for each POST, in seconds
+REQUEST_TIMEOUT_SECONDS = 2
+# Exit after this long without events; the next hook starts a fresh relay
+IDLE_EXIT_SECONDS = 600
+# Hooks handled at once; further ones wait in the listen backlog
+MAX_HANDLERS = 16
+# A hook client that stalls this long mid-request is dropped
+CLIENT_TIMEOUT_SECONDS = 5
+# After the JSON object ends, wait this long for the client's trailing newline
+# and EOF. Some `nc` builds never half-close, so EOF cannot be relied upon.
+TRAILING_GRACE_SECONDS = 0.002
+# Bound for tmux lookups
+LOOKUP_TIMEOUT_SECONDS = 1
+# A relay that cannot listen holds its pid file this long before exiting
+RESPAWN_BACKOFF_SECONDS = 60
+# Spool copies older than this at startup belong to hooks that were killed
+STALE_SPOOL_SECONDS = 60
+
+# Upper bound for the NUL-separated header
+MAX_HEADER_BYTES = 1 << 16
+
+
+def read_header(conn: socket.socket) -> tuple:
+    """Return the header entries and whatever body bytes arrived with them."""
+    data = b""
+    while b"\0\0" not in data:
+        if len(data) > MAX_HEADER_BYTES:
+            raise ValueError("header too large")
+        chunk = conn.recv(READ_CHUNK_BYTES)
+        if not chunk:
+            raise ValueError("connection closed in header")
+        data += chunk
+    # A leading empty entry would read as the terminator; hooks never send one
+    head, _, body = data.partition(b"\0\0")
+    fields = {}
+    for entry in head.split(b"\0"):
+        name, _, value = entry.decode("utf-8", "replace").partition("=")
+        fields[name] = value
+    return fields, body
+
+
+def run_lookup(args: list, env: Optional[dict] = None) -> Optional[str]:
+    """Run a tmux lookup; None when it fails or times out."""
+    try:
+        result = subprocess.run(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=LOOKUP_TIMEOUT_SECONDS,
+            env=env,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode("utf-8", "replace")
+
+
+def tmux_session_name(pane: str, fields: dict) -> str:
+    if not shutil.which("tmux"):
+        return ""
+    env = dict(os.environ)
+    if fields.get("TMUX"):
+        env["TMUX"] = fields["TMUX"]  # Selects the tmux server the hook runs under
+    name = run_lookup(["tmux", "display-message", "-p", "-t", pane, "#{session_name}"], env=env)
+    return name.strip() if name else ""
+
+
+def build_payload(fields: dict, found: dict) -> dict:
+    """The unified /hook payload notify.sh would have built for this event."""
+    tmux_pane = fields.get("TMUX_PANE", "")
+    return hook_payload.build_payload(
+        fields.get("agent", ""),
+        fields.get("event", ""),
+        found,
+        fields.get("cwd", ""),
+        fields,
+        tmux_session_name(tmux_pane, fields) if tmux_pane else "",
+    )
+
+
+class HookForwarder:
+    """POSTs payloads to Juggler in the order their hooks connected.
+
+    Each accepted hook gets a Future queued at accept time; payloads are built
+    concurrently but sent strictly in queue order over one kept-alive
+    connection per port, so a slow git lookup never reorders a session's
+    events.
+    """
+
+    def __init__(self) -> None:
+        self.outbox: queue.Queue = queue.Queue()
+        self.connections: dict = {}
+        self.thread = threading.Thread(target=self._run, name="juggler-hook-forwarder", daemon=True)
+        self.thread.start()
+
+    def reserve(self) -> Future:
+        future: Future = Future()
+        self.outbox.put(future)
+        return future
+
+    def _run(self) -> None:
+        while True:
+            future = self.outbox.get()
+            try:
+                # Coalescing runs here, in queue order, so it sees each session's
+                # events in the order they happened
+                port, payload, heartbeat = future.result()
+                if payload is not None and should_post(payload, *event_state(payload), heartbeat):
+                    self._send(port, json.dumps(payload).encode("utf-8"))
+            except Exception as e:
+                print(f"Hook relay: dropped event: {e}", file=sys.stderr)
+            finally:
+                self.outbox.task_done()
+
+    def _send(self, port: str, body: bytes) -> None:
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        reused = port in self.connections
+        try:
+            self._request(port, body, headers)
+        except (http.client.HTTPException, OSError):
+            self._close(port)
+            if not reused:
+                raise
+            # Juggler dropped the idle connection: retry once on a fresh one
+            self._request(port, body, headers)
+
+    def _request(self, port: str, body: bytes, headers: dict) -> None:
+        connection = self.connections.get(port)
+        if connection is None:
+            connection = http.client.HTTPConnection(JUGGLER_HOST, int(port), timeout=REQUEST_TIMEOUT_SECONDS)
+            self.connections[port] = connection
+        connection.request("POST", "/hook", body, headers)
+        response = connection.getresponse()
+        response.read()
+        if response.will_close:
+            self._close(port)
+
+    def _close(self, port: str) -> None:
+        connection = self.connections.pop(port, None)
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+class HookRelay:
+    """Accepts hook connections on a Unix socket and feeds the forwarder."""
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self.pid_path = os.path.splitext(socket_path)[0] + ".pid"
+        self.spool_dir = os.path.splitext(socket_path)[0] + ".spool"
+        self.script_paths = (os.path.abspath(__file__), os.path.abspath(hook_payload.__file__))
+        self.script_mtimes = self._script_mtimes()
+        self.forwarder = HookForwarder()
+        self.handler_slots = threading.BoundedSemaphore(MAX_HANDLERS)
+        self.last_event = time.monotonic()
+        self.server: Optional[socket.socket] = None
+        self.bound_inode: Optional[int] = None
+        self.lock_file = None
+
+    def _script_mtimes(self) -> list:
+        mtimes = []
+        for path in self.script_paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def acquire(self) -> bool:
+        """Take the per-user lock; False if another relay already holds it."""
+        self.lock_file = open(self.pid_path, "a+")
+        try:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.lock_file.close()
+            return False
+        self.lock_file.seek(0)
+        self.lock_file.truncate()
+        self.lock_file.write(f"{os.getpid()}\n")
+        self.lock_file.flush()
+        return True
+
+    def listen(self) -> None:
+        self._prepare_spool()
+        try:
+            os.unlink(self.socket_path)  # Left behind by a relay that crashed
+        except FileNotFoundError:
+            pass
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # Owner-only: hooks hand over session data
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self.bound_inode = os.stat(self.socket_path).st_ino
+        server.listen(64)
+        self.server = server
+
+    def _prepare_spool(self) -> None:
+        """Create the owner-only spool directory and clear copies hooks left behind."""
+        try:
+            os.mkdir(self.spool_dir, 0o700)
+        except FileExistsError:
+            info = os.lstat(self.spool_dir)
+            if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+                raise OSError(f"{self.spool_dir} is not this user's directory")
+            os.chmod(self.spool_dir, 0o700)
+        # A hook can still be teeing into a recent copy after its relay went away
+        stale = time.time() - STALE_SPOOL_SECONDS
+        for entry in os.scandir(self.spool_dir):
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime < stale:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def _take_spool(self, path: str) -> None:
+        """Remove the hook's spool copy, telling it the event is ours to post."""
+        if os.path.dirname(path) != self.spool_dir:
+            raise ValueError(f"spool path outside {self.spool_dir}")
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass  # tee could not create it, and the hook reads that as taken too
+
+    def serve(self) -> None:
+        while True:
+            remaining = self.last_event + IDLE_EXIT_SECONDS - time.monotonic()
+            if remaining <= 0:
+                break
+            # Block until a hook connects; the only other wakeup is the idle deadline
+            self.server.settimeout(remaining)
+            try:
+                conn, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError as e:
+                print(f"Hook relay: accept failed: {e}", file=sys.stderr)
+                continue
+            self.last_event = time.monotonic()
+            self.handler_slots.acquire()
+            future = self.forwarder.reserve()
+            threading.Thread(target=self._handle, args=(conn, future), daemon=True).start()
+            if self._script_mtimes() != self.script_mtimes:
+                print("Hook relay: script replaced, exiting", file=sys.stderr)
+                break
+        # Stop listening before draining: a hook still in the backlog is refused rather
+        # than left unanswered, and takes the direct path
+        self.stop_listening()
+        self.forwarder.outbox.join()
+
+    def _handle(self, conn: socket.socket, future: Future) -> None:
+        result = (DEFAULT_JUGGLER_PORT, None, 0.0)
+        try:
+            conn.settimeout(CLIENT_TIMEOUT_SECONDS)
+            fields, body = read_header(conn)
+            scanner = HookInputScanner(conn.recv, scanned_keys(fields.get("agent", "")), body, to_end=True)
+            found = scanner.scan()
+            if scanner.complete:
+                self._drain_trailing(conn)
+            # From here on the event is ours to post; if this fails, the hook posts it
+            self._take_spool(fields.get("spool", ""))
+            result = (
+                fields.get("port") or DEFAULT_JUGGLER_PORT,
+                build_payload(fields, found),
+                heartbeat_seconds(fields.get("JUGGLER_HOOK_HEARTBEAT_SECONDS")),
+            )
+        except Exception as e:
+            print(f"Hook relay: bad request: {e}", file=sys.stderr)
+        finally:
+            try:
+                conn.close()
+            except OSError:
+                pass
+            future.set_result(result)
+            self.handler_slots.release()
+
+    def _drain_trailing(self, conn: socket.socket) -> None:
+        conn.settimeout(TRAILING_GRACE_SECONDS)
+        try:
+            while conn.recv(READ_CHUNK_BYTES):
+                pass
+        except OSError:
+            pass
+
+    def stop_listening(self) -> None:
+        if self.server is None:
+            return
+        try:
+            if os.stat(self.socket_path).st_ino == self.bound_inode:
+                os.unlink(self.socket_path)
+        except OSError:
+            pass
+        self.server.close()
+        self.server = None
+
+    def close(self) -> None:
+        self.stop_listening()
+        if self.lock_file is not None:
+            try:
+                os.unlink(self.pid_path)
+            except OSError:
+                pass
+            self.lock_file.close()
+
+
+def main() -> int:
+    if len(sys.argv) != 2:
+        print("Usage: hook_relay.py <socket-path>", file=sys.stderr)
+        return 2
+    try:
+        os.setsid()  # Outlive the hook that started us, and its process group
+    except OSError:
+        pass  # Already a session leader
+    os.chdir("/")
+    relay = HookRelay(sys.argv[1])
+    if not relay.acquire():
+        return 0  # Another relay is already serving this socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        try:
+            relay.listen()
+        except OSError as e:
+            print(f"Hook relay: cannot listen on {relay.socket_path}: {e}", file=sys.stderr)
+            time.sleep(RESPAWN_BACKOFF_SECONDS)  # Hooks see a live pid and start no other relay
+            return 1
+        relay.serve()
+    finally:
+        relay.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# Juggler resident relay client, sourced by the agent hook scripts (notify.sh and its
+# Codex and Antigravity variants) when JUGGLER_HOOK_RELAY=1. Installed next to them and
+# hook_relay.py.
+#
+# relay_handoff AGENT hands the hook's event to a live relay and returns 0 once the relay
+# has taken it. stdin streams through `tee` straight into one `nc`; tee also leaves a spool
+# copy in the relay's private spool directory. The relay removes that copy once it has read
+# the whole event, so a copy still there means it never took it: stdin is then read from
+# the copy and relay_handoff returns 1 for the direct path.
+#
+# A relay is only started when none holds the pid file. One that cannot listen keeps its
+# pid file for a while before exiting (RESPAWN_BACKOFF_SECONDS in hook_relay.py), so a
+# failing relay costs one python3 per backoff rather than one per hook.
+#
+# Uses HOOK_DIR, EVENT and JUGGLER_PORT from the sourcing script.
+
+relay_handoff() {
+    local script="$HOOK_DIR/hook_relay.py"
+    local socket="${TMPDIR:-/tmp}"
+    socket="${socket%/}/juggler-hook-relay-${UID}.sock"
+    local stem="${socket%.sock}"
+    local pid="" spool
+    if [ ! -f "$script" ] || ! command -v nc >/dev/null 2>&1; then
+        return 1
+    fi
+    read -r pid 2>/dev/null < "$stem.pid"
+    if [ -z "$pid" ] || ! kill -0 "$pid" 2>/dev/null; then
+        # No relay, or a stale pid file left by one that was killed
+        if [ -w "${socket%/*}" ]; then
+            python3 -I -S "$script" "$socket" </dev/null >/dev/null 2>&1 &
+        fi
+        return 1
+    fi
+    if [ ! -S "$socket" ] || [ ! -d "$stem.spool" ]; then
+        return 1  # Starting up, backing off or draining before exit
+    fi
+    spool="$stem.spool/$$"
+    # With SIGPIPE ignored, tee finishes the spool copy even if nc is refused and exits
+    trap '' PIPE
+    { printf '%s\0' "agent=$1" "event=$EVENT" "port=$JUGGLER_PORT" "cwd=$PWD" "spool=$spool" \
+            "ITERM_SESSION_ID=${ITERM_SESSION_ID:-}" "KITTY_WINDOW_ID=${KITTY_WINDOW_ID:-}" \
+            "KITTY_LISTEN_ON=${KITTY_LISTEN_ON:-}" "KITTY_PID=${KITTY_PID:-}" \
+            "WEZTERM_PANE=${WEZTERM_PANE:-}" "TMUX=${TMUX:-}" "TMUX_PANE=${TMUX_PANE:-}" \
+            "SSH_CONNECTION=${SSH_CONNECTION:-}" "USER=${USER:-}" "HOSTNAME=${HOSTNAME:-}" \
+            "JUGGLER_HOOK_HEARTBEAT_SECONDS=${JUGGLER_HOOK_HEARTBEAT_SECONDS:-}" ""
+        exec tee "$spool" 2>/dev/null; } | nc -U "$socket" >/dev/null 2>&1
+    trap - PIPE
+    if [ ! -e "$spool" ]; then
+        return 0
+    fi
+    exec < "$spool"
+    rm -f "$spool"
+    return 1
+}
@@ -12,12 +12,17 @@ echo "Installing Juggler hooks..."
 python3 - "$SETTINGS_FILE" "$SCRIPT_DIR/notify.sh" "$JUGGLER_HOOKS_DIR/notify.sh" << 'PYTHON'
 import json
 import os
+import py_compile
 import shutil
 import stat
 import sys
 import tempfile
 
 settings_path, notify_source, notify_destination = sys.argv[1:]
+# notify.sh builds its payload with this module, so it is required
+payload_source = os.path.join(os.path.dirname(notify_source), "hook_payload.py")
+if not os.path.exists(payload_source):
+    raise SystemExit(f"hook_payload.py not found next to notify.sh ({payload_source}); no changes made")
 settings_existed = os.path.exists(settings_path)
 settings_write_path = os.path.realpath(settings_path)
 
@@ -124,6 +129,20 @@ os.makedirs(os.path.dirname(notify_destination), exist_ok=True)
 shutil.copy2(notify_source, notify_destination)
 os.chmod(notify_destination, 0o755)
 
+payload_destination = os.path.join(os.path.dirname(notify_destination), "hook_payload.py")
+shutil.copy2(payload_source, payload_destination)
+try:
+    py_compile.compile(payload_destination, doraise=True)
+except (py_compile.PyCompileError, OSError):
+    pass  # The first hook writes the bytecode cache instead
+
+# Optional resident relay (hook_relay.py) and the client notify.sh sources to reach it;
+# notify.sh takes the direct path without them
+for relay_name in ("hook_relay.py", "hook_relay.sh"):
+    relay_source = os.path.join(os.path.dirname(notify_source), relay_name)
+    if os.path.exists(relay_source):
+        shutil.copy2(relay_source, os.path.join(os.path.dirname(notify_destination), relay_name))
+
 descriptor, temporary_path = tempfile.mkstemp(prefix=".settings.json.juggler-", dir=settings_directory)
 try:
     with os.fdopen(descriptor, "w") as f:
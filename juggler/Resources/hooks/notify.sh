@@ -5,125 +5,40 @@
 EVENT="$1"
 JUGGLER_PORT="${JUGGLER_PORT:-7483}"
 
-# Read raw JSON input from stdin (Claude Code passes hook data via stdin)
-HOOK_INPUT=$(cat)
-
-ITERM_SESSION_ID="${ITERM_SESSION_ID:-}"
-KITTY_WINDOW_ID="${KITTY_WINDOW_ID:-}"
-KITTY_LISTEN_ON="${KITTY_LISTEN_ON:-}"
-KITTY_PID="${KITTY_PID:-}"
-WEZTERM_PANE="${WEZTERM_PANE:-}"
-
-if [ -n "$KITTY_WINDOW_ID" ]; then
-    TERMINAL_TYPE="kitty"
-    TERMINAL_SESSION_ID="$KITTY_WINDOW_ID"
-elif [ -n "$ITERM_SESSION_ID" ]; then
-    TERMINAL_TYPE="iterm2"
-    TERMINAL_SESSION_ID="$ITERM_SESSION_ID"
-elif [ -n "$WEZTERM_PANE" ]; then
-    TERMINAL_TYPE="wezterm"
-    TERMINAL_SESSION_ID="$WEZTERM_PANE"
-else
-    TERMINAL_TYPE=""
-    TERMINAL_SESSION_ID=""
+HOOK_DIR="${0%/*}"
+
+# Resident relay, opt-in with JUGGLER_HOOK_RELAY=1 (see hook_relay.sh, installed next to
+# this script): once it has taken the event, skip the tmux/python3/curl path below.
+if [ "${JUGGLER_HOOK_RELAY:-0}" = "1" ] && [ -f "$HOOK_DIR/hook_relay.sh" ]; then
+    . "$HOOK_DIR/hook_relay.sh"
+    if relay_handoff claude-code; then
+        exit 0
+    fi
 fi
 
-TMUX_PANE_ID="${TMUX_PANE:-}"
 TMUX_SESSION_NAME=""
-if [ -n "$TMUX_PANE_ID" ] && command -v tmux >/dev/null 2>&1; then
-    TMUX_SESSION_NAME=$(tmux display-message -p -t "$TMUX_PANE_ID" '#{session_name}' 2>/dev/null || echo "")
-fi
-
-GIT_BRANCH=$(git -C "$PWD" rev-parse --abbrev-ref HEAD 2>/dev/null || echo "")
-GIT_REPO=$(basename "$(git -C "$PWD" rev-parse --show-toplevel 2>/dev/null)" 2>/dev/null || echo "")
-
-# SSH detection: $SSH_CONNECTION is set by sshd for any interactive ssh session.
-REMOTE_HOST=""
-if [ -n "${SSH_CONNECTION:-}" ]; then
-    REMOTE_USER="${USER:-$(whoami 2>/dev/null)}"
-    REMOTE_HOSTNAME="${HOSTNAME:-$(hostname -s 2>/dev/null || hostname 2>/dev/null || echo unknown)}"
-    # Strip the FQDN suffix from the host only — not the user, which may contain dots.
-    REMOTE_HOST="${REMOTE_USER}@${REMOTE_HOSTNAME%%.*}"
+if [ -n "${TMUX_PANE:-}" ] && command -v tmux >/dev/null 2>&1; then
+    TMUX_SESSION_NAME=$(tmux display-message -p -t "$TMUX_PANE" '#{session_name}' 2>/dev/null || echo "")
 fi
-
-# Pass all data safely via environment variables (avoids shell injection in heredoc)
-export JUGGLER_HOOK_INPUT="$HOOK_INPUT"
-export JUGGLER_EVENT="$EVENT"
-export JUGGLER_TERMINAL_SID="$TERMINAL_SESSION_ID"
-export JUGGLER_TERMINAL_TYPE="$TERMINAL_TYPE"
-export JUGGLER_KITTY_LISTEN_ON="$KITTY_LISTEN_ON"
-export JUGGLER_KITTY_PID="$KITTY_PID"
-export JUGGLER_CWD="$PWD"
-export JUGGLER_GIT_BRANCH="$GIT_BRANCH"
-export JUGGLER_GIT_REPO="$GIT_REPO"
-export JUGGLER_TMUX_PANE="$TMUX_PANE_ID"
 export JUGGLER_TMUX_SESSION="$TMUX_SESSION_NAME"
-export JUGGLER_REMOTE_HOST="$REMOTE_HOST"
-
-# Build unified payload using Python (quoted heredoc prevents shell expansion)
-python3 << 'PYTHON' | curl -s -X POST "http://localhost:${JUGGLER_PORT}/hook" \
-    -H "Content-Type: application/json" \
-    -d @- \
-    --noproxy '*' \
-    --connect-timeout 1 \
-    --max-time 2 \
-    >/dev/null 2>&1 || true
-import json
-import os
-
-# Parse hook input from environment (safe - no shell interpolation)
-# Only extract fields Juggler needs; raw hookInput can be very large
-# (e.g. PostToolUse includes full tool_input/tool_result)
-hook_input = {}
-raw = os.environ.get("JUGGLER_HOOK_INPUT", "")
-if raw.strip():
-    try:
-        full = json.loads(raw)
-        for key in ("session_id", "transcript_path", "tool_name"):
-            if key in full:
-                hook_input[key] = full[key]
-    except json.JSONDecodeError:
-        pass
 
-terminal_info = {
-    "sessionId": os.environ.get("JUGGLER_TERMINAL_SID", ""),
-    "cwd": os.environ.get("JUGGLER_CWD", "")
+# POST the payload the builder prints. It prints nothing for an event that would not
+# change Juggler's state (see "Coalescing" in docs/tech/hooks.md), and then curl is
+# never started.
+post_payload() {
+    IFS= read -r PAYLOAD || [ -n "$PAYLOAD" ] || return 0
+    curl -s -X POST "http://localhost:${JUGGLER_PORT}/hook" \
+        -H "Content-Type: application/json" \
+        -d @- \
+        --noproxy '*' \
+        --connect-timeout 1 \
+        --max-time 2 \
+        <<< "$PAYLOAD" >/dev/null 2>&1 || true
 }
 
-terminal_type = os.environ.get("JUGGLER_TERMINAL_TYPE", "")
-if terminal_type:
-    terminal_info["terminalType"] = terminal_type
-
-kitty_listen_on = os.environ.get("JUGGLER_KITTY_LISTEN_ON", "")
-if kitty_listen_on:
-    terminal_info["kittyListenOn"] = kitty_listen_on
-
-kitty_pid = os.environ.get("JUGGLER_KITTY_PID", "")
-if kitty_pid:
-    terminal_info["kittyPid"] = kitty_pid
-
-payload = {
-    "agent": "claude-code",
-    "event": os.environ.get("JUGGLER_EVENT", ""),
-    "hookInput": hook_input,
-    "terminal": terminal_info,
-    "git": {
-        "branch": os.environ.get("JUGGLER_GIT_BRANCH", ""),
-        "repo": os.environ.get("JUGGLER_GIT_REPO", "")
-    }
-}
-
-tmux_pane = os.environ.get("JUGGLER_TMUX_PANE", "")
-tmux_session = os.environ.get("JUGGLER_TMUX_SESSION", "")
-if tmux_pane:
-    tmux_info = {"pane": tmux_pane}
-    if tmux_session:
-        tmux_info["sessionName"] = tmux_session
-    payload["tmux"] = tmux_info
-
-remote_host = os.environ.get("JUGGLER_REMOTE_HOST", "")
-if remote_host:
-    payload["remoteHost"] = remote_host
-
-print(json.dumps(payload))
-PYTHON
+# Build the unified payload with hook_payload.py, installed next to this script. It runs
+# isolated from site-packages and the user's environment (-I -S) and loads its cached
+# bytecode, so it costs little more than interpreter startup. It streams the hook JSON
+# from stdin and reads the terminal environment itself.
+python3 -I -S -c 'import sys; sys.path.append(sys.argv[1]); import hook_payload; hook_payload.claude_code(*sys.argv[2:])' \
+    "$HOOK_DIR" "$EVENT" "$PWD" | post_payload
@@ -8,33 +8,1305 @@ Event-driven architecture: pushes focus and terminal_info events.
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import heapq
 import json
 import os
 import signal
 import socket
+import struct
 import sys
+import time
+import weakref
+from collections import Counter, deque
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
+
+# Imported by load_iterm2(), after the control socket is already listening:
+# the library pulls in websockets and protobuf and is the slowest part of a
+# cold start. Annotations name it freely (they are never evaluated).
+iterm2: Any = None
+
+# Wall-clock time the bridge spawned this process (seconds since the epoch),
+# so the ready line can include interpreter start-up.
+SPAWNED_AT_ENV = "JUGGLER_DAEMON_SPAWNED_AT"
+SCRIPT_STARTED_AT = time.time()
+
+# Upper bound for a single request frame. The socket used to be read with one
+# 64 KiB recv, silently truncating anything larger; frames are now reassembled
+# up to this size and rejected beyond it.
+MAX_FRAME_BYTES = 1 << 20
+# A first request without its newline is parsed only once the client has sent
+# nothing more for this long (or hung up), not after every recv
+UNTERMINATED_FRAME_GRACE_SECONDS = 0.005
+
+# Wire formats a client can pick with `hello`. Framing is "newline" (the
+# default) or "length": a 4-byte big-endian payload length before every
+# message. Encoding is "json" (always available) or "msgpack" (length framing
+# only, and only where the msgpack module is installed).
+FRAMINGS = ("newline", "length")
+LENGTH_PREFIX = struct.Struct(">I")
+PROTOCOL_VERSION = 2
+
+# Commands allowed inside a `batch`, and how many of them may await iTerm2 at
+# once unless the request sets its own `max_concurrency`.
+BATCHABLE_COMMANDS = frozenset({"activate", "highlight", "reset", "get_session_info"})
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Requests one multiplexed connection may have running at once. At the cap the
+# daemon stops reading from that connection until one finishes.
+MAX_MULTIPLEX_IN_FLIGHT = 64
+
+# Commands answered while the daemon is still warming up (ping reports the
+# phase); every other command waits until the app model and index are loaded.
+WARMING_COMMANDS = frozenset({"ping", "stats", "trace_start", "trace_stop"})
+
+# Per-subscriber outbound queue bound and what to do when a slow reader fills
+# it: "drop_oldest" discards the oldest queued event, "disconnect" closes the
+# subscription so the client reconnects and resyncs.
+DEFAULT_SUBSCRIBER_QUEUE_SIZE = 256
+OVERFLOW_POLICIES = ("drop_oldest", "disconnect")
+
+
+# Lifecycle watchers fall back to polling at this interval when the platform
+# has no usable process-exit or file-system notification.
+POLL_FALLBACK_SECONDS = 5
+
+# Recent events kept for subscribers that reconnect with since_seq
+REPLAY_RING_SIZE = 1024
+
+
+class ReadinessWatch:
+    """A file descriptor that becomes readable when a watched condition fires.
+
+    `kqueue`, when given, owns `fd` (its fileno) and is closed instead of it.
+    """
+
+    def __init__(self, fd: int, kqueue: Any = None) -> None:
+        self.fd: int = fd
+        self.kqueue = kqueue
+
+    async def wait(self) -> None:
+        """Park until the descriptor is readable - no timers involved."""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(self.fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_reader(self.fd)
+        self.drain()
+
+    def drain(self) -> None:
+        """Consume pending notifications so the next wait() blocks again."""
+
+    def close(self) -> None:
+        if self.kqueue is not None:
+            self.kqueue.close()
+            return
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class ProcessExitWatch(ReadinessWatch):
+    """Readable once process `pid` exits: a pidfd on Linux, kqueue EVFILT_PROC on macOS/BSD."""
+
+    @classmethod
+    def open(cls, pid: int) -> Optional[ProcessExitWatch]:
+        """Return a watch for `pid`, or None if the platform has no exit notification.
+
+        A pid that is already gone yields a watch that is immediately ready.
+        """
+        if hasattr(os, "pidfd_open"):
+            try:
+                return cls(os.pidfd_open(pid))
+            except ProcessLookupError:
+                return cls(cls._ready_fd())
+            except OSError:
+                pass  # Kernel without pidfd support
+        import select
+        if hasattr(select, "kqueue"):
+            kqueue = select.kqueue()
+            try:
+                kqueue.control([select.kevent(
+                    pid, filter=select.KQ_FILTER_PROC,
+                    flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT, fflags=select.KQ_NOTE_EXIT
+                )], 0, 0)
+            except ProcessLookupError:
+                kqueue.close()
+                return cls(cls._ready_fd())
+            except OSError:
+                kqueue.close()
+                return None
+            return cls(kqueue.fileno(), kqueue)
+        return None
+
+    @staticmethod
+    def _ready_fd() -> int:
+        """A descriptor that is readable right away (EOF on an empty pipe)."""
+        read_fd, write_fd = os.pipe()
+        os.close(write_fd)
+        return read_fd
+
+
+class DirectoryWatch(ReadinessWatch):
+    """Readable when entries in a directory are created, removed or renamed.
+
+    Uses inotify on Linux and kqueue EVFILT_VNODE on macOS/BSD.
+    """
+
+    # inotify(7): IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    INOTIFY_MASK = 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+
+    def __init__(self, fd: int, kqueue: Any = None, dir_fd: Optional[int] = None) -> None:
+        super().__init__(fd, kqueue)
+        self.dir_fd: Optional[int] = dir_fd
+
+    @classmethod
+    def open(cls, directory: Path) -> Optional[DirectoryWatch]:
+        """Return a watch on `directory`, or None if no notification mechanism works."""
+        if sys.platform.startswith("linux"):
+            return cls._open_inotify(directory)
+        import select
+        if hasattr(select, "kqueue"):
+            try:
+                dir_fd = os.open(str(directory), getattr(os, "O_EVTONLY", os.O_RDONLY))
+            except OSError:
+                return None
+            kqueue = select.kqueue()
+            try:
+                kqueue.control([select.kevent(
+                    dir_fd, filter=select.KQ_FILTER_VNODE,
+                    flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+                    fflags=select.KQ_NOTE_WRITE | select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME
+                )], 0, 0)
+            except OSError:
+                kqueue.close()
+                os.close(dir_fd)
+                return None
+            return cls(kqueue.fileno(), kqueue, dir_fd)
+        return None
+
+    @classmethod
+    def _open_inotify(cls, directory: Path) -> Optional[DirectoryWatch]:
+        import ctypes
+        import ctypes.util
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), cls.INOTIFY_MASK) < 0:
+            os.close(fd)
+            return None
+        return cls(fd)
+
+    def drain(self) -> None:
+        if self.kqueue is not None:
+            self.kqueue.control(None, 16, 0)
+            return
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        super().close()
+        if self.dir_fd is not None:
+            os.close(self.dir_fd)
+
+
+def load_iterm2() -> Any:
+    """Import the iterm2 library on first use and return it."""
+    global iterm2
+    if iterm2 is None:
+        import iterm2 as module
+        iterm2 = module
+    return iterm2
+
+
+class StartupClock:
+    """Wall-clock phase timings from spawn to ready, reported on the ready line.
+
+    Each lap() closes the phase that began at the previous lap (or at
+    `started_at`), so the phases add up to the total.
+    """
+
+    def __init__(self, started_at: float) -> None:
+        self.started_at: float = started_at
+        self.last: float = started_at
+        self.phases: dict[str, float] = {}
+
+    @classmethod
+    def from_spawn(cls) -> StartupClock:
+        """Start at the bridge's spawn time when it exported one, else at script start."""
+        try:
+            spawned_at = float(os.environ.get(SPAWNED_AT_ENV, ""))
+        except ValueError:
+            return cls(SCRIPT_STARTED_AT)
+        if not 0 < spawned_at <= SCRIPT_STARTED_AT:
+            return cls(SCRIPT_STARTED_AT)  # Clock skew or a stale value: don't report nonsense
+        clock = cls(spawned_at)
+        clock.lap("interpreter", SCRIPT_STARTED_AT)
+        return clock
+
+    def lap(self, phase: str, at: Optional[float] = None) -> None:
+        at = time.time() if at is None else at
+        self.phases[phase] = self.phases.get(phase, 0.0) + at - self.last
+        self.last = at
+
+    def timings_ms(self) -> dict[str, float]:
+        timings = {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()}
+        timings["total"] = round((self.last - self.started_at) * 1000, 1)
+        return timings
+
+
+# Latency samples kept per command (and for event-loop lag) for percentiles.
+STATS_SAMPLE_LIMIT = 1024
+# Optional JSON-lines stats dump: file path, and seconds between snapshots.
+STATS_FILE_ENV = "JUGGLER_DAEMON_STATS_FILE"
+STATS_INTERVAL_ENV = "JUGGLER_DAEMON_STATS_INTERVAL"
+
+# The command whose handling triggered the current iTerm2 round trip. Tasks
+# and loop callbacks inherit it, so highlight flushes and resets count
+# against "highlight"; monitor traffic stays unattributed.
+current_command: contextvars.ContextVar[str] = contextvars.ContextVar("current_command", default="(unattributed)")
+
+
+# Layout notifications arrive in bursts (closing a window fires one per tab
+# and pane); they are coalesced into a single diff pass this long after the first.
+LAYOUT_DEBOUNCE_SECONDS = 0.05
+
+# Opt-in tracing: set to a file path to record from startup (written when the
+# daemon stops), or use the trace_start/trace_stop commands. The ring keeps
+# the most recent TRACE_RING_SIZE events.
+TRACE_FILE_ENV = "JUGGLER_DAEMON_TRACE"
+TRACE_RING_SIZE = 100_000
+
+
+class _NullSpan:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer: Tracer, name: str, category: str, args: dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        end = time.perf_counter()
+        args = self.args
+        if exc_type is not None:
+            args = {**args, "error": exc_type.__name__}
+        self.tracer.record({
+            "name": self.name, "cat": self.category, "ph": "X",
+            "ts": self.tracer.micros(self.start), "dur": round((end - self.start) * 1e6, 3),
+            **self.tracer.track(), "args": args
+        })
+
+
+class Tracer:
+    """Ring-buffered Chrome trace-event recorder (loads in Perfetto / chrome://tracing).
+
+    Spans are "X" (complete) events. Each asyncio task gets its own track, so
+    concurrent requests don't interleave on one timeline row. Track names are
+    kept for at most as many tracks as the ring holds events, and a dump names
+    only the tracks its events use. While disabled, span() returns a shared
+    no-op context manager.
+    """
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.path: Optional[str] = None
+        self.events: deque[dict[str, Any]] = deque(maxlen=TRACE_RING_SIZE)
+        self.origin: float = time.perf_counter()
+        self.track_ids: weakref.WeakKeyDictionary[asyncio.Task[Any], int] = weakref.WeakKeyDictionary()
+        # Track name metadata by tid, least recently used first
+        self.track_names: dict[int, dict[str, Any]] = {}
+        self.next_tid: int = 1
+
+    def start(self, path: str, ring_size: int = TRACE_RING_SIZE) -> None:
+        self.path = path
+        self.events = deque(maxlen=ring_size)
+        self.track_ids.clear()
+        self.track_names.clear()
+        self.enabled = True
+
+    def stop(self) -> int:
+        """Stop recording and write the trace file. Returns the number of events written."""
+        self.enabled = False
+        count = len(self.events)
+        if self.path:
+            used = {event.get("tid") for event in self.events}
+            names = [name for tid, name in self.track_names.items() if tid in used]
+            with open(self.path, "w") as file:
+                json.dump({"traceEvents": names + list(self.events), "displayTimeUnit": "ms"}, file)
+        self.events.clear()
+        return count
+
+    def span(self, name: str, category: str = "daemon", **args: Any) -> Any:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def instant(self, name: str, category: str = "daemon", **args: Any) -> None:
+        if self.enabled:
+            self.record({
+                "name": name, "cat": category, "ph": "i", "s": "t",
+                "ts": self.micros(time.perf_counter()), **self.track(), "args": args
+            })
+
+    def record(self, event: dict[str, Any]) -> None:
+        self.events.append(event)
+
+    def micros(self, perf_counter: float) -> float:
+        return round((perf_counter - self.origin) * 1e6, 3)
+
+    def track(self) -> dict[str, int]:
+        """pid/tid for the running task, naming the track the first time it is seen."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            return {"pid": os.getpid(), "tid": 0}
+        tid = self.track_ids.get(task)
+        if tid is None:
+            tid = self.track_ids[task] = self.next_tid
+            self.next_tid += 1
+        # Least recently used first. Each of the ring's maxlen newer tracks has
+        # recorded an event since the first one last did, so by the time it is
+        # evicted none of its events are left in the ring.
+        name = self.track_names.pop(tid, None) or {
+            "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+            "args": {"name": task.get_name()}
+        }
+        self.track_names[tid] = name
+        if len(self.track_names) > (self.events.maxlen or TRACE_RING_SIZE):
+            del self.track_names[next(iter(self.track_names))]
+        return {"pid": os.getpid(), "tid": tid}
+
+
+class DaemonStats:
+    """Counters and latency samples behind the `stats` command."""
+
+    def __init__(self) -> None:
+        self.started: float = time.monotonic()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear every counter and sample; uptime keeps running."""
+        self.command_latency: dict[str, deque[float]] = {}
+        self.command_counts: Counter[str] = Counter()
+        self.command_errors: Counter[str] = Counter()
+        self.api_calls: Counter[str] = Counter()
+        self.loop_lag: deque[float] = deque(maxlen=STATS_SAMPLE_LIMIT)
+        self.events_pushed: Counter[str] = Counter()
+        self.events_dropped: int = 0
+        self.events_coalesced: int = 0
+        self.events_replayed: int = 0
+        self.events_filtered: int = 0
+        self.events_throttled: int = 0
+        self.resyncs_required: int = 0
+        self.subscribers_disconnected: int = 0
+        self.monitor_restarts: Counter[str] = Counter()
+
+    def record_command(self, command: str, seconds: float, ok: bool) -> None:
+        samples = self.command_latency.get(command)
+        if samples is None:
+            samples = self.command_latency[command] = deque(maxlen=STATS_SAMPLE_LIMIT)
+        samples.append(seconds)
+        self.command_counts[command] += 1
+        if not ok:
+            self.command_errors[command] += 1
+
+    def sample_loop_lag(self) -> None:
+        """Measure how long a callback queued now waits for the loop to run it.
+
+        Sampled while handling requests rather than on a timer, so an idle
+        daemon is never woken just to take a measurement.
+        """
+        loop = asyncio.get_running_loop()
+        queued = loop.time()
+        loop.call_soon(lambda: self.loop_lag.append(loop.time() - queued))
+
+    def count_api_calls(self, connection: iterm2.Connection) -> None:
+        """Wrap the connection's send path to count round trips per command."""
+        send = getattr(connection, "async_send_message", None)
+        if send is None:
+            return
+
+        async def counted(message: Any) -> Any:
+            self.api_calls[current_command.get()] += 1
+            return await send(message)
 
-import iterm2
+        connection.async_send_message = counted
+
+    @staticmethod
+    def _percentiles(samples: Any) -> dict[str, Any]:
+        ordered = sorted(samples)
+        if not ordered:
+            return {"count": 0}
+
+        def rank(fraction: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+        return {
+            "count": len(ordered),
+            "p50_ms": rank(0.50),
+            "p95_ms": rank(0.95),
+            "p99_ms": rank(0.99),
+            "max_ms": round(ordered[-1] * 1000, 3)
+        }
+
+    def snapshot(self, subscribers: list[EventSubscriber], calls: CallScheduler) -> dict[str, Any]:
+        commands = {
+            command: {
+                **self._percentiles(samples),
+                "total": self.command_counts[command],
+                "errors": self.command_errors[command],
+                "api_calls": self.api_calls[command]
+            }
+            for command, samples in self.command_latency.items()
+        }
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "commands": commands,
+            "api_calls": dict(self.api_calls),
+            "loop_lag": self._percentiles(self.loop_lag),
+            "subscribers": [
+                {"queue_depth": len(subscriber.queue), "max_queue": subscriber.max_queue,
+                 "dropped": subscriber.dropped, "filter": subscriber.filter.spec}
+                for subscriber in subscribers
+            ],
+            "events": {
+                "pushed": dict(self.events_pushed),
+                "dropped": self.events_dropped,
+                "coalesced": self.events_coalesced,
+                "replayed": self.events_replayed,
+                "filtered": self.events_filtered,
+                "throttled": self.events_throttled,
+                "resyncs_required": self.resyncs_required,
+                "subscribers_disconnected": self.subscribers_disconnected
+            },
+            "monitor_restarts": dict(self.monitor_restarts),
+            "scheduler": {
+                "running": dict(calls.running),
+                "waiting": {priority: len(queue) for priority, queue in calls.waiting.items()}
+            }
+        }
+
+
+# Work on the shared iTerm2 connection, in strict precedence order, and how
+# many calls of each class may be in flight at once.
+CALL_PRIORITIES = ("user", "visual", "background")
+CALL_LIMITS = {"user": 2, "visual": 4, "background": 4}
+
+
+class CallScheduler:
+    """Orders iTerm2 API calls by priority over the single websocket.
+
+    - "user" (activate) always goes first: while one is queued or running,
+      no lower-priority call starts.
+    - "visual" (highlight writes and resets) goes before "background".
+    - "background" (info lookups, layout refreshes) runs only when nothing
+      more urgent is waiting.
+
+    Each class has its own concurrency cap. A keyed request that is still
+    queued when a newer request with the same key arrives is superseded: it
+    never runs, and its caller gets the newer request's result. If the
+    caller holding the queue entry is cancelled, the entry stays queued for
+    the callers that superseded it.
+    """
+
+    def __init__(self, limits: dict[str, int], tracer: Tracer) -> None:
+        self.tracer: Tracer = tracer
+        self.limits: dict[str, int] = dict(limits)
+        self.running: dict[str, int] = {priority: 0 for priority in CALL_PRIORITIES}
+        self.waiting: dict[str, deque[dict[str, Any]]] = {priority: deque() for priority in CALL_PRIORITIES}
+        self.queued_by_key: dict[Any, dict[str, Any]] = {}
+
+    async def run(self, priority: str, factory: Callable[[], Awaitable[Any]], key: Any = None) -> Any:
+        """Await `factory()` once a `priority` slot is free."""
+        loop = asyncio.get_running_loop()
+        if key is not None and key in self.queued_by_key:
+            entry = self.queued_by_key[key]
+            entry["factory"] = factory
+            if entry["shared"] is None:
+                entry["shared"] = loop.create_future()
+            return await asyncio.shield(entry["shared"])
+
+        if self._can_start(priority) and not self.waiting[priority]:
+            self.running[priority] += 1
+            try:
+                return await factory()
+            finally:
+                self._release(priority)
+
+        entry: dict[str, Any] = {"factory": factory, "slot": loop.create_future(), "shared": None}
+        self.waiting[priority].append(entry)
+        if key is not None:
+            self.queued_by_key[key] = entry
+        try:
+            with self.tracer.span(f"queued ({priority})", "scheduler"):
+                await entry["slot"]
+        except asyncio.CancelledError:
+            if entry["shared"] is not None:
+                # Callers that superseded this request await its result: hand
+                # the entry to a task of its own rather than fail them too
+                if entry["slot"].cancelled():
+                    entry["slot"] = loop.create_future()
+                    if entry not in self.waiting[priority]:
+                        self.waiting[priority].appendleft(entry)  # Skipped by _dispatch meanwhile
+                        self._dispatch()
+                asyncio.create_task(self._run_orphan(priority, key, entry))
+                raise
+            if entry in self.waiting[priority]:
+                self.waiting[priority].remove(entry)
+            elif entry["slot"].done() and not entry["slot"].cancelled():
+                self._release(priority)
+            self._forget(key, entry)
+            raise
+        self._forget(key, entry)
+        return await self._call(priority, entry)
+
+    async def _run_orphan(self, priority: str, key: Any, entry: dict[str, Any]) -> None:
+        """Finish a queued entry whose caller was cancelled, for its superseders."""
+        try:
+            await entry["slot"]
+        except asyncio.CancelledError:
+            if entry in self.waiting[priority]:
+                self.waiting[priority].remove(entry)
+            elif entry["slot"].done() and not entry["slot"].cancelled():
+                self._release(priority)
+            entry["shared"].cancel()
+            raise
+        finally:
+            self._forget(key, entry)
+        try:
+            await self._call(priority, entry)
+        except Exception:
+            pass  # Already passed on to the superseding callers through "shared"
+
+    def _forget(self, key: Any, entry: dict[str, Any]) -> None:
+        if key is not None and self.queued_by_key.get(key) is entry:
+            del self.queued_by_key[key]
+
+    async def _call(self, priority: str, entry: dict[str, Any]) -> Any:
+        """Run a queued entry that holds a slot, and settle its shared future."""
+        try:
+            result = await entry["factory"]()
+        except BaseException as e:
+            if entry["shared"] is not None:
+                entry["shared"].set_exception(e)
+            raise
+        else:
+            if entry["shared"] is not None:
+                entry["shared"].set_result(result)
+            return result
+        finally:
+            self._release(priority)
+
+    def _can_start(self, priority: str) -> bool:
+        if self.running[priority] >= self.limits[priority]:
+            return False
+        for higher in CALL_PRIORITIES[:CALL_PRIORITIES.index(priority)]:
+            if self.waiting[higher]:
+                return False
+        return priority == "user" or self.running["user"] == 0
+
+    def _release(self, priority: str) -> None:
+        self.running[priority] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for candidate in CALL_PRIORITIES:
+            queue = self.waiting[candidate]
+            while queue and self._can_start(candidate):
+                entry = queue.popleft()
+                if entry["slot"].cancelled():
+                    continue  # Its caller was cancelled and has yet to run its cleanup in run()
+                self.running[candidate] += 1
+                entry["slot"].set_result(None)
+
+
+# Highlight requests for the same session that arrive within one frame are
+# merged into a single profile write.
+HIGHLIGHT_FRAME_SECONDS = 0.016
+DEFAULT_HIGHLIGHT_COLOR = (255, 165, 0)
+RESET_BACKGROUND_ESCAPE = b'\033]1337;SetColors=bg=default\a'
+
+
+class HighlightScheduler:
+    """Owns every pending highlight write and reset for the daemon.
+
+    Requests for one session within HIGHLIGHT_FRAME_SECONDS become a single
+    profile write, and writes that would not change the applied colour are
+    skipped. All resets live in one deadline heap served by a single loop
+    timer, instead of a task per tab and per pane; resets due within one
+    frame of each other go out as one write per session. Each session's
+    original background is captured once, while it is not highlighted, and
+    cached until its profile changes. A change during a highlight drops the
+    cache only once the reset has restored it. A pane whose background
+    can't be read is not highlighted, so no reset can paint a guessed colour.
+    """
+
+    def __init__(self, connection: iterm2.Connection, calls: CallScheduler, tracer: Tracer) -> None:
+        self.connection: iterm2.Connection = connection
+        self.calls: CallScheduler = calls
+        self.tracer: Tracer = tracer
+        # uuid -> {"session", "tab", "pane", "done", "waiters"} awaiting the frame flush
+        self.pending: dict[str, dict[str, Any]] = {}
+        self.flushes: set[asyncio.Task] = set()
+        # What is on screen right now: tab_id / uuid -> highlight colour
+        self.applied_tab: dict[str, tuple[int, int, int]] = {}
+        self.applied_pane: dict[str, tuple[int, int, int]] = {}
+        self.original_bg: dict[str, iterm2.Color] = {}
+        # Cached backgrounds whose profile changed mid-highlight, dropped after the reset
+        self.stale_bg: set[str] = set()
+        self.profile_monitors: dict[str, asyncio.Task] = {}
+        # ("tab", tab_id) / ("pane", uuid) -> (deadline, session); the heap may
+        # hold superseded deadlines, which are skipped when they surface.
+        self.deadlines: dict[tuple[str, str], tuple[float, iterm2.Session]] = {}
+        self.heap: list[tuple[float, tuple[str, str]]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.timer_when: Optional[float] = None
+
+    async def highlight(
+        self, session: iterm2.Session, tab_config: Optional[dict[str, Any]], pane_config: Optional[dict[str, Any]]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        uuid = session.session_id
+        pending = self.pending.get(uuid)
+        if pending is None:
+            pending = {"session": session, "done": loop.create_future(), "waiters": 0}
+            self.pending[uuid] = pending
+            loop.call_later(HIGHLIGHT_FRAME_SECONDS, self._start_flush, uuid)
+        # Latest request in the frame wins
+        pending["tab"] = tab_config
+        pending["pane"] = pane_config
+        pending["waiters"] += 1
+        try:
+            await asyncio.shield(pending["done"])
+        finally:
+            pending["waiters"] -= 1
+
+    def _start_flush(self, uuid: str) -> None:
+        task = asyncio.create_task(self._flush(uuid))
+        self.flushes.add(task)
+        task.add_done_callback(self.flushes.discard)
+
+    async def _flush(self, uuid: str) -> None:
+        pending = self.pending.pop(uuid)
+        session: iterm2.Session = pending["session"]
+        tab_config, pane_config = pending["tab"], pending["pane"]
+        tab = session.tab
+        tab_id = tab.tab_id if tab else None
+        try:
+            change = iterm2.LocalWriteOnlyProfile()
+            dirty = False
+            resets: list[tuple[tuple[str, str], float]] = []
+
+            if tab_config and tab_config.get("enabled") and tab_id:
+                color = tuple(tab_config.get("color", DEFAULT_HIGHLIGHT_COLOR))
+                if self.applied_tab.get(tab_id) != color:
+                    change.set_tab_color(iterm2.Color(*color))
+                    change.set_use_tab_color(True)
+                    dirty = True
+                    self.applied_tab[tab_id] = color
+                resets.append((("tab", tab_id), tab_config.get("duration", 2.0)))
+
+            if pane_config and pane_config.get("enabled"):
+                color = tuple(pane_config.get("color", DEFAULT_HIGHLIGHT_COLOR))
+                if uuid not in self.original_bg and uuid not in self.applied_pane:
+                    background = await self._capture_background(session)
+                    if background is not None:
+                        self.original_bg[uuid] = background
+                # Without the original background there is nothing to reset to;
+                # the next highlight tries the capture again
+                if uuid in self.original_bg:
+                    if self.applied_pane.get(uuid) != color:
+                        change.set_background_color(iterm2.Color(*color))
+                        dirty = True
+                        self.applied_pane[uuid] = color
+                    resets.append((("pane", uuid), pane_config.get("duration", 2.0)))
+
+            # After the background capture, so the tab and pane deadlines match
+            for key, duration in resets:
+                self._schedule(key, duration, session)
+
+            if dirty:
+                await self.calls.run("visual", lambda: self._traced(
+                    "session.async_set_profile_properties", session.async_set_profile_properties(change)
+                ))
+        except Exception as e:
+            # Unknown on-screen state - let the next highlight write unconditionally
+            if tab_id:
+                self.applied_tab.pop(tab_id, None)
+            self.applied_pane.pop(uuid, None)
+            pending["done"].set_exception(e)
+            if not pending["waiters"]:
+                # Every caller was cancelled: nobody will retrieve the error
+                pending["done"].exception()
+                print(f"Highlight ({uuid}) failed: {e}", file=sys.stderr)
+        else:
+            pending["done"].set_result(None)
+
+    async def _capture_background(self, session: iterm2.Session) -> Optional[iterm2.Color]:
+        """Read the session's own background, or None if it can't be read.
+        Only called while it is not highlighted."""
+        async def read() -> iterm2.Color:
+            with self.tracer.span("session.async_get_profile", "iterm2"):
+                profile = await session.async_get_profile()
+            with self.tracer.span("profile.async_get_background_color", "iterm2"):
+                return await profile.async_get_background_color()
+
+        try:
+            color = await self.calls.run("visual", read)
+        except Exception as e:
+            print(f"Background capture ({session.session_id}) failed: {e}", file=sys.stderr)
+            return None
+        uuid = session.session_id
+        if uuid not in self.profile_monitors:
+            self.profile_monitors[uuid] = asyncio.create_task(self._watch_profile(uuid))
+        return color
+
+    async def _watch_profile(self, uuid: str) -> None:
+        """Drop the cached background once the session switches profile."""
+        try:
+            async with iterm2.VariableMonitor(
+                self.connection, iterm2.VariableScopes.SESSION, "profileName", uuid
+            ) as monitor:
+                await monitor.async_get()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        finally:
+            # Without a live monitor the cache can't be trusted. While the pane is
+            # highlighted it is still the only record of the colour to restore.
+            if uuid in self.applied_pane:
+                self.stale_bg.add(uuid)
+            else:
+                self.original_bg.pop(uuid, None)
+            if self.profile_monitors.get(uuid) is asyncio.current_task():
+                del self.profile_monitors[uuid]
+
+    def _schedule(self, key: tuple[str, str], delay: float, session: iterm2.Session) -> None:
+        when = asyncio.get_running_loop().time() + delay
+        self.deadlines[key] = (when, session)
+        heapq.heappush(self.heap, (when, key))
+        self._arm()
+
+    def _arm(self) -> None:
+        """Point the single timer at the earliest live deadline."""
+        while self.heap and self.deadlines.get(self.heap[0][1], (None,))[0] != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        when = self.heap[0][0] if self.heap else None
+        if when == self.timer_when:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = asyncio.get_running_loop().call_at(when, self._on_timer) if when is not None else None
+        self.timer_when = when
+
+    def _on_timer(self) -> None:
+        self.timer = None
+        self.timer_when = None
+        # Take everything due within the next frame too, so a session's tab and
+        # pane resets share one write
+        horizon = asyncio.get_running_loop().time() + HIGHLIGHT_FRAME_SECONDS
+        due: dict[str, tuple[iterm2.Session, set[str]]] = {}
+        while self.heap and self.heap[0][0] <= horizon:
+            when, key = heapq.heappop(self.heap)
+            entry = self.deadlines.get(key)
+            if entry is None or entry[0] != when:
+                continue
+            del self.deadlines[key]
+            session = entry[1]
+            due.setdefault(session.session_id, (session, set()))[1].add(key[0])
+        for session, kinds in due.values():
+            asyncio.create_task(self._reset(session, kinds))
+        self._arm()
+
+    async def _reset(self, session: iterm2.Session, kinds: set[str]) -> None:
+        """Restore the tab colour and/or background of one session in a single write."""
+        uuid = session.session_id
+        tab = session.tab
+        tab_id = tab.tab_id if tab else None
+        reset = iterm2.LocalWriteOnlyProfile()
+        dirty = False
+        if "tab" in kinds and tab_id and self.applied_tab.pop(tab_id, None) is not None:
+            reset.set_use_tab_color(False)
+            dirty = True
+        if "pane" in kinds and self.applied_pane.pop(uuid, None) is not None:
+            reset.set_background_color(self.original_bg.get(uuid) or iterm2.Color(0, 0, 0))
+            dirty = True
+        if dirty:
+            await self._apply_with_retry(
+                session, reset, f"Highlight reset ({uuid})",
+                escape_fallback=RESET_BACKGROUND_ESCAPE if "pane" in kinds else None
+            )
+        if "pane" in kinds:
+            self._drop_stale_background(uuid)
+
+    def _drop_stale_background(self, uuid: str) -> None:
+        if uuid in self.stale_bg and uuid not in self.applied_pane:
+            self.stale_bg.discard(uuid)
+            self.original_bg.pop(uuid, None)
+
+    async def _apply_with_retry(
+        self, session: iterm2.Session, profile: iterm2.LocalWriteOnlyProfile,
+        label: str, escape_fallback: Optional[bytes] = None
+    ) -> None:
+        def write() -> Awaitable[Any]:
+            return self._traced("session.async_set_profile_properties", session.async_set_profile_properties(profile))
+
+        try:
+            await self.calls.run("visual", write)
+        except Exception as e:
+            print(f"{label} failed, retrying: {e}", file=sys.stderr)
+            try:
+                await asyncio.sleep(1)
+                await self.calls.run("visual", write)
+            except Exception as e2:
+                if escape_fallback:
+                    print(f"{label} retry failed, using escape sequence: {e2}", file=sys.stderr)
+                    try:
+                        await self.calls.run("visual", lambda: session.async_inject(escape_fallback))
+                    except Exception:
+                        print(f"All {label} attempts failed", file=sys.stderr)
+                else:
+                    print(f"{label} retry also failed: {e2}", file=sys.stderr)
+
+    async def _traced(self, name: str, call: Awaitable[Any]) -> Any:
+        with self.tracer.span(name, "iterm2"):
+            return await call
+
+    def clear_pane(self, uuid: str) -> None:
+        """Forget a pane highlight that was reset out of band (the `reset` command)."""
+        self.applied_pane.pop(uuid, None)
+        self.deadlines.pop(("pane", uuid), None)
+        self._drop_stale_background(uuid)
+        self._arm()
+
+    def close(self) -> None:
+        """Stop the reset timer and profile monitors of a connection that is gone."""
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = None
+        self.timer_when = None
+        for task in self.profile_monitors.values():
+            task.cancel()
+        self.profile_monitors.clear()
+
+    def forget_sessions(self, uuids: set[str]) -> None:
+        """Drop all state for sessions that no longer exist."""
+        for uuid in uuids:
+            self.clear_pane(uuid)
+            self.original_bg.pop(uuid, None)
+            self.stale_bg.discard(uuid)
+            task = self.profile_monitors.pop(uuid, None)
+            if task is not None:
+                task.cancel()
+
+
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def _json_dumps(message: Any) -> bytes:
+    return _JSON_ENCODER.encode(message).encode("utf-8")
+
+
+# Encoding name -> (dumps, loads), filled in by load_codecs()
+_codecs: Optional[dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]] = None
+
+
+def load_codecs() -> dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    """Encodings `hello` can offer, as (dumps, loads). The optional modules are
+    imported on the first negotiation, never on the cold-start path."""
+    global _codecs
+    if _codecs is None:
+        codecs = {"json": (_json_dumps, json.loads)}
+        try:
+            import orjson
+        except ImportError:
+            pass
+        else:
+            codecs["json"] = (orjson.dumps, orjson.loads)
+        try:
+            import msgpack
+        except ImportError:
+            pass
+        else:
+            codecs["msgpack"] = (
+                lambda message: msgpack.packb(message, use_bin_type=True),
+                lambda data: msgpack.unpackb(data, raw=False),
+            )
+        _codecs = codecs
+    return _codecs
+
+
+class WireFormat:
+    """How one connection frames and encodes its messages.
+
+    Connections start on NEWLINE_JSON; `hello` can switch them. `key`
+    identifies the bytes a message becomes, so pushed events are encoded once
+    per format in use and shared by every subscriber on it.
+    """
+
+    def __init__(
+        self, framing: str, encoding: str, codec: tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+    ) -> None:
+        self.framing: str = framing
+        self.encoding: str = encoding
+        self.dumps, self.loads = codec
+        self.key: tuple[str, str] = (framing, encoding)
+
+    def pack(self, message: dict[str, Any]) -> bytes:
+        payload = self.dumps(message)
+        if self.framing == "length":
+            return LENGTH_PREFIX.pack(len(payload)) + payload
+        return payload + b"\n"
+
+
+NEWLINE_JSON = WireFormat("newline", "json", (_json_dumps, json.loads))
+
+
+class PushedEvent:
+    """One numbered event, encoded on first use per wire format and then shared
+    by every subscriber using that format."""
+
+    def __init__(self, seq: int, event: dict[str, Any]) -> None:
+        self.seq: int = seq
+        self.event_type: str = event.get("event")
+        self.session_id: Optional[str] = event.get("session_id")
+        self.event: dict[str, Any] = event
+        self.messages: dict[tuple[str, str], bytes] = {}
+
+    def encoded(self, wire: WireFormat) -> bytes:
+        message = self.messages.get(wire.key)
+        if message is None:
+            message = self.messages[wire.key] = wire.pack({**self.event, "seq": self.seq})
+        return message
+
+
+class EventFilter:
+    """Which events a subscriber receives, and how often.
+
+    `spec` is the `filter` object of subscribe (or of a later `filter` request):
+    `events` limits event types, `session_ids` / `session_prefixes` limit
+    events that carry a session_id (bare UUIDs; a `w0t0p0:` prefix is
+    stripped), and `max_rate` caps events per second per type. Omitted keys
+    match everything. Raises ValueError on a malformed spec.
+    """
+
+    def __init__(self, spec: Optional[dict[str, Any]] = None) -> None:
+        spec = spec or {}
+        if not isinstance(spec, dict):
+            raise ValueError("filter must be an object")
+        unknown = set(spec) - {"events", "session_ids", "session_prefixes", "max_rate"}
+        if unknown:
+            raise ValueError(f"Unknown filter keys: {', '.join(sorted(unknown))}")
+        self.events: Optional[frozenset[str]] = self._strings(spec, "events")
+        ids = self._strings(spec, "session_ids")
+        self.session_ids: Optional[frozenset[str]] = (
+            frozenset(i.split(":", 1)[-1] for i in ids) if ids is not None else None
+        )
+        prefixes = self._strings(spec, "session_prefixes")
+        self.session_prefixes: Optional[tuple[str, ...]] = (
+            tuple(p.split(":", 1)[-1] for p in prefixes) if prefixes is not None else None
+        )
+        max_rate = spec.get("max_rate", {})
+        if not isinstance(max_rate, dict) or not all(
+            isinstance(rate, (int, float)) and not isinstance(rate, bool) and rate > 0 for rate in max_rate.values()
+        ):
+            raise ValueError("max_rate must map event types to positive numbers")
+        self.max_rate: dict[str, float] = dict(max_rate)
+        self.spec: dict[str, Any] = spec
+
+    @staticmethod
+    def _strings(spec: dict[str, Any], key: str) -> Optional[frozenset[str]]:
+        values = spec.get(key)
+        if values is None:
+            return None
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            raise ValueError(f"{key} must be a list of strings")
+        return frozenset(values)
+
+    def matches(self, event_type: str, session_id: Optional[str]) -> bool:
+        if self.events is not None and event_type not in self.events:
+            return False
+        if session_id is None or (self.session_ids is None and self.session_prefixes is None):
+            return True
+        if self.session_ids is not None and session_id in self.session_ids:
+            return True
+        return self.session_prefixes is not None and session_id.startswith(self.session_prefixes)
+
+
+def resync_marker(reason: str, wire: WireFormat) -> bytes:
+    """Tells a subscriber it missed events and must re-query the state it tracks."""
+    return wire.pack({"event": "resync_required", "reason": reason})
+
+
+class EventSubscriber:
+    """One event subscription with its own bounded outbound queue.
+
+    push() never awaits: a writer task drains the queue to the socket, so a
+    subscriber whose socket buffer is full only delays itself, never the
+    monitors or the other subscribers.
+    """
+
+    def __init__(
+        self, client: socket.socket, max_queue: int, overflow: str, stats: DaemonStats,
+        event_filter: EventFilter, wire: WireFormat = NEWLINE_JSON
+    ) -> None:
+        self.client: socket.socket = client
+        self.wire: WireFormat = wire
+        self.max_queue: int = max_queue
+        self.overflow: str = overflow
+        self.stats: DaemonStats = stats
+        self.filter: EventFilter = event_filter
+        # Rate-capped types: when the next event may go out, the latest held
+        # event per (type, session id) until then, and the timer that sends them
+        self.next_allowed: dict[str, float] = {}
+        self.held: dict[tuple[str, Optional[str]], PushedEvent] = {}
+        self.release_timers: dict[str, asyncio.TimerHandle] = {}
+        # (event type, session id, encoded message)
+        self.queue: deque[tuple[str, Optional[str], bytes]] = deque()
+        self.wakeup: asyncio.Event = asyncio.Event()
+        self.closed: bool = False
+        self.dropped: int = 0
+        # Set when an event was dropped; the writer sends resync_required next
+        self.resync_pending: bool = False
+
+    def offer(self, event: PushedEvent) -> bool:
+        """Queue `event` if the filter wants it now, hold it if its type is over
+        the rate cap. Returns False on overflow under the disconnect policy."""
+        if not self.filter.matches(event.event_type, event.session_id):
+            self.stats.events_filtered += 1
+            return True
+        rate = self.filter.max_rate.get(event.event_type)
+        if rate:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            allowed = self.next_allowed.get(event.event_type, 0.0)
+            if now < allowed:
+                # Only the latest per session is worth sending when the window opens
+                if self.held.pop((event.event_type, event.session_id), None) is not None:
+                    self.stats.events_throttled += 1
+                self.held[(event.event_type, event.session_id)] = event
+                if event.event_type not in self.release_timers:
+                    self.release_timers[event.event_type] = loop.call_at(
+                        allowed, self._release_held, event.event_type
+                    )
+                return True
+            self.next_allowed[event.event_type] = now + 1 / rate
+        return self.push(event.event_type, event.session_id, event.encoded(self.wire))
+
+    def _release_held(self, event_type: str) -> None:
+        self.release_timers.pop(event_type, None)
+        if self.closed:
+            return
+        due = [key for key in self.held if key[0] == event_type]
+        rate = self.filter.max_rate.get(event_type)
+        if rate:
+            self.next_allowed[event_type] = asyncio.get_running_loop().time() + 1 / rate
+        for key in due:
+            event = self.held.pop(key)
+            # The filter may have changed while the event was held
+            if self.filter.matches(event.event_type, event.session_id) and \
+                    not self.push(event.event_type, event.session_id, event.encoded(self.wire)):
+                print("Subscriber queue overflowed, disconnecting", file=sys.stderr)
+                self.stats.subscribers_disconnected += 1
+                self.close()
+                return
+
+    def push(self, event_type: str, session_id: Optional[str], message: bytes) -> bool:
+        """Queue one event, coalescing bursts. Returns False on overflow under the disconnect policy."""
+        if event_type == "session_terminated":
+            # Layout and termination monitors both report the same close
+            if any(queued[0] == event_type and queued[1] == session_id for queued in self.queue):
+                self.stats.events_coalesced += 1
+                return True
+        elif event_type in ("focus_changed", "terminal_info"):
+            # Only the latest focus (and latest info per session) matters
+            scoped = event_type == "terminal_info"
+            stale = [
+                queued for queued in self.queue
+                if queued[0] == event_type and (not scoped or queued[1] == session_id)
+            ]
+            for queued in stale:
+                self.queue.remove(queued)
+            self.stats.events_coalesced += len(stale)
+
+        if len(self.queue) >= self.max_queue:
+            if self.overflow == "disconnect":
+                return False
+            self.queue.popleft()
+            self.dropped += 1
+            self.stats.events_dropped += 1
+            self.resync_pending = True
+
+        self.queue.append((event_type, session_id, message))
+        self.wakeup.set()
+        return True
+
+    async def run_writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+                if self.resync_pending:
+                    self.resync_pending = False
+                    self.stats.resyncs_required += 1
+                    await loop.sock_sendall(self.client, resync_marker("overflow", self.wire))
+                    continue
+                _, _, message = self.queue.popleft()
+                await loop.sock_sendall(self.client, message)
+        except Exception:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop writing and hang up; the subscription handler notices EOF and cleans up."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self.held.clear()
+        for timer in self.release_timers.values():
+            timer.cancel()
+        self.release_timers.clear()
+        self.wakeup.set()
+        try:
+            self.client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
 
 
 class iTerm2Daemon:
-    def __init__(self, socket_path: str, connection: iterm2.Connection) -> None:
+    def __init__(
+        self,
+        socket_path: str,
+        connection: Optional[iterm2.Connection] = None,
+        startup: Optional[StartupClock] = None,
+    ) -> None:
         self.socket_path: Path = Path(socket_path)
-        self.connection: iterm2.Connection = connection
+        self.connection: Optional[iterm2.Connection] = None
         self.app: Optional[iterm2.App] = None
         self.server: Optional[socket.socket] = None
         self.socket_inode: int = 0
         self.running: bool = True
-        # Track active highlight reset tasks to cancel on new highlights
-        self.active_tab_reset_tasks: dict[str, asyncio.Task] = {}
-        self.active_pane_reset_tasks: dict[str, asyncio.Task] = {}
-        self.event_subscribers: list[tuple[socket.socket, asyncio.Lock]] = []
+        self.stats: DaemonStats = DaemonStats()
+        self.tracer: Tracer = Tracer()
+        if os.environ.get(TRACE_FILE_ENV):
+            self.tracer.start(os.environ[TRACE_FILE_ENV])
+        self.calls: CallScheduler = CallScheduler(CALL_LIMITS, self.tracer)
+        self.highlights: Optional[HighlightScheduler] = None
+        # The socket accepts before iTerm2 is connected: until warm_up() has
+        # loaded the app model and index, ping answers "warming" with the
+        # current phase and every other command waits for `ready`.
+        self.ready: asyncio.Event = asyncio.Event()
+        self.warm_phase: str = "connecting"
+        self.startup: StartupClock = startup or StartupClock(time.time())
+        self.serve_task: Optional[asyncio.Task] = None
+        # Parent and socket-ownership watches: one pair per daemon, however
+        # often it reconnects
+        self.watchdogs: list[asyncio.Task] = []
+        # Monitors started by warm_up() on the current iTerm2 connection
+        self.connection_tasks: list[asyncio.Task] = []
+        self.event_subscribers: list[EventSubscriber] = []
+        # Live topology index: bare session UUID -> tab/window ids, names and pane
+        # position. Built at start() and kept current by the layout and title
+        # monitors, so get_session_info is answered without an iTerm2 round trip.
+        self.session_index: dict[str, dict[str, Any]] = {}
+        self.tab_names: dict[str, Optional[str]] = {}
+        self.window_names: dict[str, str] = {}
+        self.title_monitor_tasks: dict[tuple[str, str], asyncio.Task] = {}
+        self.index_lock: asyncio.Lock = asyncio.Lock()
+        # Bumped whenever the index changes, so list_sessions clients can skip
+        # work when nothing moved. Focus changes do not count.
+        self.topology_version: int = 0
+        self.layout_dirty: bool = False
+        # Every pushed event carries the next seq and is kept in the replay ring,
+        # so a subscriber that drops can resume where it left off. The epoch
+        # tells a reconnect to this daemon from one across a daemon restart.
+        self.event_seq: int = 0
+        self.event_epoch: str = os.urandom(8).hex()
+        self.replay: deque[PushedEvent] = deque(maxlen=REPLAY_RING_SIZE)
+        self.layout_diff_task: Optional[asyncio.Task] = None
+        if connection is not None:
+            self.attach(connection)
 
     async def start(self) -> None:
-        self.app = await iterm2.async_get_app(self.connection)
+        """Listen (unless listen() already ran) and serve while warming up.
 
+        A warm-up failure propagates to the caller; the socket keeps answering
+        "warming" so a reconnect can call start() again. Cancelling the caller
+        (the connection dropped) leaves the accept loop running for the next one.
+        """
+        if self.server is None:
+            self.listen()
+        loop = asyncio.get_running_loop()
+        if self.serve_task is None or self.serve_task.done() or self.serve_task.get_loop() is not loop:
+            self.serve_task = asyncio.create_task(self.serve())
+        await self.warm_up()
+        await asyncio.shield(self.serve_task)
+
+    def attach(self, connection: iterm2.Connection) -> None:
+        load_iterm2()
+        if self.connection is not None:
+            self._detach()
+        self.connection = connection
+        self.stats.count_api_calls(connection)
+        self.highlights = HighlightScheduler(connection, self.calls, self.tracer)
+        self.warm_phase = "loading"
+
+    def _detach(self) -> None:
+        """Drop what belonged to the previous iTerm2 connection before a reconnect.
+
+        The socket, accept loop, watchdogs, subscribers and replay ring stay.
+        Commands wait for `ready` again until warm_up() has reloaded the app
+        model over the new connection.
+        """
+        self.ready.clear()
+        for task in self.connection_tasks:
+            task.cancel()
+        self.connection_tasks = []
+        for task in self.title_monitor_tasks.values():
+            task.cancel()
+        self.title_monitor_tasks.clear()
+        if self.layout_diff_task is not None:
+            self.layout_diff_task.cancel()
+            self.layout_diff_task = None
+        if self.highlights is not None:
+            self.highlights.close()
+
+    def listen(self) -> None:
+        """Bind the control socket. Needs no event loop and no iTerm2 connection."""
         self.socket_path.unlink(missing_ok=True)
 
         self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
@@ -45,17 +1317,45 @@ class iTerm2Daemon:
         self.socket_inode = os.stat(str(self.socket_path)).st_ino
 
         print(f"Daemon listening on {self.socket_path}", file=sys.stderr)
+        self.startup.lap("bind")
 
-        asyncio.create_task(self.run_focus_monitor())
-        asyncio.create_task(self.run_session_monitor())
-        asyncio.create_task(self.run_layout_monitor())
-        asyncio.create_task(self._monitor_parent())
-        asyncio.create_task(self._monitor_socket_ownership())
+    async def warm_up(self) -> None:
+        """Load the app model and topology index, start the monitors, then mark ready."""
+        try:
+            self.app = await iterm2.async_get_app(self.connection)
+            self.startup.lap("app_load")
+            await self._refresh_index()
+            self.startup.lap("index")
+        except BaseException:
+            self.warm_phase = "connecting"
+            raise
+
+        self.connection_tasks = [
+            asyncio.create_task(self.run_focus_monitor()),
+            asyncio.create_task(self.run_session_monitor()),
+            asyncio.create_task(self.run_layout_monitor()),
+        ]
+        if os.environ.get(STATS_FILE_ENV):
+            self.connection_tasks.append(
+                asyncio.create_task(self._dump_stats_periodically(os.environ[STATS_FILE_ENV]))
+            )
 
+        self.warm_phase = "ready"
+        self.ready.set()
+        _emit_structured("ready", timings_ms=self.startup.timings_ms(), sessions=len(self.session_index))
+
+    async def serve(self) -> None:
+        """Accept loop. Runs from the moment the socket is bound, warm or not."""
+        if not self.watchdogs:
+            self.watchdogs = [
+                asyncio.create_task(self._monitor_parent()),
+                asyncio.create_task(self._monitor_socket_ownership()),
+            ]
         loop = asyncio.get_running_loop()
         while self.running:
             try:
                 client, _ = await loop.sock_accept(self.server)
+                self.tracer.instant("accept", "socket")
                 asyncio.create_task(self.handle_client(client))
             except Exception as e:
                 if self.running:
@@ -63,71 +1363,340 @@ class iTerm2Daemon:
 
     async def handle_client(self, client: socket.socket) -> None:
         loop = asyncio.get_running_loop()
+        buffer = bytearray()
+        wire = NEWLINE_JSON
         try:
-            data = await loop.sock_recv(client, 65536)
-            if not data:
+            with self.tracer.span("recv", "socket"):
+                frame = await self._recv_frame(client, buffer, allow_unterminated=True)
+            if frame is None:
                 return
 
-            request = json.loads(data.decode("utf-8").strip())
+            with self.tracer.span("decode", "socket", bytes=len(frame)):
+                request = wire.loads(frame)
+
+            # Negotiated wire format: everything after the hello reply uses it
+            if isinstance(request, dict) and request.get("command") == "hello":
+                negotiated, reply = self._negotiate(request)
+                await loop.sock_sendall(client, wire.pack(reply))
+                if negotiated is None:
+                    return
+                wire = negotiated
+                with self.tracer.span("recv", "socket"):
+                    frame = await self._recv_frame(client, buffer, wire=wire)
+                if frame is None:
+                    return
+                with self.tracer.span("decode", "socket", bytes=len(frame), encoding=wire.encoding):
+                    request = wire.loads(frame)
 
             # Handle subscribe specially - keep connection open
             if request.get("command") == "subscribe":
-                await self.handle_subscription(client)
+                await self.handle_subscription(client, request, buffer, wire)
+                return
+
+            # Persistent, pipelined connection - keep open until the client hangs up
+            if request.get("command") == "multiplex":
+                await self.handle_multiplexed(client, buffer, wire)
                 return
 
             response = await self.process_command(request)
 
-            # Add newline for consistent protocol
-            await loop.sock_sendall(client, json.dumps(response).encode("utf-8") + b"\n")
+            await loop.sock_sendall(client, wire.pack(response))
         except Exception as e:
             error_response = {"status": "error", "message": str(e) or type(e).__name__}
             try:
-                await loop.sock_sendall(client, json.dumps(error_response).encode("utf-8") + b"\n")
+                await loop.sock_sendall(client, wire.pack(error_response))
             except Exception:
                 pass
         finally:
             client.close()
 
-    async def handle_subscription(self, client: socket.socket) -> None:
-        """Handle an event subscription - keep connection open for push events."""
+    def _negotiate(self, request: dict[str, Any]) -> tuple[Optional[WireFormat], dict[str, Any]]:
+        """Pick the wire format a `hello` asks for. None, with an error reply, if nothing fits."""
+        codecs = load_codecs()
+        framing = request.get("framing", "newline")
+        if framing not in FRAMINGS:
+            return None, {"status": "error", "message": f"framing must be one of {', '.join(FRAMINGS)}"}
+        wanted = request.get("encodings", ["json"])
+        if not isinstance(wanted, list):
+            return None, {"status": "error", "message": "encodings must be a list of strings"}
+        # Binary encodings can contain newline bytes, so they need length framing
+        usable = [name for name in codecs if name == "json" or framing == "length"]
+        encoding = next((name for name in wanted if name in usable), None)
+        if encoding is None:
+            return None, {"status": "error", "message": f"No common encoding (available: {', '.join(usable)})"}
+        return WireFormat(framing, encoding, codecs[encoding]), {
+            "status": "ok",
+            "protocol": PROTOCOL_VERSION,
+            "framing": framing,
+            "encoding": encoding,
+            "encodings": usable,
+        }
+
+    async def _recv_frame(
+        self, client: socket.socket, buffer: bytearray, allow_unterminated: bool = False,
+        wire: WireFormat = NEWLINE_JSON
+    ) -> Optional[bytes]:
+        """Read the next frame from `client` in `wire`'s framing, or None at EOF.
+
+        `buffer` carries bytes already received past the previous frame, so
+        pipelined requests that arrive in a single recv are not lost. With
+        `allow_unterminated`, a newline-framed buffer that parses as a JSON
+        object once the client goes quiet is accepted without its newline:
+        one-shot clients that never sent one keep working.
+        """
+        if wire.framing == "length":
+            return await self._recv_length_frame(client, buffer)
+        loop = asyncio.get_running_loop()
+        # Only bytes that arrived since the last pass are searched, so a large
+        # frame spread over many recvs costs linear, not quadratic, time
+        scanned = 0
+        while True:
+            newline = buffer.find(b"\n", scanned)
+            if newline >= 0:
+                frame = bytes(buffer[:newline])
+                del buffer[:newline + 1]
+                return frame
+            scanned = len(buffer)
+            if len(buffer) > MAX_FRAME_BYTES:
+                raise ValueError(f"Request exceeds {MAX_FRAME_BYTES} bytes")
+            if allow_unterminated and buffer.rstrip().endswith(b"}"):
+                # Maybe a whole request: parse it only if no more bytes follow soon,
+                # so a large frame is not re-parsed on every chunk
+                try:
+                    data = await asyncio.wait_for(loop.sock_recv(client, 65536), UNTERMINATED_FRAME_GRACE_SECONDS)
+                except asyncio.TimeoutError:
+                    try:
+                        json.loads(buffer)
+                    except ValueError:
+                        data = await loop.sock_recv(client, 65536)
+                    else:
+                        frame = bytes(buffer)
+                        buffer.clear()
+                        return frame
+            else:
+                data = await loop.sock_recv(client, 65536)
+            if not data:
+                if buffer.strip():
+                    frame = bytes(buffer)
+                    buffer.clear()
+                    return frame
+                return None
+            buffer.extend(data)
+
+    async def _recv_length_frame(self, client: socket.socket, buffer: bytearray) -> Optional[bytes]:
+        """Length-prefixed counterpart of _recv_frame: the header says where the frame ends."""
+        loop = asyncio.get_running_loop()
+        header = LENGTH_PREFIX.size
+        while True:
+            if len(buffer) >= header:
+                (size,) = LENGTH_PREFIX.unpack_from(buffer)
+                if size > MAX_FRAME_BYTES:
+                    raise ValueError(f"Request exceeds {MAX_FRAME_BYTES} bytes")
+                if len(buffer) >= header + size:
+                    frame = bytes(buffer[header:header + size])
+                    del buffer[:header + size]
+                    return frame
+            data = await loop.sock_recv(client, 65536)
+            if not data:
+                if buffer:
+                    raise ValueError("Connection closed in the middle of a frame")
+                return None
+            buffer.extend(data)
+
+    async def handle_multiplexed(self, client: socket.socket, buffer: bytearray, wire: WireFormat) -> None:
+        """Serve many requests over one long-lived connection.
+
+        Each request may carry an `id`, which is echoed in its response.
+        Requests run concurrently and are answered as they finish, so a slow
+        get_session_info never holds up an activate queued behind it. At most
+        MAX_MULTIPLEX_IN_FLIGHT run at once; further ones wait unread.
+        """
         loop = asyncio.get_running_loop()
         write_lock = asyncio.Lock()
+        in_flight: set[asyncio.Task] = set()
+        slots = asyncio.Semaphore(MAX_MULTIPLEX_IN_FLIGHT)
+
+        def finished(task: asyncio.Task) -> None:
+            in_flight.discard(task)
+            slots.release()
+
+        await loop.sock_sendall(client, wire.pack({"status": "ok"}))
+
+        try:
+            while self.running:
+                # At the cap, leave the next request in the buffer and the socket,
+                # so a client that keeps pipelining meets backpressure
+                await slots.acquire()
+                frame = await self._recv_frame(client, buffer, wire=wire)
+                if frame is None:
+                    break
+                self.tracer.instant("recv", "socket", bytes=len(frame))
+                if not frame.strip():
+                    slots.release()
+                    continue
+                task = asyncio.create_task(self._serve_multiplexed_request(client, write_lock, frame, wire))
+                in_flight.add(task)
+                task.add_done_callback(finished)
+        except Exception as e:
+            print(f"Multiplexed connection error: {e}", file=sys.stderr)
+        finally:
+            # Let requests already in flight finish (e.g. an activate the user is
+            # waiting on) even though no one may be left to read the reply.
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _serve_multiplexed_request(
+        self, client: socket.socket, write_lock: asyncio.Lock, frame: bytes, wire: WireFormat
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        request_id = None
+        try:
+            with self.tracer.span("decode", "socket", bytes=len(frame)):
+                request = wire.loads(frame)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be an object")
+            request_id = request.get("id")
+            if request.get("command") in ("subscribe", "multiplex", "hello"):
+                response = {"status": "error", "message": "Not supported on a multiplexed connection"}
+            else:
+                response = await self.process_command(request)
+        except Exception as e:
+            response = {"status": "error", "message": str(e) or type(e).__name__}
+
+        response = dict(response)
+        response["id"] = request_id
+        try:
+            async with write_lock:
+                await loop.sock_sendall(client, wire.pack(response))
+        except Exception:
+            pass  # Client went away; the read loop notices the hang-up
+
+    async def handle_subscription(
+        self, client: socket.socket, request: dict[str, Any], buffer: bytearray, wire: WireFormat = NEWLINE_JSON
+    ) -> None:
+        """Handle an event subscription - keep connection open for push events.
 
+        The client may send `filter` requests on the same connection to replace
+        its filter; each is answered in-stream with a `filter_updated` event.
+        """
+        loop = asyncio.get_running_loop()
+
+        max_queue = request.get("queue_size", DEFAULT_SUBSCRIBER_QUEUE_SIZE)
+        overflow = request.get("overflow", "drop_oldest")
+        if not isinstance(max_queue, int) or isinstance(max_queue, bool) or max_queue < 1:
+            raise ValueError("queue_size must be a positive integer")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        since_seq = request.get("since_seq")
+        if since_seq is not None and (not isinstance(since_seq, int) or isinstance(since_seq, bool) or since_seq < 0):
+            raise ValueError("since_seq must be a non-negative integer")
+        event_filter = EventFilter(request.get("filter"))
+
+        # Events pushed while the ack is in flight are replayed below, so even
+        # a fresh subscriber starts exactly at the seq it was told
+        ack_seq = self.event_seq
         try:
-            await loop.sock_sendall(client, json.dumps({"status": "ok"}).encode("utf-8") + b"\n")
+            await loop.sock_sendall(client, wire.pack({"status": "ok", "seq": ack_seq, "epoch": self.event_epoch}))
         except Exception as e:
             print(f"Failed to send subscription ack: {e}", file=sys.stderr)
             client.close()
             return
 
-        subscriber = (client, write_lock)
+        subscriber = EventSubscriber(client, max_queue, overflow, self.stats, event_filter, wire)
+        if since_seq is None:
+            self._replay(subscriber, ack_seq)
+        elif request.get("epoch", self.event_epoch) != self.event_epoch or since_seq > ack_seq:
+            # The seq belongs to an earlier daemon; nothing here continues it
+            subscriber.push("resync_required", None, resync_marker("restarted", wire))
+            self.stats.resyncs_required += 1
+            self._replay(subscriber, ack_seq)
+        else:
+            self._replay(subscriber, since_seq)
         self.event_subscribers.append(subscriber)
+        writer = asyncio.create_task(subscriber.run_writer())
 
-        # 1-byte read only to detect EOF
+        # Park until the client hangs up or the writer gives up. Both are
+        # readiness-driven (sock_recv registers a reader callback), so an idle
+        # subscriber costs no event-loop wakeups at all.
+        reader = asyncio.create_task(self._read_subscriber_requests(client, buffer, subscriber))
         try:
-            while self.running:
-                client.setblocking(False)
-                try:
-                    data = await loop.sock_recv(client, 1)
-                    if not data:
-                        break
-                except BlockingIOError:
-                    pass
-                await asyncio.sleep(1)
+            await asyncio.wait({reader, writer}, return_when=asyncio.FIRST_COMPLETED)
         except Exception:
             pass
         finally:
+            reader.cancel()
             if subscriber in self.event_subscribers:
                 self.event_subscribers.remove(subscriber)
+            subscriber.close()
+            writer.cancel()
             try:
                 client.close()
             except Exception:
                 pass
 
+    def _replay(self, subscriber: EventSubscriber, since_seq: int) -> None:
+        """Queue every kept event after `since_seq` that passes the subscriber's
+        filter, or resync_required if some are gone. Rate caps don't apply."""
+        if self.event_seq <= since_seq:
+            return
+        oldest = self.replay[0].seq if self.replay else self.event_seq + 1
+        missed = [
+            event for event in self.replay
+            if event.seq > since_seq and subscriber.filter.matches(event.event_type, event.session_id)
+        ]
+        if oldest > since_seq + 1 or len(missed) > subscriber.max_queue:
+            subscriber.push("resync_required", None, resync_marker("replay_unavailable", subscriber.wire))
+            self.stats.resyncs_required += 1
+            return
+        for event in missed:
+            subscriber.push(event.event_type, event.session_id, event.encoded(subscriber.wire))
+        self.stats.events_replayed += len(missed)
+
+    async def _read_subscriber_requests(
+        self, client: socket.socket, buffer: bytearray, subscriber: EventSubscriber
+    ) -> None:
+        """Apply `filter` requests from the subscriber until it hangs up. Other input is discarded."""
+        client.setblocking(False)
+        try:
+            while (frame := await self._recv_frame(client, buffer, wire=subscriber.wire)) is not None:
+                try:
+                    request = subscriber.wire.loads(frame)
+                except ValueError:
+                    continue
+                if not isinstance(request, dict) or request.get("command") != "filter":
+                    continue
+                try:
+                    subscriber.filter = EventFilter(request.get("filter"))
+                    reply = {"event": "filter_updated", "status": "ok", "filter": subscriber.filter.spec}
+                except ValueError as e:
+                    reply = {"event": "filter_updated", "status": "error", "message": str(e)}
+                subscriber.push("filter_updated", None, subscriber.wire.pack(reply))
+        except (OSError, ValueError):
+            pass
+
     async def process_command(self, request: dict[str, Any]) -> dict[str, Any]:
         command = request.get("command")
+        label = command if isinstance(command, str) else "(invalid)"
+        self.stats.sample_loop_lag()
+        token = current_command.set(label)
+        started = time.perf_counter()
+        ok = False
+        try:
+            if not self.ready.is_set() and command not in WARMING_COMMANDS:
+                with self.tracer.span("wait for ready", "command"):
+                    await self.ready.wait()
+            with self.tracer.span(label, "command", session_id=request.get("session_id")):
+                response = await self._dispatch_command(command, request)
+            ok = response is None or response.get("status") != "error"
+            return response
+        finally:
+            current_command.reset(token)
+            self.stats.record_command(label, time.perf_counter() - started, ok)
 
+    async def _dispatch_command(self, command: Any, request: dict[str, Any]) -> dict[str, Any]:
         if command == "ping":
+            if not self.ready.is_set():
+                return {"status": "warming", "phase": self.warm_phase}
             return {"status": "ok"}
 
         elif command == "get_session_info":
@@ -148,13 +1717,125 @@ class iTerm2Daemon:
             session_id = request.get("session_id")
             return await self.reset_highlight(session_id)
 
-        elif command == "subscribe":
+        elif command == "batch":
+            return await self.process_batch(request)
+
+        elif command == "list_sessions":
+            return self.list_sessions(request.get("session_prefix"), request.get("since_version"))
+
+        elif command == "trace_start":
+            path = request.get("path") or str(self.socket_path.with_suffix(".trace.json"))
+            ring_size = request.get("ring_size", TRACE_RING_SIZE)
+            if not isinstance(ring_size, int) or isinstance(ring_size, bool) or ring_size < 1:
+                return {"status": "error", "message": "ring_size must be a positive integer"}
+            self.tracer.start(path, ring_size)
+            return {"status": "ok", "path": path}
+
+        elif command == "trace_stop":
+            if not self.tracer.enabled:
+                return {"status": "error", "message": "Tracing is not running"}
+            path = self.tracer.path
+            return {"status": "ok", "path": path, "events": self.tracer.stop()}
+
+        elif command == "stats":
+            snapshot = self.stats.snapshot(self.event_subscribers, self.calls)
+            snapshot["startup"] = {"phase": self.warm_phase, "timings_ms": self.startup.timings_ms()}
+            if request.get("reset"):
+                self.stats.reset()
+            return {"status": "ok", **snapshot}
+
+        elif command in ("subscribe", "multiplex", "hello"):
             # Handled specially in handle_client
             return None
 
         else:
             return {"status": "error", "message": f"Unknown command: {command}"}
 
+    async def process_batch(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Run many sub-requests concurrently and return their results in order.
+
+        Each result carries its own `status`, so one missing session does not
+        fail the whole batch. `max_concurrency` caps how many sub-requests
+        await the iTerm2 connection at the same time.
+        """
+        sub_requests = request.get("requests")
+        if not isinstance(sub_requests, list):
+            return {"status": "error", "message": "batch requires a 'requests' list"}
+
+        limit = request.get("max_concurrency", DEFAULT_BATCH_CONCURRENCY)
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            return {"status": "error", "message": "max_concurrency must be a positive integer"}
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run_one(sub_request: Any) -> dict[str, Any]:
+            if not isinstance(sub_request, dict):
+                return {"status": "error", "message": "Batch item must be a JSON object"}
+            command = sub_request.get("command")
+            if command not in BATCHABLE_COMMANDS:
+                return {"status": "error", "message": f"Command not allowed in batch: {command}"}
+            async with semaphore:
+                try:
+                    return await self.process_command(sub_request)
+                except Exception as e:
+                    return {"status": "error", "message": str(e) or type(e).__name__}
+
+        results = await asyncio.gather(*(run_one(sub_request) for sub_request in sub_requests))
+        return {"status": "ok", "results": list(results)}
+
+    def list_sessions(self, session_prefix: Optional[str], since_version: Any) -> dict[str, Any]:
+        """Snapshot every window/tab/pane in one reply, served from the index.
+
+        With `since_version` equal to the current topology_version, only the
+        version and focus are returned - the client's copy is still current.
+        """
+        current_window = self.app.current_terminal_window
+        current_tab = current_window.current_tab if current_window else None
+        current_session = current_tab.current_session if current_tab else None
+        response: dict[str, Any] = {
+            "status": "ok",
+            "topology_version": self.topology_version,
+            "focused_session_id": current_session.session_id if current_session else None
+        }
+        if since_version == self.topology_version:
+            response["unchanged"] = True
+            return response
+
+        prefix = self._extract_uuid(session_prefix)
+        windows: list[dict[str, Any]] = []
+        for window_index, window in enumerate(self.app.terminal_windows):
+            tabs: list[dict[str, Any]] = []
+            selected_tab = window.current_tab
+            for tab_index, tab in enumerate(window.tabs):
+                active_session = tab.current_session
+                panes = [
+                    {
+                        "session_id": session.session_id,
+                        "pane_index": pane_index,
+                        "active": session is active_session
+                    }
+                    for pane_index, session in enumerate(tab.sessions)
+                    if session.session_id.startswith(prefix)
+                ]
+                if panes:
+                    tabs.append({
+                        "tab_id": tab.tab_id,
+                        "tab_name": self.tab_names.get(tab.tab_id) or "Tab",
+                        "tab_index": tab_index,
+                        "selected": tab is selected_tab,
+                        "pane_count": len(tab.sessions),
+                        "panes": panes
+                    })
+            if tabs:
+                windows.append({
+                    "window_id": window.window_id,
+                    "window_name": self.window_names.get(window.window_id, "Window"),
+                    "window_index": window_index,
+                    "current": window is current_window,
+                    "tabs": tabs
+                })
+        response["windows"] = windows
+        return response
+
     async def run_focus_monitor(self) -> None:
         consecutive_failures: int = 0
         while self.running:
@@ -171,6 +1852,7 @@ class iTerm2Daemon:
                             })
             except Exception as e:
                 consecutive_failures += 1
+                self.stats.monitor_restarts["focus"] += 1
                 # Retry instead of killing the daemon: a transient FocusMonitor
                 # failure recurs after a restart and just loops (cf. run_layout_monitor).
                 print(f"Focus monitor error (attempt {consecutive_failures}): {e}, retrying in 5s...",
@@ -192,6 +1874,7 @@ class iTerm2Daemon:
                         })
             except Exception as e:
                 consecutive_failures += 1
+                self.stats.monitor_restarts["session"] += 1
                 if consecutive_failures >= 3:
                     print(f"Session monitor failed {consecutive_failures} times, giving up", file=sys.stderr)
                     break
@@ -204,60 +1887,253 @@ class iTerm2Daemon:
 
         SessionTerminationMonitor waits for the process to exit (~5s).
         LayoutChangeMonitor fires immediately when a window/tab closes,
-        so we can detect gone sessions much faster.
+        so we can detect gone sessions much faster. Each burst of changes is
+        diffed against the topology index once, pushing session_created,
+        session_moved and session_terminated (see _refresh_index).
         """
-        known_sessions: set[str] = self._get_all_session_ids()
         while self.running:
             try:
                 async with iterm2.LayoutChangeMonitor(self.connection) as monitor:
+                    # Catch up on anything that changed while the monitor was down
+                    await self._on_layout_changed()
                     while self.running:
                         await monitor.async_get()
-                        current_sessions = self._get_all_session_ids()
-                        gone = known_sessions - current_sessions
-                        for session_id in gone:
-                            await self.push_event({
-                                "event": "session_terminated",
-                                "session_id": session_id
-                            })
-                        known_sessions = current_sessions
+                        self._request_layout_diff()
             except Exception as e:
                 print(f"Layout monitor error: {e}", file=sys.stderr)
+                self.stats.monitor_restarts["layout"] += 1
                 if self.running:
                     await asyncio.sleep(5)
 
-    def _get_all_session_ids(self) -> set[str]:
-        sessions: set[str] = set()
-        for window in self.app.terminal_windows:
-            for tab in window.tabs:
-                for session in tab.sessions:
-                    sessions.add(session.session_id)
-        return sessions
+    def _request_layout_diff(self) -> None:
+        """Schedule a diff pass, folding in notifications until it starts."""
+        self.layout_dirty = True
+        if self.layout_diff_task is None or self.layout_diff_task.done():
+            self.layout_diff_task = asyncio.create_task(self._diff_layout_debounced())
+
+    async def _diff_layout_debounced(self) -> None:
+        # Loop, not recurse: a change that lands mid-diff gets one more pass
+        while self.layout_dirty and self.running:
+            await asyncio.sleep(LAYOUT_DEBOUNCE_SECONDS)
+            self.layout_dirty = False
+            try:
+                await self._on_layout_changed()
+            except Exception as e:
+                print(f"Layout diff error: {e}", file=sys.stderr)
+
+    async def _on_layout_changed(self) -> None:
+        gone = await self._refresh_index()
+        self.highlights.forget_sessions(gone)
+        for session_id in gone:
+            await self.push_event({
+                "event": "session_terminated",
+                "session_id": session_id
+            })
+
+    async def _refresh_index(self) -> set[str]:
+        """Re-walk the app model and diff it against the topology index.
+
+        The walk itself is in memory; iTerm2 is only queried for the names of
+        tabs and windows not seen before (window names are re-read whenever the
+        set of windows changes, since window numbers can shift). Pushes
+        session_created and session_moved for new and relocated panes, then
+        terminal_info for every new or changed entry, and returns the ids of
+        sessions that disappeared.
+        """
+        async with self.index_lock:
+            windows = list(self.app.terminal_windows)
+            window_ids = {window.window_id for window in windows}
+            tabs = [(tab, window) for window in windows for tab in window.tabs]
+            tab_ids = {tab.tab_id for tab, _ in tabs}
+
+            new_tabs = [tab for tab, _ in tabs if tab.tab_id not in self.tab_names]
+            renamed_windows = windows if window_ids != set(self.window_names) else []
+            names = await self.calls.run("background", lambda: asyncio.gather(
+                *(self._get_tab_name(tab) for tab in new_tabs),
+                *(self._get_window_name(window) for window in renamed_windows),
+                return_exceptions=True,
+            ))
+            for tab, name in zip(new_tabs, names[:len(new_tabs)]):
+                self.tab_names[tab.tab_id] = None if isinstance(name, BaseException) else name
+            for window, name in zip(renamed_windows, names[len(new_tabs):]):
+                self.window_names[window.window_id] = "Window" if isinstance(name, BaseException) else name
+
+            for tab_id in set(self.tab_names) - tab_ids:
+                del self.tab_names[tab_id]
+            for window_id in set(self.window_names) - window_ids:
+                del self.window_names[window_id]
+            self._sync_title_monitors(tab_ids, window_ids)
+
+            entries: dict[str, dict[str, Any]] = {}
+            for tab, window in tabs:
+                entries.update(self._index_tab(tab, window))
+            gone = set(self.session_index) - set(entries)
+            changed = self._merge_index(entries)
+            for session_id in gone:
+                del self.session_index[session_id]
+            if gone:
+                self.topology_version += 1
+
+        await self._push_layout_events(changed)
+        await self._push_terminal_info(list(changed))
+        return gone
+
+    def _index_tab(self, tab, window) -> dict[str, dict[str, Any]]:
+        pane_count = len(tab.sessions)
+        return {
+            session.session_id: {
+                "tab_id": tab.tab_id,
+                "window_id": window.window_id if window else None,
+                "tab_name": self.tab_names.get(tab.tab_id) or "Tab",
+                "window_name": self.window_names.get(window.window_id, "Window") if window else "Unknown",
+                "pane_index": pane_index,
+                "pane_count": pane_count,
+            }
+            for pane_index, session in enumerate(tab.sessions)
+        }
+
+    def _merge_index(self, entries: dict[str, dict[str, Any]]) -> dict[str, Optional[dict[str, Any]]]:
+        """Store `entries` in the index. Returns the changed ids, each with its previous entry (None if new)."""
+        changed = {
+            session_id: self.session_index.get(session_id) for session_id, entry in entries.items()
+            if self.session_index.get(session_id) != entry
+        }
+        if changed:
+            self.session_index.update(entries)
+            self.topology_version += 1
+        return changed
+
+    async def _push_layout_events(self, changed: dict[str, Optional[dict[str, Any]]]) -> None:
+        for session_id, previous in changed.items():
+            entry = self.session_index.get(session_id)
+            if entry is None:
+                continue
+            if previous is None:
+                await self.push_event({
+                    "event": "session_created",
+                    "session_id": session_id,
+                    **self._placement(entry),
+                    **self._session_info_fields(entry)
+                })
+            elif self._placement(previous) != self._placement(entry):
+                await self.push_event({
+                    "event": "session_moved",
+                    "session_id": session_id,
+                    **self._placement(entry),
+                    **self._session_info_fields(entry),
+                    "from": self._placement(previous)
+                })
+
+    async def _push_terminal_info(self, session_ids: list[str]) -> None:
+        for session_id in session_ids:
+            entry = self.session_index.get(session_id)
+            if entry is not None:
+                await self.push_event({
+                    "event": "terminal_info",
+                    "session_id": session_id,
+                    **self._session_info_fields(entry)
+                })
+
+    @staticmethod
+    def _placement(entry: dict[str, Any]) -> dict[str, Any]:
+        return {"window_id": entry["window_id"], "tab_id": entry["tab_id"], "pane_index": entry["pane_index"]}
+
+    @staticmethod
+    def _session_info_fields(entry: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "tab_name": entry["tab_name"],
+            "window_name": entry["window_name"],
+            "pane_index": entry["pane_index"],
+            "pane_count": entry["pane_count"]
+        }
+
+    def _sync_title_monitors(self, tab_ids: set[str], window_ids: set[str]) -> None:
+        wanted = {("tab", tab_id) for tab_id in tab_ids} | {("window", window_id) for window_id in window_ids}
+        for key in set(self.title_monitor_tasks) - wanted:
+            self.title_monitor_tasks.pop(key).cancel()
+        for key in wanted - set(self.title_monitor_tasks):
+            self.title_monitor_tasks[key] = asyncio.create_task(self._run_title_monitor(*key))
+
+    async def _run_title_monitor(self, kind: str, identifier: str) -> None:
+        """Follow one tab's title or one window's title override until cancelled."""
+        if kind == "tab":
+            scope, name = iterm2.VariableScopes.TAB, "title"
+        else:
+            scope, name = iterm2.VariableScopes.WINDOW, "titleOverrideFormat"
+        try:
+            async with iterm2.VariableMonitor(self.connection, scope, name, identifier) as monitor:
+                while self.running:
+                    value = await monitor.async_get()
+                    await self._on_title_changed(kind, identifier, value)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Not retried: the next layout change that still contains this
+            # tab/window finds the task finished and starts a fresh one.
+            print(f"Title monitor error ({kind} {identifier}): {e}", file=sys.stderr)
+            self.stats.monitor_restarts["title"] += 1
+        finally:
+            if self.title_monitor_tasks.get((kind, identifier)) is asyncio.current_task():
+                del self.title_monitor_tasks[(kind, identifier)]
+
+    async def _on_title_changed(self, kind: str, identifier: str, value: Any) -> None:
+        if kind == "tab":
+            tab = self.app.get_tab_by_id(identifier)
+            if tab is None:
+                return
+            self.tab_names[identifier] = value
+            tabs = [tab]
+        else:
+            window = self.app.get_window_by_id(identifier)
+            if window is None:
+                return
+            self.window_names[identifier] = await self.calls.run(
+                "background", lambda: self._get_window_name(window), key=("window_name", identifier)
+            )
+            tabs = list(window.tabs)
+
+        entries: dict[str, dict[str, Any]] = {}
+        for tab in tabs:
+            entries.update(self._index_tab(tab, tab.window))
+        await self._push_terminal_info(list(self._merge_index(entries)))
 
     async def push_event(self, event: dict[str, Any]) -> None:
-        if not self.event_subscribers:
-            return
+        """Number `event`, keep it for replay and queue it for every subscriber.
 
-        message = json.dumps(event).encode("utf-8") + b"\n"
-        loop = asyncio.get_running_loop()
-        dead_subscribers: list[tuple[socket.socket, asyncio.Lock]] = []
+        Never waits on a subscriber's socket. Events are kept even with no
+        subscriber connected: that is exactly when a reconnect needs them.
+        """
+        if not self.ready.is_set():
+            return  # Initial index build: subscribers get the topology from list_sessions
+        with self.tracer.span("push_event", "events", event=event.get("event"),
+                              subscribers=len(self.event_subscribers)):
+            self._fan_out(event)
+
+    def _fan_out(self, event: dict[str, Any]) -> None:
+        self.event_seq += 1
+        pushed = PushedEvent(self.event_seq, event)
+        self.replay.append(pushed)
+        self.stats.events_pushed[pushed.event_type] += 1
 
-        # Iterate over a copy to avoid mutation during await points
         for subscriber in list(self.event_subscribers):
-            client, write_lock = subscriber
-            try:
-                async with write_lock:
-                    await loop.sock_sendall(client, message)
-            except Exception:
-                dead_subscribers.append(subscriber)
-
-        for sub in dead_subscribers:
-            if sub in self.event_subscribers:
-                self.event_subscribers.remove(sub)
+            if subscriber.closed:
+                continue  # Its subscription handler is already cleaning up
+            if not subscriber.offer(pushed):
+                print("Subscriber queue overflowed, disconnecting", file=sys.stderr)
+                self.stats.subscribers_disconnected += 1
+                self.event_subscribers.remove(subscriber)
+                subscriber.close()
 
     async def get_session_info(self, session_id: str) -> dict[str, Any]:
         uuid = self._extract_uuid(session_id)
         if not uuid:
             return {"status": "error", "message": "Session not found"}
+
+        entry = self.session_index.get(uuid)
+        if entry is not None:
+            return {"status": "ok", "session_id": session_id, **self._session_info_fields(entry)}
+
+        # Not indexed yet (created since the last layout change) - ask iTerm2
         session = self.app.get_session_by_id(uuid)
 
         if not session:
@@ -267,8 +2143,11 @@ class iTerm2Daemon:
             tab = session.tab
             window = tab.window if tab else None
 
-            tab_name = await tab.async_get_variable("title") if tab else "Unknown"
-            window_name = await self._get_window_name(window) if window else "Unknown"
+            # Independent round trips - overlap them instead of paying for both in sequence
+            tab_name, window_name = await self.calls.run("background", lambda: asyncio.gather(
+                self._get_tab_name(tab),
+                self._get_window_name(window),
+            ), key=("session_info", uuid))
 
             pane_index = tab.sessions.index(session) if tab else 0
             pane_count = len(tab.sessions) if tab else 1
@@ -286,13 +2165,21 @@ class iTerm2Daemon:
             "pane_count": pane_count
         }
 
+    async def _get_tab_name(self, tab) -> Optional[str]:
+        if not tab:
+            return "Unknown"
+        with self.tracer.span("tab.async_get_variable(title)", "iterm2"):
+            return await tab.async_get_variable("title")
+
     async def _get_window_name(self, window) -> str:
         if not window:
             return "Unknown"
-        window_title = await window.async_get_variable("titleOverrideFormat")
+        with self.tracer.span("window.async_get_variable(titleOverrideFormat)", "iterm2"):
+            window_title = await window.async_get_variable("titleOverrideFormat")
         if window_title:
             return window_title
-        window_number = await window.async_get_variable("number")
+        with self.tracer.span("window.async_get_variable(number)", "iterm2"):
+            window_number = await window.async_get_variable("number")
         if window_number is not None:
             return f"Window {window_number}"
         return "Window"
@@ -306,16 +2193,22 @@ class iTerm2Daemon:
         if not session:
             return {"status": "error", "message": "Session not found"}
 
-        try:
+        async def activate() -> None:
             tab = session.tab
             window = tab.window if tab else None
 
-            await self.app.async_activate()
+            with self.tracer.span("app.async_activate", "iterm2"):
+                await self.app.async_activate()
 
             if window:
-                await window.async_activate()
+                with self.tracer.span("window.async_activate", "iterm2"):
+                    await window.async_activate()
+
+            with self.tracer.span("session.async_activate", "iterm2"):
+                await session.async_activate(select_tab=True, order_window_front=True)
 
-            await session.async_activate(select_tab=True, order_window_front=True)
+        try:
+            await self.calls.run("user", activate)
         except Exception as e:
             # iTerm2's cached app model can return a session object for a UUID
             # whose tab is already gone; async_activate then rejects it (often
@@ -338,95 +2231,10 @@ class iTerm2Daemon:
         if not session:
             return {"status": "error", "message": "Session not found"}
 
-        tab = session.tab
-        tab_id = tab.tab_id if tab else None
-
-        if tab_id and tab_id in self.active_tab_reset_tasks:
-            self.active_tab_reset_tasks[tab_id].cancel()
-            del self.active_tab_reset_tasks[tab_id]
-
-        if uuid in self.active_pane_reset_tasks:
-            self.active_pane_reset_tasks[uuid].cancel()
-            del self.active_pane_reset_tasks[uuid]
-
-        original_bg = None
-        if pane_config and pane_config.get("enabled"):
-            try:
-                profile = await session.async_get_profile()
-                original_bg = await profile.async_get_background_color()
-            except Exception:
-                original_bg = iterm2.Color(0, 0, 0)
-
-        change = iterm2.LocalWriteOnlyProfile()
-
-        if tab_config and tab_config.get("enabled"):
-            color = tab_config.get("color", [255, 165, 0])
-            change.set_tab_color(iterm2.Color(color[0], color[1], color[2]))
-            change.set_use_tab_color(True)
-            duration = tab_config.get("duration", 2.0)
-            if tab_id:
-                task = asyncio.create_task(self._reset_tab_after_delay(session, tab_id, duration))
-                self.active_tab_reset_tasks[tab_id] = task
-
-        if pane_config and pane_config.get("enabled"):
-            color = pane_config.get("color", [255, 165, 0])
-            change.set_background_color(iterm2.Color(color[0], color[1], color[2]))
-            duration = pane_config.get("duration", 2.0)
-            task = asyncio.create_task(self._reset_pane_after_delay(session, uuid, duration, original_bg))
-            self.active_pane_reset_tasks[uuid] = task
-
-        await session.async_set_profile_properties(change)
+        await self.highlights.highlight(session, tab_config, pane_config)
 
         return {"status": "ok"}
 
-    async def _apply_profile_with_retry(
-        self, session: iterm2.Session, profile: iterm2.LocalWriteOnlyProfile,
-        label: str, escape_fallback: Optional[bytes] = None
-    ) -> None:
-        try:
-            await session.async_set_profile_properties(profile)
-        except Exception as e:
-            print(f"{label} failed, retrying: {e}", file=sys.stderr)
-            try:
-                await asyncio.sleep(1)
-                await session.async_set_profile_properties(profile)
-            except Exception as e2:
-                if escape_fallback:
-                    print(f"{label} retry failed, using escape sequence: {e2}", file=sys.stderr)
-                    try:
-                        await session.async_inject(escape_fallback)
-                    except Exception:
-                        print(f"All {label} attempts failed", file=sys.stderr)
-                else:
-                    print(f"{label} retry also failed: {e2}", file=sys.stderr)
-
-    async def _reset_tab_after_delay(self, session: iterm2.Session, tab_id: str, duration: float) -> None:
-        try:
-            await asyncio.sleep(duration)
-            reset = iterm2.LocalWriteOnlyProfile()
-            reset.set_use_tab_color(False)
-            await self._apply_profile_with_retry(session, reset, f"Tab reset ({tab_id})")
-        except asyncio.CancelledError:
-            pass
-        finally:
-            self.active_tab_reset_tasks.pop(tab_id, None)
-
-    async def _reset_pane_after_delay(
-        self, session: iterm2.Session, uuid: str, duration: float, original_color: Optional[iterm2.Color]
-    ) -> None:
-        try:
-            await asyncio.sleep(duration)
-            reset = iterm2.LocalWriteOnlyProfile()
-            reset.set_background_color(original_color)
-            await self._apply_profile_with_retry(
-                session, reset, f"Pane reset ({uuid})",
-                escape_fallback=b'\033]1337;SetColors=bg=default\a'
-            )
-        except asyncio.CancelledError:
-            pass
-        finally:
-            self.active_pane_reset_tasks.pop(uuid, None)
-
     async def reset_highlight(self, session_id: str) -> dict[str, Any]:
         uuid = self._extract_uuid(session_id)
         if not uuid:
@@ -436,38 +2244,89 @@ class iTerm2Daemon:
         if not session:
             return {"status": "error", "message": "Session not found"}
 
-        await session.async_inject(b'\033]1337;SetColors=bg=default\a')
+        async def inject() -> None:
+            with self.tracer.span("session.async_inject", "iterm2"):
+                await session.async_inject(RESET_BACKGROUND_ESCAPE)
+
+        await self.calls.run("visual", inject)
+        self.highlights.clear_pane(uuid)
 
         return {"status": "ok"}
 
+    async def _dump_stats_periodically(self, path: str) -> None:
+        """Append a stats snapshot as one JSON line every STATS_INTERVAL_ENV seconds (default 60)."""
+        try:
+            interval = float(os.environ.get(STATS_INTERVAL_ENV, "60"))
+        except ValueError:
+            interval = 60.0
+        while self.running:
+            await asyncio.sleep(interval)
+            line = {"time": time.time(), **self.stats.snapshot(self.event_subscribers, self.calls)}
+            try:
+                with open(path, "a") as file:
+                    file.write(json.dumps(line) + "\n")
+            except OSError as e:
+                print(f"Stats dump failed: {e}", file=sys.stderr)
+
     async def _monitor_parent(self) -> None:
-        """Exit if parent process dies (orphan detection)."""
+        """Exit if parent process dies (orphan detection).
+
+        Waits on a process-exit notification (pidfd on Linux, kqueue
+        EVFILT_PROC elsewhere) and only falls back to polling getppid() when
+        the platform offers neither.
+        """
         parent_pid = os.getppid()
-        while self.running:
-            await asyncio.sleep(5)
-            if os.getppid() != parent_pid:
-                print("Parent process gone, exiting", file=sys.stderr, flush=True)
-                self.stop()
-                # os._exit, not sys.exit: SystemExit raised from inside an asyncio
-                # task is swallowed by `iterm2.run_until_complete(retry=True)`, which
-                # reconnects instead of dying — orphaning the daemon. _exit is
-                # immediate and bypasses the retry wrapper.
-                os._exit(0)
+        watch = ProcessExitWatch.open(parent_pid)
+        try:
+            # Re-check after registering: the parent may have died in between
+            while self.running and os.getppid() == parent_pid:
+                if watch is not None:
+                    await watch.wait()
+                    break
+                await asyncio.sleep(POLL_FALLBACK_SECONDS)
+        finally:
+            if watch is not None:
+                watch.close()
+        if self.running:
+            print("Parent process gone, exiting", file=sys.stderr, flush=True)
+            self.stop()
+            # os._exit, not sys.exit: SystemExit raised from inside an asyncio
+            # task is swallowed by `iterm2.run_until_complete(retry=True)`, which
+            # reconnects instead of dying — orphaning the daemon. _exit is
+            # immediate and bypasses the retry wrapper.
+            os._exit(0)
 
     async def _monitor_socket_ownership(self) -> None:
-        """Exit if a newer daemon has rebound the socket path (zombie prevention)."""
-        while self.running:
-            await asyncio.sleep(5)
-            try:
-                current_inode = os.stat(str(self.socket_path)).st_ino
-            except OSError:
-                print("Socket path gone, exiting", file=sys.stderr, flush=True)
-                self.stop(unlink=False)
-                os._exit(0)  # see _monitor_parent: sys.exit is swallowed by the retry wrapper
-            if current_inode != self.socket_inode:
-                print("Socket taken over by newer daemon, exiting", file=sys.stderr, flush=True)
-                self.stop(unlink=False)
-                os._exit(0)  # see _monitor_parent
+        """Exit if a newer daemon has rebound the socket path (zombie prevention).
+
+        Re-checks the socket inode whenever the socket's directory changes
+        (inotify on Linux, kqueue EVFILT_VNODE elsewhere), polling only when
+        no file-system notifications are available.
+        """
+        watch = DirectoryWatch.open(self.socket_path.parent)
+        try:
+            while self.running:
+                # Check before every wait, so a rebind that raced the watch setup is caught
+                self._check_socket_ownership()
+                if watch is not None:
+                    await watch.wait()
+                else:
+                    await asyncio.sleep(POLL_FALLBACK_SECONDS)
+        finally:
+            if watch is not None:
+                watch.close()
+
+    def _check_socket_ownership(self) -> None:
+        try:
+            current_inode = os.stat(str(self.socket_path)).st_ino
+        except OSError:
+            print("Socket path gone, exiting", file=sys.stderr, flush=True)
+            self.stop(unlink=False)
+            os._exit(0)  # see _monitor_parent: sys.exit is swallowed by the retry wrapper
+        if current_inode != self.socket_inode:
+            print("Socket taken over by newer daemon, exiting", file=sys.stderr, flush=True)
+            self.stop(unlink=False)
+            os._exit(0)  # see _monitor_parent
 
     def _extract_uuid(self, session_id: Optional[str]) -> str:
         """Extract UUID from 'w0t0p0:UUID' format.
@@ -486,6 +2345,11 @@ class iTerm2Daemon:
 
     def stop(self, unlink: bool = True) -> None:
         self.running = False
+        if self.tracer.enabled:
+            try:
+                self.tracer.stop()
+            except OSError as e:
+                print(f"Failed to write trace: {e}", file=sys.stderr)
         if self.server:
             self.server.close()
         if unlink:
@@ -499,9 +2363,13 @@ class iTerm2Daemon:
 CONNECTION_TIMEOUT_SECONDS = 30
 
 
-def _emit_structured_error(phase: str, detail: str) -> None:
+def _emit_structured(phase: str, **fields: Any) -> None:
     """Write a single JSON line to stderr that Swift can parse and surface."""
-    print(json.dumps({"phase": phase, "detail": detail}), file=sys.stderr, flush=True)
+    print(json.dumps({"phase": phase, **fields}), file=sys.stderr, flush=True)
+
+
+def _emit_structured_error(phase: str, detail: str) -> None:
+    _emit_structured(phase, detail=detail)
 
 
 def _connection_timeout_handler(_sig: int, _frame: Any) -> None:
@@ -513,17 +2381,7 @@ def _connection_timeout_handler(_sig: int, _frame: Any) -> None:
     sys.exit(1)
 
 
-async def main(connection: iterm2.Connection) -> None:
-    # We made it past the websocket handshake; clear the connection watchdog.
-    signal.alarm(0)
-
-    if len(sys.argv) < 2:
-        print("Usage: iterm2_daemon.py <socket_path>", file=sys.stderr)
-        sys.exit(1)
-
-    socket_path = sys.argv[1]
-    daemon = iTerm2Daemon(socket_path, connection)
-
+def _install_signal_handlers(daemon: iTerm2Daemon) -> None:
     def signal_handler(sig: int, frame: Any) -> None:
         daemon.stop()
         sys.exit(0)
@@ -531,14 +2389,45 @@ async def main(connection: iterm2.Connection) -> None:
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
 
+
+async def main(connection: iterm2.Connection, daemon: Optional[iTerm2Daemon] = None) -> None:
+    # We made it past the websocket handshake; clear the connection watchdog.
+    signal.alarm(0)
+
+    # A reconnect reuses the daemon that is already serving: its socket, accept
+    # loop and watchdogs stay, and attach() drops the old connection's monitors.
+    # A fresh daemon would rebind the socket, and the old one's ownership watch
+    # would take the whole process down with it.
+    if daemon is None:
+        daemon = iTerm2Daemon(sys.argv[1])
+        _install_signal_handlers(daemon)
+    daemon.startup.lap("connect")
+    daemon.attach(connection)
     await daemon.start()
 
 
 if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: iterm2_daemon.py <socket_path>", file=sys.stderr)
+        sys.exit(1)
+
+    # Cold start: bind and answer ping ("warming") before paying for the
+    # iterm2 import and the websocket handshake. The import runs on a worker
+    # thread while the loop serves; the iterm2 library then runs on this same
+    # (current) event loop, so the accept loop keeps going while it connects.
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    early_daemon = iTerm2Daemon(sys.argv[1], startup=StartupClock.from_spawn())
+    _install_signal_handlers(early_daemon)
+    early_daemon.listen()
+    early_daemon.serve_task = loop.create_task(early_daemon.serve())
+
     signal.signal(signal.SIGALRM, _connection_timeout_handler)
     signal.alarm(CONNECTION_TIMEOUT_SECONDS)
     try:
-        iterm2.run_until_complete(main, retry=True)
+        loop.run_until_complete(loop.run_in_executor(None, load_iterm2))
+        early_daemon.startup.lap("import")
+        iterm2.run_until_complete(lambda connection: main(connection, early_daemon), retry=True)
     except SystemExit:
         raise
     except Exception as exc:  # noqa: BLE001
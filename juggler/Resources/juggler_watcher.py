@@ -4,43 +4,235 @@ Juggler watcher for Kitty terminal.
 This is a Kitty "watcher" script that runs inside Kitty's process.
 It posts focus and close events to Juggler's HTTP server so Juggler
 can track which Kitty window is active and detect session termination.
+Title changes, resizes and new windows push a `terminal_info` delta
+(tab name, OS window, pane position) read straight from Kitty's own
+objects, so Juggler never has to run `kitten @ ls` for metadata.
+
+Events are delivered by one background thread over a keep-alive
+connection, so Kitty's main thread never forks, connects or waits.
 
 Install by adding to kitty.conf:
     watcher ~/.config/kitty/juggler_watcher.py
 """
 
-import subprocess
+import collections
+import http.client
+import json
+import threading
+
+try:
+    from kitty.fast_data_types import add_timer, platform_window_id
+except ImportError:  # Outside Kitty: flush metadata immediately
+    add_timer = None
+    platform_window_id = None
 
 
+# The hook server listens on IPv4 loopback only; "localhost" could try ::1 first
+JUGGLER_HOST = "127.0.0.1"
 JUGGLER_PORT = 7483
-JUGGLER_URL = f"http://localhost:{JUGGLER_PORT}/kitty-event"
+JUGGLER_PATH = "/kitty-event"
+
+# Socket timeout for connecting and for each request, in seconds
+REQUEST_TIMEOUT_SECONDS = 2
+# Close the kept-alive connection after this long without events
+IDLE_CLOSE_SECONDS = 30
+# Events waiting for the sender; the oldest is dropped beyond this
+MAX_PENDING_EVENTS = 256
+
+
+class _Sender:
+    """Delivers events to Juggler from a daemon thread, oldest first.
+
+    post() only appends to a bounded queue under a lock. A focus change
+    queued right behind another replaces it: only the latest focus matters.
+    Metadata queued right behind metadata is merged per window.
+    """
+
+    def __init__(self):
+        self.pending = collections.deque()
+        self.wakeup = threading.Condition()
+        self.connection = None
+        self.thread = None
+
+    def post(self, event):
+        with self.wakeup:
+            last = self.pending[-1] if self.pending else None
+            if last is not None and last["event"] == event["event"] == "focus_changed":
+                self.pending[-1] = event
+            elif last is not None and last["event"] == event["event"] == "terminal_info":
+                self.pending[-1] = _merge_terminal_info(last, event)
+            else:
+                if len(self.pending) >= MAX_PENDING_EVENTS:
+                    self.pending.popleft()
+                self.pending.append(event)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="juggler-watcher", daemon=True)
+                self.thread.start()
+            self.wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self.wakeup:
+                while not self.pending:
+                    if self.connection is None:
+                        self.wakeup.wait()  # Nothing to close: sleep until the next post()
+                    elif not self.wakeup.wait(IDLE_CLOSE_SECONDS) and not self.pending:
+                        self._close()
+                event = self.pending.popleft()
+            try:
+                self._send(json.dumps(event, separators=(",", ":")).encode("utf-8"))
+            except Exception:
+                self._close()  # Dropped: fire-and-forget, like the curl it replaces
+
+    def _send(self, body):
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        reused = self.connection is not None
+        try:
+            self._request(body, headers)
+        except (http.client.HTTPException, OSError):
+            self._close()
+            if not reused:
+                raise
+            # The server dropped the idle connection: retry once on a fresh one
+            self._request(body, headers)
+
+    def _request(self, body, headers):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(JUGGLER_HOST, JUGGLER_PORT, timeout=REQUEST_TIMEOUT_SECONDS)
+        self.connection.request("POST", JUGGLER_PATH, body, headers)
+        response = self.connection.getresponse()
+        response.read()
+        if response.will_close:
+            self._close()
+
+    def _close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+def _merge_terminal_info(older, newer):
+    windows = {window["window_id"]: dict(window) for window in older["windows"]}
+    for window in newer["windows"]:
+        windows.setdefault(window["window_id"], {}).update(window)
+    return {"event": "terminal_info", "windows": list(windows.values())}
+
+
+_sender = _Sender()
+
+# Windows whose metadata may have changed since the last flush
+_dirty_windows = set()
+# Last metadata sent per window id, so each push carries only what changed
+_pushed_info = {}
+_boss = None
+_flush_scheduled = False
 
 
 def _post_event(event: str, window_id: int) -> None:
-    """Fire-and-forget POST to Juggler. Never raises."""
+    """Queue a POST to Juggler. Never blocks, never raises."""
+    try:
+        _sender.post({"event": event, "window_id": str(window_id)})
+    except Exception:
+        pass  # Never crash Kitty
+
+
+def _window_info(boss, window):
+    """Read the fields of Juggler's TerminalSessionInfo from Kitty's objects."""
+    tab = boss.tab_for_window(window)
+    if tab is None:
+        return None
+    panes = list(tab)
+    tabs = boss.os_window_map[tab.os_window_id].tabs
+    platform_id = platform_window_id(tab.os_window_id) if platform_window_id else None
+    return {
+        "tab_name": tab.name or tab.title,
+        "window_name": "Window %d" % platform_id if platform_id else "Kitty",
+        "tab_index": tabs.index(tab),
+        "pane_index": panes.index(window),
+        "pane_count": len(panes),
+    }
+
+
+def _flush_metadata(timer_id=None):
+    """Post one terminal_info event for everything marked dirty this tick."""
+    global _flush_scheduled
+    _flush_scheduled = False
+    dirty = list(_dirty_windows)
+    _dirty_windows.clear()
+    deltas = []
+    for window_id in dirty:
+        window = _boss.window_id_map.get(window_id)
+        if window is None:
+            _pushed_info.pop(window_id, None)
+            continue
+        try:
+            info = _window_info(_boss, window)
+        except Exception:
+            continue
+        if info is None:
+            continue
+        previous = _pushed_info.get(window_id, {})
+        changed = {key: value for key, value in info.items() if previous.get(key) != value}
+        if changed:
+            _pushed_info[window_id] = info
+            deltas.append(dict(window_id=str(window_id), **changed))
+    if deltas:
+        _sender.post({"event": "terminal_info", "windows": deltas})
+
+
+def _mark_dirty(boss, window_ids):
+    """Queue metadata for `window_ids`, flushed once on the next loop tick."""
+    global _boss, _flush_scheduled
     try:
-        payload = f'{{"event":"{event}","window_id":"{window_id}"}}'
-        subprocess.Popen(
-            [
-                "curl", "-s", "-X", "POST", JUGGLER_URL,
-                "-H", "Content-Type: application/json",
-                "-d", payload,
-                "--connect-timeout", "1",
-                "--max-time", "2",
-            ],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        _boss = boss
+        _dirty_windows.update(window_ids)
+        if _flush_scheduled:
+            return
+        if add_timer is None:
+            _flush_metadata()
+        else:
+            add_timer(_flush_metadata, 0, False)
+            _flush_scheduled = True
     except Exception:
         pass  # Never crash Kitty
 
 
+def _mark_tab_dirty(boss, window):
+    """Tab names and pane positions are shared, so refresh the whole tab."""
+    try:
+        tab = boss.tab_for_window(window)
+        window_ids = [pane.id for pane in tab] if tab is not None else []
+    except Exception:
+        window_ids = []
+    _mark_dirty(boss, window_ids or [window.id])
+
+
+def on_load(boss, data):
+    """Called by Kitty once when the watcher is loaded: push every window."""
+    _mark_dirty(boss, list(boss.window_id_map))
+
+
 def on_focus_change(boss, window, data):
     """Called by Kitty when a window gains or loses focus."""
     if data.get("focused"):
         _post_event("focus_changed", window.id)
+        _mark_tab_dirty(boss, window)
+
+
+def on_title_change(boss, window, data):
+    """Called by Kitty when a window's title changes; tab titles follow it."""
+    _mark_tab_dirty(boss, window)
+
+
+def on_resize(boss, window, data):
+    """Called by Kitty when a window is created or its layout changes."""
+    _mark_tab_dirty(boss, window)
 
 
 def on_close(boss, window, data):
     """Called by Kitty when a window is closed."""
     _post_event("session_terminated", window.id)
+    _mark_tab_dirty(boss, window)
@@ -50,6 +50,9 @@ enum AntigravityHooksInstaller {
     /// URL are injectable for testing; production callers omit them.
     static func installHooks(
         bundledScriptURL: URL? = Bundle.main.url(forResource: "antigravity-notify", withExtension: "sh"),
+        bundledRelayURL: URL? = Bundle.main.url(forResource: "hook_relay", withExtension: "py"),
+        bundledRelayClientURL: URL? = Bundle.main.url(forResource: "hook_relay", withExtension: "sh"),
+        bundledPayloadModuleURL: URL? = Bundle.main.url(forResource: "hook_payload", withExtension: "py"),
         hooksDirectory: String = Self.hooksDirectory,
         notifyScriptPath: String = Self.notifyScriptPath,
         hooksJSONPath: String = Self.hooksJSONPath
@@ -57,6 +60,9 @@ enum AntigravityHooksInstaller {
         guard let bundledScript = bundledScriptURL else {
             return "Antigravity notify.sh not found in app bundle"
         }
+        guard let bundledPayloadModule = bundledPayloadModuleURL else {
+            return "hook_payload.py not found in app bundle"
+        }
 
         do {
             try FileManager.default.createDirectory(
@@ -74,6 +80,25 @@ enum AntigravityHooksInstaller {
                 ofItemAtPath: notifyScriptPath
             )
 
+            // notify.sh builds its payload by importing this module; the first event
+            // writes its bytecode cache next to it
+            let payloadDestination = URL(fileURLWithPath: hooksDirectory + "/hook_payload.py")
+            if FileManager.default.fileExists(atPath: payloadDestination.path) {
+                try FileManager.default.removeItem(at: payloadDestination)
+            }
+            try FileManager.default.copyItem(at: bundledPayloadModule, to: payloadDestination)
+
+            // Optional resident relay and the client notify.sh sources to reach it: notify.sh
+            // hands events to it when it is running and takes the direct path otherwise, so
+            // a missing relay is not an error.
+            for relayURL in [bundledRelayURL, bundledRelayClientURL].compactMap({ $0 }) {
+                let relayDestination = URL(fileURLWithPath: hooksDirectory + "/" + relayURL.lastPathComponent)
+                if FileManager.default.fileExists(atPath: relayDestination.path) {
+                    try FileManager.default.removeItem(at: relayDestination)
+                }
+                try FileManager.default.copyItem(at: relayURL, to: relayDestination)
+            }
+
             try mergeHooksJSON(at: hooksJSONPath, notifyScriptPath: notifyScriptPath)
             return nil
         } catch {
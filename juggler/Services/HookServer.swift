@@ -78,7 +78,11 @@ actor HookServer {
 
     private func handleConnection(_ connection: NWConnection) {
         connection.start(queue: .global())
+        serveNextRequest(on: connection)
+    }
 
+    /// Reads one request and answers it. A keep-alive connection comes back here after each response.
+    private nonisolated func serveNextRequest(on connection: NWConnection) {
         receiveHTTPRequest(connection) { request in
             Task {
                 await self.acknowledge(request, on: connection)
@@ -87,8 +91,9 @@ actor HookServer {
     }
 
     private func acknowledge(_ request: HTTPRequest, on connection: NWConnection) async {
+        let keepAlive = request.keepAlive
         await acknowledge(request) { [weak self] response in
-            self?.sendHTTPResponseData(connection, data: response.serialize())
+            self?.sendHTTPResponseData(connection, data: response.serialize(keepAlive: keepAlive), keepAlive: keepAlive)
         }
     }
 
@@ -209,9 +214,13 @@ actor HookServer {
         return true
     }
 
-    private nonisolated func sendHTTPResponseData(_ connection: NWConnection, data: Data) {
-        connection.send(content: data, completion: .contentProcessed { _ in
-            connection.cancel()
+    private nonisolated func sendHTTPResponseData(_ connection: NWConnection, data: Data, keepAlive: Bool) {
+        connection.send(content: data, completion: .contentProcessed { [weak self] error in
+            guard keepAlive, error == nil, let self else {
+                connection.cancel()
+                return
+            }
+            self.serveNextRequest(on: connection)
         })
     }
 
@@ -573,9 +582,23 @@ actor HookServer {
                 discoverKittySocket: true
             )
         case "session_terminated":
+            await KittyBridge.shared.forgetPushedInfo(windowID: payload.windowID)
             await MainActor.run {
                 self.sessionManager.removeSessionsByTerminalID(payload.windowID)
             }
+        case "terminal_info":
+            let updated = await KittyBridge.shared.applyPushedInfo(payload.windows)
+            await MainActor.run {
+                for info in updated {
+                    self.sessionManager.updateSessionTerminalInfo(
+                        terminalSessionID: info.id,
+                        tabName: info.tabName,
+                        windowName: info.windowName,
+                        paneIndex: info.paneIndex,
+                        paneCount: info.paneCount
+                    )
+                }
+            }
         default:
             await MainActor.run {
                 logDebug(.kitty, "Unknown kitty event: \(payload.event)")
@@ -590,6 +613,9 @@ struct HTTPRequest: Sendable {
     let method: String
     let path: String
     let body: String
+    /// The client sent `Connection: keep-alive` (the Kitty watcher does). Every other client gets
+    /// `Connection: close`, as before, even though HTTP/1.1 would default to keep-alive.
+    var keepAlive = false
 
     nonisolated static func parse(_ data: Data) -> HTTPRequest? {
         guard let string = String(bytes: data, encoding: .utf8) else { return nil }
@@ -603,13 +629,19 @@ struct HTTPRequest: Sendable {
         let method = String(parts[0])
         let path = String(parts[1])
 
-        if let emptyLineIndex = lines.firstIndex(of: "") {
+        let emptyLineIndex = lines.firstIndex(of: "")
+        let keepAlive = lines[1 ..< (emptyLineIndex ?? lines.endIndex)].contains { line in
+            let header = line.lowercased()
+            return header.hasPrefix("connection:") && header.contains("keep-alive")
+        }
+
+        if let emptyLineIndex {
             let bodyLines = lines.dropFirst(emptyLineIndex + 1)
             let body = bodyLines.joined(separator: "\r\n")
-            return HTTPRequest(method: method, path: path, body: body)
+            return HTTPRequest(method: method, path: path, body: body, keepAlive: keepAlive)
         }
 
-        return HTTPRequest(method: method, path: path, body: "")
+        return HTTPRequest(method: method, path: path, body: "", keepAlive: keepAlive)
     }
 }
 
@@ -617,7 +649,7 @@ struct HTTPResponse: Sendable {
     let status: Int
     let body: String
 
-    nonisolated func serialize() -> Data {
+    nonisolated func serialize(keepAlive: Bool = false) -> Data {
         let statusText = switch status {
         case 200: "OK"
         case 400: "Bad Request"
@@ -630,7 +662,7 @@ struct HTTPResponse: Sendable {
         HTTP/1.1 \(status) \(statusText)\r
         Content-Type: application/json\r
         Content-Length: \(body.utf8.count)\r
-        Connection: close\r
+        Connection: \(keepAlive ? "keep-alive" : "close")\r
         \r
         \(body)
         """
@@ -771,11 +803,14 @@ extension UnifiedHookPayload.TmuxInfo: Decodable {
 
 struct KittyEventPayload: Sendable {
     let event: String
+    /// Empty for `terminal_info`, which carries its window ids in `windows`.
     let windowID: String
+    let windows: [KittyWindowInfo]
 
     enum CodingKeys: String, CodingKey {
         case event
         case windowID = "window_id"
+        case windows
     }
 }
 
@@ -783,6 +818,38 @@ extension KittyEventPayload: Decodable {
     nonisolated init(from decoder: any Decoder) throws {
         let container = try decoder.container(keyedBy: CodingKeys.self)
         event = try container.decode(String.self, forKey: .event)
+        windowID = try container.decodeIfPresent(String.self, forKey: .windowID) ?? ""
+        windows = try container.decodeIfPresent([KittyWindowInfo].self, forKey: .windows) ?? []
+    }
+}
+
+/// One window's metadata delta from the watcher; absent fields are unchanged.
+struct KittyWindowInfo: Sendable {
+    let windowID: String
+    let tabName: String?
+    let windowName: String?
+    let tabIndex: Int?
+    let paneIndex: Int?
+    let paneCount: Int?
+
+    enum CodingKeys: String, CodingKey {
+        case windowID = "window_id"
+        case tabName = "tab_name"
+        case windowName = "window_name"
+        case tabIndex = "tab_index"
+        case paneIndex = "pane_index"
+        case paneCount = "pane_count"
+    }
+}
+
+extension KittyWindowInfo: Decodable {
+    nonisolated init(from decoder: any Decoder) throws {
+        let container = try decoder.container(keyedBy: CodingKeys.self)
         windowID = try container.decode(String.self, forKey: .windowID)
+        tabName = try container.decodeIfPresent(String.self, forKey: .tabName)
+        windowName = try container.decodeIfPresent(String.self, forKey: .windowName)
+        tabIndex = try container.decodeIfPresent(Int.self, forKey: .tabIndex)
+        paneIndex = try container.decodeIfPresent(Int.self, forKey: .paneIndex)
+        paneCount = try container.decodeIfPresent(Int.self, forKey: .paneCount)
     }
 }
@@ -30,6 +30,16 @@ enum IntegrationSync {
         return contentsAreStale(installed: installed, bundled: bundled)
     }
 
+    /// Whether the hook_payload.py module installed next to `notifyScriptPath` is missing or differs
+    /// from the bundled one. notify.sh cannot build a payload without it, so unlike `isStale` a
+    /// missing module counts as stale — but only when notify.sh itself is installed.
+    static func payloadModuleIsStale(notifyScriptPath: String) -> Bool {
+        guard FileManager.default.fileExists(atPath: notifyScriptPath) else { return false }
+        let modulePath = (notifyScriptPath as NSString).deletingLastPathComponent + "/hook_payload.py"
+        guard FileManager.default.fileExists(atPath: modulePath) else { return true }
+        return isStale(installedPath: modulePath, bundledResource: "hook_payload", ext: "py")
+    }
+
     /// Pure staleness comparison on already-loaded contents. A missing side (`nil`) means
     /// "can't tell" and is treated as not-stale, so a failed read never triggers a reinstall.
     static func contentsAreStale(installed: Data?, bundled: Data?) -> Bool {
@@ -39,6 +49,7 @@ enum IntegrationSync {
 
     private static func syncClaudeCode() async {
         guard isStale(installedPath: ScriptInstaller.claudeNotifyScriptPath, bundledResource: "notify", ext: "sh")
+            || payloadModuleIsStale(notifyScriptPath: ScriptInstaller.claudeNotifyScriptPath)
         else { return }
         logInfo(.hooks, "Claude Code hook is out of date — reinstalling")
         if let error = await ScriptInstaller.installHooks() {
@@ -76,7 +87,7 @@ enum IntegrationSync {
             installedPath: CodexHooksInstaller.notifyScriptPath,
             bundledResource: "codex-notify",
             ext: "sh"
-        )
+        ) || payloadModuleIsStale(notifyScriptPath: CodexHooksInstaller.notifyScriptPath)
         guard codexNeedsReinstall(
             scriptInstalled: FileManager.default.fileExists(atPath: CodexHooksInstaller.notifyScriptPath),
             scriptStale: scriptStale,
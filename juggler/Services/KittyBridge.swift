@@ -14,6 +14,8 @@ actor KittyBridge: TerminalBridge {
     private var originalColors: [String: String] = [:]
     private var activeTabResetTasks: [String: Task<Void, Never>] = [:]
     private var activePaneResetTasks: [String: Task<Void, Never>] = [:]
+    // Pushed by the watcher's terminal_info events; answers getSessionInfo without `kitten @ ls`
+    private var pushedInfo: [String: TerminalSessionInfo] = [:]
 
     private var kittenPath: String?
 
@@ -161,6 +163,7 @@ actor KittyBridge: TerminalBridge {
         activeTabResetTasks.removeAll()
         activePaneResetTasks.removeAll()
         socketPaths.removeAll()
+        pushedInfo.removeAll()
         originalColors.removeAll()
         kittenPath = nil
     }
@@ -269,7 +272,32 @@ actor KittyBridge: TerminalBridge {
         }
     }
 
+    /// Merges metadata deltas pushed by the watcher and returns each updated window's full
+    /// info. A window first seen through a partial delta gets `parseKittyLsOutput`'s fallbacks.
+    func applyPushedInfo(_ deltas: [KittyWindowInfo]) -> [TerminalSessionInfo] {
+        deltas.map { delta in
+            let current = pushedInfo[delta.windowID]
+            let tabIndex = delta.tabIndex ?? current?.tabIndex ?? 0
+            let info = TerminalSessionInfo(
+                id: delta.windowID,
+                tabName: delta.tabName ?? current?.tabName ?? "Tab \(tabIndex + 1)",
+                windowName: delta.windowName ?? current?.windowName ?? "Kitty",
+                tabIndex: tabIndex,
+                paneIndex: delta.paneIndex ?? current?.paneIndex ?? 0,
+                paneCount: delta.paneCount ?? current?.paneCount ?? 1,
+                isActive: false
+            )
+            pushedInfo[delta.windowID] = info
+            return info
+        }
+    }
+
+    func forgetPushedInfo(windowID: String) {
+        pushedInfo[windowID] = nil
+    }
+
     func getSessionInfo(sessionID: String) async throws -> TerminalSessionInfo? {
+        if let info = pushedInfo[sessionID] { return info }
         guard let socketPath = socketPaths[sessionID] else { return nil }
 
         guard let output = try await runKittenCommand(
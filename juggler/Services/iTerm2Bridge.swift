@@ -60,6 +60,39 @@ final nonisolated class StderrRingBuffer: @unchecked Sendable {
     }
 }
 
+/// Where the event subscription left off: the daemon's epoch and the last event
+/// seq handled. Reconnecting with it makes the daemon replay just the missed
+/// events (or send `resync_required`). Written from the event queue (subscribe
+/// ack) and the actor (events), hence the lock.
+final nonisolated class EventResumeCursor: @unchecked Sendable {
+    private var epoch: String?
+    private var seq = 0
+    private let lock = NSLock()
+
+    func subscribeRequest() -> String {
+        lock.lock()
+        defer { lock.unlock() }
+        guard let epoch else { return "{\"command\": \"subscribe\"}\n" }
+        return "{\"command\": \"subscribe\", \"since_seq\": \(seq), \"epoch\": \"\(epoch)\"}\n"
+    }
+
+    /// A new epoch means a new daemon: its numbering starts at the ack's seq.
+    func acknowledge(epoch newEpoch: String, seq ackSeq: Int) {
+        lock.lock()
+        defer { lock.unlock() }
+        if epoch != newEpoch {
+            epoch = newEpoch
+            seq = ackSeq
+        }
+    }
+
+    func advance(to newSeq: Int) {
+        lock.lock()
+        defer { lock.unlock() }
+        seq = max(seq, newSeq)
+    }
+}
+
 /// On EOF the handler removes itself. This is load-bearing: an empty read means the
 /// write end closed, and the kernel then reports the fd readable-at-EOF *forever*, so
 /// GCD re-fires the handler in a tight loop that pins a CPU core per dead daemon. The
@@ -98,6 +131,7 @@ actor ITerm2Bridge: TerminalBridge {
     private let eventQueue = DispatchQueue(label: "com.juggler.eventlistener")
     private let stderrQueue = DispatchQueue(label: "com.juggler.daemon.stderr")
     private var eventLineBuffer = Data()
+    private let eventCursor = EventResumeCursor()
 
     private var healthCheckTask: Task<Void, Never>?
     private var startupMonitorTask: Task<Void, Never>?
@@ -159,6 +193,8 @@ actor ITerm2Bridge: TerminalBridge {
         var env = ProcessInfo.processInfo.environment
         env["ITERM2_COOKIE"] = cookie
         env["ITERM2_KEY"] = key
+        // Lets the daemon's structured `ready` line include interpreter start-up
+        env["JUGGLER_DAEMON_SPAWNED_AT"] = String(Date().timeIntervalSince1970)
         process.environment = env
 
         // Capture stderr through a Pipe so we can surface the daemon's own diagnostics
@@ -457,7 +493,7 @@ actor ITerm2Bridge: TerminalBridge {
     private nonisolated func startEventListener() {
         eventQueue.async { [self] in
             do {
-                let sock = try connectEventSocket()
+                let (sock, pending) = try connectEventSocket()
 
                 let source = DispatchSource.makeReadSource(fileDescriptor: sock, queue: eventQueue)
 
@@ -472,8 +508,14 @@ actor ITerm2Bridge: TerminalBridge {
                     }
                 }
 
-                Task { await self.setEventReadSource(source) }
-                source.resume()
+                // Resume only after the events that came with the ack, to keep order
+                Task {
+                    await self.setEventReadSource(source)
+                    if !pending.isEmpty {
+                        await self.processReceivedData(pending)
+                    }
+                    source.resume()
+                }
 
                 Task { @MainActor in
                     logInfo(.daemon, "Focus event listener connected")
@@ -488,9 +530,11 @@ actor ITerm2Bridge: TerminalBridge {
 
     private func setEventReadSource(_ source: DispatchSourceRead) {
         eventReadSource = source
+        // A partial line from the previous connection would corrupt the first replayed event
+        eventLineBuffer.removeAll()
     }
 
-    private nonisolated func connectEventSocket() throws -> Int32 {
+    private nonisolated func connectEventSocket() throws -> (Int32, Data) {
         guard FileManager.default.fileExists(atPath: socketPath) else {
             throw TerminalBridgeError.daemonNotRunning
         }
@@ -519,7 +563,7 @@ actor ITerm2Bridge: TerminalBridge {
             throw TerminalBridgeError.connectionFailed
         }
 
-        let subscribeRequest = "{\"command\": \"subscribe\"}\n"
+        let subscribeRequest = eventCursor.subscribeRequest()
         _ = subscribeRequest.withCString { ptr in
             send(sock, ptr, strlen(ptr), 0)
         }
@@ -534,8 +578,16 @@ actor ITerm2Bridge: TerminalBridge {
             close(sock)
             throw TerminalBridgeError.invalidResponse
         }
+        // Replayed events follow the ack immediately and may share its read
+        let received = Data(ackBuffer[0 ..< ackBytes])
+        let ackEnd = received.firstIndex(of: UInt8(ascii: "\n")) ?? received.endIndex
+        if let ack = try? JSONDecoder().decode(SubscribeAck.self, from: received[..<ackEnd]),
+           let epoch = ack.epoch, let seq = ack.seq {
+            eventCursor.acknowledge(epoch: epoch, seq: seq)
+        }
+        let pending = ackEnd < received.endIndex ? Data(received[(ackEnd + 1)...]) : Data()
 
-        return sock
+        return (sock, pending)
     }
 
     private nonisolated func handleSocketData(socket sock: Int32) {
@@ -614,6 +666,15 @@ actor ITerm2Bridge: TerminalBridge {
             eventLineBuffer.removeSubrange(eventLineBuffer.startIndex ... newlineIndex)
 
             if let event = try? JSONDecoder().decode(DaemonEvent.self, from: Data(lineData)) {
+                if let seq = event.seq {
+                    eventCursor.advance(to: seq)
+                }
+                if event.event == "resync_required" {
+                    let reason = event.reason ?? "unknown"
+                    await MainActor.run { logInfo(.daemon, "Missed events (\(reason)), resyncing sessions") }
+                    Task { await self.resyncTrackedSessions() }
+                    continue
+                }
                 await handleDaemonEvent(event)
             }
         }
@@ -743,6 +804,33 @@ actor ITerm2Bridge: TerminalBridge {
         try await start()
     }
 
+    /// Re-query every tracked iTerm2 session. Only needed when the daemon could
+    /// not replay what this listener missed; a normal reconnect replays events.
+    private func resyncTrackedSessions() async {
+        let terminalIDs = await MainActor.run {
+            Set(SessionManager.shared.sessions.filter { $0.terminalType == .iterm2 }.map(\.terminalSessionID))
+        }
+        for terminalID in terminalIDs {
+            do {
+                if let info = try await getSessionInfo(sessionID: terminalID) {
+                    await MainActor.run {
+                        SessionManager.shared.updateSessionTerminalInfo(
+                            terminalSessionID: terminalID,
+                            tabName: info.tabName,
+                            windowName: info.windowName,
+                            paneIndex: info.paneIndex,
+                            paneCount: info.paneCount
+                        )
+                    }
+                } else {
+                    await MainActor.run { SessionManager.shared.removeSessionsByTerminalID(terminalID) }
+                }
+            } catch {
+                await MainActor.run { logWarning(.daemon, "Resync failed for \(terminalID): \(error)") }
+            }
+        }
+    }
+
     @MainActor
     private func handleDaemonEvent(_ event: DaemonEvent) {
         switch event.event {
@@ -1040,6 +1128,8 @@ struct DaemonEvent: Sendable {
     let windowName: String?
     let paneIndex: Int?
     let paneCount: Int?
+    let seq: Int?
+    let reason: String?
 
     enum CodingKeys: String, CodingKey {
         case event
@@ -1048,6 +1138,8 @@ struct DaemonEvent: Sendable {
         case windowName = "window_name"
         case paneIndex = "pane_index"
         case paneCount = "pane_count"
+        case seq
+        case reason
     }
 }
 
@@ -1060,5 +1152,26 @@ extension DaemonEvent: Decodable {
         windowName = try container.decodeIfPresent(String.self, forKey: .windowName)
         paneIndex = try container.decodeIfPresent(Int.self, forKey: .paneIndex)
         paneCount = try container.decodeIfPresent(Int.self, forKey: .paneCount)
+        seq = try container.decodeIfPresent(Int.self, forKey: .seq)
+        reason = try container.decodeIfPresent(String.self, forKey: .reason)
+    }
+}
+
+/// Reply to `subscribe`: where the daemon's event numbering stands.
+struct SubscribeAck: Sendable {
+    let seq: Int?
+    let epoch: String?
+
+    enum CodingKeys: String, CodingKey {
+        case seq
+        case epoch
+    }
+}
+
+extension SubscribeAck: Decodable {
+    nonisolated init(from decoder: any Decoder) throws {
+        let container = try decoder.container(keyedBy: CodingKeys.self)
+        seq = try container.decodeIfPresent(Int.self, forKey: .seq)
+        epoch = try container.decodeIfPresent(String.self, forKey: .epoch)
     }
 }
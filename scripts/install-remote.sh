@@ -31,6 +31,7 @@ if [ -d "$HOME/.claude" ] || command -v claude >/dev/null 2>&1; then
         set -e
         curl -fsSL "$BASE/hooks/install.sh" -o "$TMP/cc-install.sh"
         curl -fsSL "$BASE/hooks/notify.sh"  -o "$TMP/notify.sh"
+        curl -fsSL "$BASE/hook_payload.py"  -o "$TMP/hook_payload.py"
         chmod +x "$TMP/cc-install.sh" "$TMP/notify.sh"
         bash "$TMP/cc-install.sh"
     ); then
@@ -48,6 +49,7 @@ if [ -d "$HOME/.codex" ] || command -v codex >/dev/null 2>&1; then
         set -e
         curl -fsSL "$BASE/codex-hooks/codex-install.sh" -o "$TMP/codex-install.sh"
         curl -fsSL "$BASE/codex-hooks/codex-notify.sh"   -o "$TMP/codex-notify.sh"
+        curl -fsSL "$BASE/hook_payload.py"               -o "$TMP/hook_payload.py"
         chmod +x "$TMP/codex-install.sh" "$TMP/codex-notify.sh"
         bash "$TMP/codex-install.sh"
     ); then
@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+"""Benchmark iterm2_daemon.py headless, against the fake iterm2 in fake_iterm2/.
+
+Runs the real daemon in-process on a temporary socket and drives it the way
+the Swift bridge does: one-shot and multiplexed requests, subscriber
+connections, and layout changes on the fake backend. Client and daemon share
+one event loop, so absolute numbers include client overhead. Compare runs
+against each other, not against a real iTerm2.
+
+    python3 scripts/perf/daemon_bench.py --output bench.json
+    python3 scripts/perf/daemon_bench.py --compare bench.json
+
+Scenarios (select with --only):
+  throughput  one-shot get_session_info from 4 clients, pipelined multiplex
+              (newline and length-prefixed framing)
+  activate    activate latency, sequential
+  highlight   highlight latency, sequential, plus a 50-request burst on one pane,
+              the writes resets cost, and the background restored after a
+              profile switch mid-highlight (exits 1 if it is wrong)
+  fanout      focus_changed delivery latency to 1/10/100 subscribers
+  layout      index refresh cost with thousands of sessions
+  scheduler   keyed supersede on the API call scheduler when the queued
+              caller is cancelled; exits 1 if the newer caller fails
+  lifecycle   the daemon script exiting when its (stand-in) parent is killed
+              and when its socket is rebound, via OS notifications and via
+              the polling fallback; exits 1 if it does not exit
+  startup     cold start of the daemon script: first ping answer, ready, phases
+
+--compare exits 1 when a `*_ms` metric grew, or a `*_per_second` metric
+shrank, by more than --tolerance (default 25%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(Path(__file__).resolve().parent / "fake_iterm2"))
+sys.path.insert(0, str(ROOT / "juggler" / "Resources"))
+
+import iterm2  # noqa: E402  (the fake)
+import iterm2_daemon  # noqa: E402
+
+SCENARIOS = ("throughput", "activate", "highlight", "fanout", "layout", "scheduler", "lifecycle", "startup")
+
+# The startup scenario runs the daemon script in a subprocess against the fake,
+# which simulates the real library's import cost and websocket handshake.
+DAEMON_SCRIPT = ROOT / "juggler" / "Resources" / "iterm2_daemon.py"
+STARTUP_ENV = {"FAKE_ITERM2_IMPORT_MS": "150", "FAKE_ITERM2_CONNECT_MS": "50", "FAKE_ITERM2_GRID": "10x5x2"}
+
+# Stand-in for the Swift bridge: starts the daemon command given as its
+# arguments, prints the daemon's pid and stays alive until it is killed.
+STAND_IN_PARENT = (
+    "import subprocess, sys, time\n"
+    "daemon = subprocess.Popen(sys.argv[1:], stdout=subprocess.DEVNULL)\n"
+    "print(daemon.pid, flush=True)\n"
+    "time.sleep(3600)\n"
+)
+# Runs the daemon script as if the platform had no process-exit or file-system
+# notifications (no pidfd, kqueue or inotify), so it takes the polling fallback.
+WITHOUT_NOTIFICATIONS = (
+    "import ctypes, os, runpy, select, sys\n"
+    "for module, name in ((os, 'pidfd_open'), (select, 'kqueue')):\n"
+    "    if hasattr(module, name):\n"
+    "        delattr(module, name)\n"
+    "def no_libc(*args, **kwargs):\n"
+    "    raise OSError('no inotify')\n"
+    "ctypes.CDLL = no_libc\n"
+    "sys.argv = sys.argv[1:]\n"
+    "runpy.run_path(sys.argv[0], run_name='__main__')\n"
+)
+
+HIGHLIGHT = {
+    "tab": {"enabled": True, "color": [255, 165, 0], "duration": 0.05},
+    "pane": {"enabled": True, "color": [255, 165, 0], "duration": 0.05},
+}
+
+
+def process_gone(pid: int) -> bool:
+    """True once `pid` has exited, including as a zombie nobody has reaped yet."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            return file.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except (OSError, IndexError):
+        return False
+
+
+def percentiles(samples: list[float]) -> dict[str, Any]:
+    """count/p50/p95/p99/max in milliseconds, from samples in seconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": at(0.50),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+class FramedStream:
+    """A client connection speaking newline- or length-framed JSON."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, framing: str) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.framing = framing
+
+    def send(self, message: dict[str, Any]) -> None:
+        payload = json.dumps(message).encode()
+        if self.framing == "length":
+            self.writer.write(iterm2_daemon.LENGTH_PREFIX.pack(len(payload)) + payload)
+        else:
+            self.writer.write(payload + b"\n")
+
+    async def recv(self) -> dict[str, Any]:
+        if self.framing == "length":
+            header = await self.reader.readexactly(iterm2_daemon.LENGTH_PREFIX.size)
+            (size,) = iterm2_daemon.LENGTH_PREFIX.unpack(header)
+            return json.loads(await self.reader.readexactly(size))
+        return json.loads(await self.reader.readline())
+
+
+class Bench:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.quick: bool = args.quick
+
+    def backend(self, latency_ms: Optional[float] = None) -> iterm2.Backend:
+        latency = self.args.latency_ms if latency_ms is None else latency_ms
+        failures = dict(item.split("=", 1) for item in self.args.fail)
+        return iterm2.Backend(
+            latency={"default": latency / 1000},
+            jitter=self.args.jitter,
+            failures={name: float(p) for name, p in failures.items()},
+            seed=self.args.seed,
+        )
+
+    @contextlib.asynccontextmanager
+    async def daemon(self, backend: iterm2.Backend) -> AsyncIterator[tuple[Any, str]]:
+        """Start a daemon on a temp socket; tear down every task it spawned."""
+        with tempfile.TemporaryDirectory(prefix="juggler-bench-") as tmp:
+            path = os.path.join(tmp, "daemon.sock")
+            daemon = iterm2_daemon.iTerm2Daemon(path, iterm2.Connection(backend))
+            before = asyncio.all_tasks()
+            server = asyncio.create_task(daemon.start())
+            while not daemon.ready.is_set():
+                if server.done():
+                    server.result()
+                await asyncio.sleep(0.001)
+            try:
+                yield daemon, path
+            finally:
+                daemon.running = False
+                spawned = asyncio.all_tasks() - before - {asyncio.current_task()}
+                for task in spawned:
+                    task.cancel()
+                await asyncio.gather(*spawned, return_exceptions=True)
+                daemon.stop()
+
+    # --- clients ---
+
+    @staticmethod
+    async def request(path: str, payload: dict[str, Any]) -> dict[str, Any]:
+        reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            writer.write(json.dumps(payload).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def open_stream(path: str, payload: dict[str, Any]) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_unix_connection(path, limit=iterm2_daemon.MAX_FRAME_BYTES)
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+        ack = json.loads(await reader.readline())
+        if ack.get("status") != "ok":
+            raise RuntimeError(f"{payload['command']} rejected: {ack}")
+        return reader, writer
+
+    async def open_framed(self, path: str, payload: dict[str, Any], framing: str) -> FramedStream:
+        """Like open_stream, after negotiating `framing` (JSON encoding) with hello."""
+        reader, writer = await asyncio.open_unix_connection(path, limit=iterm2_daemon.MAX_FRAME_BYTES)
+        stream = FramedStream(reader, writer, "newline")
+        if framing != "newline":
+            stream.send({"command": "hello", "framing": framing, "encodings": ["json"]})
+            reply = await stream.recv()
+            if reply.get("status") != "ok":
+                raise RuntimeError(f"hello rejected: {reply}")
+            stream.framing = framing
+        stream.send(payload)
+        ack = await stream.recv()
+        if ack.get("status") != "ok":
+            raise RuntimeError(f"{payload['command']} rejected: {ack}")
+        return stream
+
+    # --- scenarios ---
+
+    async def throughput(self) -> dict[str, Any]:
+        backend = self.backend()
+        sessions = backend.build(4, 5, 2)
+        duration = 0.5 if self.quick else 2.0
+        result: dict[str, Any] = {}
+        async with self.daemon(backend) as (_, path):
+            latencies: list[float] = []
+            deadline = time.perf_counter() + duration
+
+            async def client(rng: random.Random) -> None:
+                while time.perf_counter() < deadline:
+                    session = rng.choice(sessions)
+                    started = time.perf_counter()
+                    response = await self.request(path, {"command": "get_session_info", "session_id": session.session_id})
+                    latencies.append(time.perf_counter() - started)
+                    assert response["status"] == "ok", response
+
+            # Stay under the daemon's listen() backlog of 5: past it, a
+            # non-blocking connect() on a Unix socket fails instead of queueing
+            clients = 4
+            started = time.perf_counter()
+            await asyncio.gather(*(client(random.Random(i)) for i in range(clients)))
+            elapsed = time.perf_counter() - started
+            result["oneshot"] = {
+                "clients": clients,
+                "requests": len(latencies),
+                "requests_per_second": round(len(latencies) / elapsed, 1),
+                "latency": percentiles(latencies),
+            }
+
+            result["multiplex"] = await self._multiplex(path, sessions, "newline")
+            result["multiplex_length"] = await self._multiplex(path, sessions, "length")
+        return result
+
+    async def _multiplex(self, path: str, sessions: list[Any], framing: str) -> dict[str, Any]:
+        """Pipelined get_session_info over one multiplexed connection, 64 in flight."""
+        stream = await self.open_framed(path, {"command": "multiplex"}, framing)
+        total = 2000 if self.quick else 10000
+        window = asyncio.Semaphore(64)
+        sent: dict[int, float] = {}
+        latencies: list[float] = []
+
+        async def send_all() -> None:
+            for request_id in range(total):
+                await window.acquire()
+                sent[request_id] = time.perf_counter()
+                stream.send({
+                    "id": request_id, "command": "get_session_info",
+                    "session_id": sessions[request_id % len(sessions)].session_id,
+                })
+                await stream.writer.drain()
+
+        started = time.perf_counter()
+        sender = asyncio.create_task(send_all())
+        for _ in range(total):
+            response = await stream.recv()
+            latencies.append(time.perf_counter() - sent.pop(response["id"]))
+            window.release()
+        elapsed = time.perf_counter() - started
+        await sender
+        stream.writer.close()
+        return {
+            "in_flight": 64,
+            "requests": total,
+            "requests_per_second": round(total / elapsed, 1),
+            "latency": percentiles(latencies),
+        }
+
+    async def _sequential(self, command: str, extra: dict[str, Any]) -> tuple[list[float], dict[str, int], int]:
+        backend = self.backend()
+        sessions = backend.build(2, 5, 2)
+        count = 50 if self.quick else 200
+        rng = random.Random(self.args.seed)
+        latencies: list[float] = []
+        errors = 0
+        async with self.daemon(backend) as (_, path):
+            calls_before = dict(backend.calls)
+            for _ in range(count):
+                session = rng.choice(sessions)
+                started = time.perf_counter()
+                response = await self.request(path, {"command": command, "session_id": session.session_id, **extra})
+                latencies.append(time.perf_counter() - started)
+                errors += response["status"] != "ok"
+            calls = {name: n - calls_before.get(name, 0) for name, n in backend.calls.items()
+                     if n != calls_before.get(name, 0)}
+        return latencies, calls, errors
+
+    async def activate(self) -> dict[str, Any]:
+        latencies, calls, errors = await self._sequential("activate", {})
+        return {"latency": percentiles(latencies), "errors": errors, "api_calls": calls}
+
+    async def highlight(self) -> dict[str, Any]:
+        latencies, calls, errors = await self._sequential("highlight", HIGHLIGHT)
+        result: dict[str, Any] = {"latency": percentiles(latencies), "errors": errors, "api_calls": calls}
+
+        backend = self.backend()
+        session = backend.build(1, 1, 1)[0]
+        async with self.daemon(backend) as (_, path):
+            burst = 50
+            reader, writer = await self.open_stream(path, {"command": "multiplex"})
+            started = time.perf_counter()
+            writer.write(b"".join(
+                json.dumps({"id": n, "command": "highlight", "session_id": session.session_id, **HIGHLIGHT}).encode()
+                + b"\n" for n in range(burst)
+            ))
+            for _ in range(burst):
+                await reader.readline()
+            writer.close()
+            result["burst"] = {
+                "requests": burst,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                "profile_writes": backend.calls.get("session.set_profile_properties", 0),
+            }
+
+        backend = self.backend()
+        sessions = backend.build(1, 4, 2)
+        async with self.daemon(backend) as (_, path):
+            reader, writer = await self.open_stream(path, {"command": "multiplex"})
+            writer.write(b"".join(
+                json.dumps({"id": n, "command": "highlight", "session_id": session.session_id, **HIGHLIGHT}).encode()
+                + b"\n" for n, session in enumerate(sessions)
+            ))
+            for _ in sessions:
+                await reader.readline()
+            writer.close()
+            writes = len(backend.writes)
+            await asyncio.sleep(0.2)
+            result["reset"] = {"sessions": len(sessions), "reset_writes": len(backend.writes) - writes}
+
+        # A profile switch mid-highlight must not make the highlight colour the "original"
+        backend = self.backend()
+        session = backend.build(1, 1, 1)[0]
+        session.background = iterm2.Color(10, 20, 30)
+        request = {"command": "highlight", "session_id": session.session_id, **HIGHLIGHT}
+        async with self.daemon(backend) as (_, path):
+            await self.request(path, request)
+            backend.set_variable(iterm2.VariableScopes.SESSION, session.session_id, "profileName", "Other")
+            await asyncio.sleep(0.01)
+            await self.request(path, request)
+            await asyncio.sleep(0.2)
+        if session.background != iterm2.Color(10, 20, 30):
+            raise RuntimeError(f"highlight: reset after a profile switch restored {session.background}")
+        return result
+
+    async def fanout(self) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        events = 50 if self.quick else 200
+        for subscribers in (1, 10, 100):
+            backend = self.backend()
+            sessions = backend.build(2, 5, 2)
+            async with self.daemon(backend) as (_, path):
+                streams = [await self.open_stream(path, {"command": "subscribe"}) for _ in range(subscribers)]
+                latencies: list[float] = []
+                for n in range(events):
+                    session = sessions[n % len(sessions)]
+                    started = time.perf_counter()
+                    backend.focus(session)
+
+                    async def receive(reader: asyncio.StreamReader) -> None:
+                        while True:
+                            event = json.loads(await reader.readline())
+                            if event.get("event") == "focus_changed" and event["session_id"] == session.session_id:
+                                latencies.append(time.perf_counter() - started)
+                                return
+
+                    await asyncio.gather(*(receive(reader) for reader, _ in streams))
+                for _, writer in streams:
+                    writer.close()
+            result[f"subscribers_{subscribers}"] = {"events": events, "latency": percentiles(latencies)}
+        return result
+
+    async def layout(self) -> dict[str, Any]:
+        """Cost of one index refresh, with zero API latency so only daemon CPU is measured."""
+        result: dict[str, Any] = {}
+        repeats = 10 if self.quick else 50
+        for windows in ((10,) if self.quick else (10, 50)):
+            backend = self.backend(latency_ms=0)
+            sessions = backend.build(windows, 25, 4)
+            daemon = iterm2_daemon.iTerm2Daemon(os.path.join(tempfile.gettempdir(), "unused.sock"),
+                                                iterm2.Connection(backend))
+            daemon.app = await iterm2.async_get_app(daemon.connection)
+
+            started = time.perf_counter()
+            await daemon._refresh_index()
+            initial = time.perf_counter() - started
+
+            timings: dict[str, list[float]] = {"unchanged": [], "close_pane": [], "add_tab": [], "move_pane": []}
+            rng = random.Random(self.args.seed)
+            for _ in range(repeats):
+                for name, mutate in self._layout_mutations(backend, rng).items():
+                    mutate()
+                    started = time.perf_counter()
+                    await daemon._on_layout_changed()
+                    timings[name].append(time.perf_counter() - started)
+
+            for task in daemon.title_monitor_tasks.values():
+                task.cancel()
+            await asyncio.gather(*daemon.title_monitor_tasks.values(), return_exceptions=True)
+            result[f"sessions_{len(sessions)}"] = {
+                "initial_index_ms": round(initial * 1000, 3),
+                **{name: percentiles(samples) for name, samples in timings.items()},
+            }
+        return result
+
+    @staticmethod
+    def _layout_mutations(backend: iterm2.Backend, rng: random.Random) -> dict[str, Callable[[], None]]:
+        def windows() -> list[Any]:
+            return backend.app.terminal_windows
+
+        def close_pane() -> None:
+            tab = rng.choice([t for w in windows() for t in w.tabs if len(t.sessions) > 1])
+            backend.close_session(rng.choice(tab.sessions), notify=False)
+
+        def move_pane() -> None:
+            tabs = [t for w in windows() for t in w.tabs if len(t.sessions) > 1]
+            source, target = rng.sample(tabs, 2)
+            backend.move_session(source.sessions[-1], target, notify=False)
+
+        return {
+            "unchanged": lambda: None,
+            "close_pane": close_pane,
+            "add_tab": lambda: backend.add_tab(rng.choice(windows()), 2, notify=False),
+            "move_pane": move_pane,
+        }
+
+    async def scheduler(self) -> dict[str, Any]:
+        """A keyed call superseded while queued, whose caller is then cancelled.
+
+        The newer caller must still get its own result, from exactly one run.
+        `while_queued` cancels the old caller while every "visual" slot is
+        busy; `as_slot_frees` cancels it in the same tick its slot is granted.
+        """
+        result: dict[str, Any] = {}
+        for case in ("while_queued", "as_slot_frees"):
+            scheduler = iterm2_daemon.CallScheduler(iterm2_daemon.CALL_LIMITS, iterm2_daemon.Tracer())
+            gate = asyncio.Event()
+            ran: list[str] = []
+
+            def call(name: str) -> Callable[[], Any]:
+                async def factory() -> str:
+                    ran.append(name)
+                    return name
+                return factory
+
+            blockers = [asyncio.create_task(scheduler.run("visual", gate.wait))
+                        for _ in range(scheduler.limits["visual"])]
+            await asyncio.sleep(0)
+            older = asyncio.create_task(scheduler.run("visual", call("older"), key="pane"))
+            await asyncio.sleep(0)
+            newer = asyncio.create_task(scheduler.run("visual", call("newer"), key="pane"))
+            await asyncio.sleep(0)
+            if case == "while_queued":
+                older.cancel()
+                await asyncio.sleep(0)
+                gate.set()
+            else:
+                gate.set()
+                await asyncio.sleep(0)  # Blockers finish; the older entry's slot is granted
+                older.cancel()
+            try:
+                outcome = await asyncio.wait_for(newer, 1)
+            except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+                raise RuntimeError(f"scheduler/{case}: newer caller failed with {type(e).__name__}") from e
+            await asyncio.gather(older, *blockers, return_exceptions=True)
+            if outcome != "newer" or ran != ["newer"]:
+                raise RuntimeError(f"scheduler/{case}: got {outcome!r}, ran {ran}")
+            if any(scheduler.running.values()) or any(scheduler.waiting.values()) or scheduler.queued_by_key:
+                raise RuntimeError(f"scheduler/{case}: slots or queue entries leaked")
+            result[case] = {"newer_result": outcome, "calls_run": len(ran)}
+        return result
+
+    async def lifecycle(self) -> dict[str, Any]:
+        """Seconds from the parent dying, or the socket being rebound, to the daemon exiting.
+
+        `notify` runs the script as is (pidfd/inotify on Linux, kqueue on
+        macOS); `poll` hides those so it polls every POLL_FALLBACK_SECONDS.
+        """
+        result: dict[str, Any] = {}
+        for mode in ("notify", "poll"):
+            result[mode] = {
+                "parent_exit_s": await self._parent_exit(mode),
+                "socket_rebind_s": await self._socket_rebind(mode),
+            }
+        return result
+
+    def _daemon_command(self, path: str, mode: str) -> list[str]:
+        if mode == "poll":
+            return [sys.executable, "-c", WITHOUT_NOTIFICATIONS, str(DAEMON_SCRIPT), path]
+        return [sys.executable, str(DAEMON_SCRIPT), path]
+
+    @staticmethod
+    def _daemon_env() -> dict[str, str]:
+        return {**os.environ, "FAKE_ITERM2_GRID": "1x1x1", "PYTHONPATH": str(Path(iterm2.__file__).parent)}
+
+    async def _wait_ready(self, path: str, pid: int) -> None:
+        while True:
+            with contextlib.suppress(FileNotFoundError, ConnectionRefusedError):
+                if (await self.request(path, {"command": "ping"})).get("status") == "ok":
+                    return
+            if process_gone(pid):
+                raise RuntimeError("lifecycle: daemon exited before it was ready")
+            await asyncio.sleep(0.005)
+
+    @staticmethod
+    async def _wait_exit(pid: int, started: float, log: Path, expected: str, what: str) -> float:
+        deadline = started + iterm2_daemon.POLL_FALLBACK_SECONDS + 5
+        while not process_gone(pid):
+            if time.perf_counter() > deadline:
+                os.kill(pid, 9)
+                raise RuntimeError(f"lifecycle: daemon still running after {what}")
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        if expected not in log.read_text():
+            raise RuntimeError(f"lifecycle: daemon exited after {what} without logging {expected!r}")
+        return round(elapsed, 4)
+
+    async def _parent_exit(self, mode: str) -> float:
+        with tempfile.TemporaryDirectory(prefix="juggler-bench-") as tmp:
+            path = os.path.join(tmp, "daemon.sock")
+            log = Path(tmp) / "daemon.log"
+            with open(log, "w") as stderr:
+                parent = await asyncio.create_subprocess_exec(
+                    sys.executable, "-c", STAND_IN_PARENT, *self._daemon_command(path, mode),
+                    env=self._daemon_env(), stdout=asyncio.subprocess.PIPE, stderr=stderr,
+                )
+            pid = int(await parent.stdout.readline())
+            try:
+                await self._wait_ready(path, pid)
+                started = time.perf_counter()
+                parent.kill()
+                await parent.wait()
+                return await self._wait_exit(pid, started, log, "Parent process gone", "its parent was killed")
+            finally:
+                if not process_gone(pid):
+                    os.kill(pid, 9)
+
+    async def _socket_rebind(self, mode: str) -> float:
+        with tempfile.TemporaryDirectory(prefix="juggler-bench-") as tmp:
+            path = os.path.join(tmp, "daemon.sock")
+            log = Path(tmp) / "daemon.log"
+            with open(log, "w") as stderr:
+                process = await asyncio.create_subprocess_exec(
+                    *self._daemon_command(path, mode), env=self._daemon_env(), stderr=stderr
+                )
+            try:
+                await self._wait_ready(path, process.pid)
+                # What a newer daemon does on start: take over the path
+                started = time.perf_counter()
+                os.unlink(path)
+                newer = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                newer.bind(path)
+                try:
+                    return await self._wait_exit(
+                        process.pid, started, log, "Socket taken over", "its socket was rebound"
+                    )
+                finally:
+                    newer.close()
+            finally:
+                if process.returncode is None and not process_gone(process.pid):
+                    process.kill()
+                await process.wait()
+
+    async def startup(self) -> dict[str, Any]:
+        first_answer: list[float] = []
+        ready: list[float] = []
+        phases: dict[str, list[float]] = {}
+        for _ in range(3 if self.quick else 10):
+            answered, readied, timings = await self._cold_start()
+            first_answer.append(answered)
+            ready.append(readied)
+            for phase, ms in timings.items():
+                phases.setdefault(phase, []).append(ms / 1000)
+        return {
+            "first_answer": percentiles(first_answer),
+            "ready": percentiles(ready),
+            "phases": {phase: percentiles(samples) for phase, samples in phases.items()},
+        }
+
+    async def _cold_start(self) -> tuple[float, float, dict[str, float]]:
+        """Spawn the daemon; seconds to the first ping answer and to "ok", plus its ready line."""
+        with tempfile.TemporaryDirectory(prefix="juggler-bench-") as tmp:
+            path = os.path.join(tmp, "daemon.sock")
+            env = {**os.environ, **STARTUP_ENV, "PYTHONPATH": str(Path(iterm2.__file__).parent)}
+            started = time.time()
+            env[iterm2_daemon.SPAWNED_AT_ENV] = repr(started)
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, str(DAEMON_SCRIPT), path, env=env, stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                answered: Optional[float] = None
+                while True:
+                    try:
+                        response = await self.request(path, {"command": "ping"})
+                    except (FileNotFoundError, ConnectionRefusedError):
+                        if process.returncode is not None:
+                            raise RuntimeError(f"daemon exited with status {process.returncode}")
+                        await asyncio.sleep(0.001)
+                        continue
+                    if answered is None:
+                        answered = time.time() - started
+                    if response.get("status") == "ok":
+                        readied = time.time() - started
+                        break
+                    await asyncio.sleep(0.001)
+                while True:
+                    line = await process.stderr.readline()
+                    if not line:
+                        raise RuntimeError("daemon closed stderr without a ready line")
+                    with contextlib.suppress(ValueError):
+                        report = json.loads(line)
+                        if isinstance(report, dict) and report.get("phase") == "ready":
+                            return answered, readied, report["timings_ms"]
+            finally:
+                process.terminate()
+                await process.wait()
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Print per-metric deltas and return the regressed metric paths."""
+    regressions: list[str] = []
+
+    def walk(now: Any, then: Any, path: str) -> None:
+        if isinstance(now, dict) and isinstance(then, dict):
+            for key in now:
+                if key in then:
+                    walk(now[key], then[key], f"{path}.{key}" if path else key)
+            return
+        if not isinstance(now, (int, float)) or not isinstance(then, (int, float)) or not then:
+            return
+        higher_is_worse = path.endswith("_ms")
+        lower_is_worse = path.endswith("_per_second")
+        if not (higher_is_worse or lower_is_worse):
+            return
+        change = (now - then) / then
+        regressed = change > tolerance if higher_is_worse else change < -tolerance
+        marker = "REGRESSION" if regressed else ""
+        print(f"{path:60} {then:>12} -> {now:>12} {change:+8.1%} {marker}")
+        if regressed:
+            regressions.append(path)
+
+    walk(current["results"], baseline.get("results", {}), "")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    bench = Bench(args)
+    results: dict[str, Any] = {}
+    for name in args.only or SCENARIOS:
+        print(f"Running {name}...", file=sys.stderr, flush=True)
+        # The daemon logs to stderr; keep the report readable
+        with contextlib.redirect_stderr(io.StringIO()) if not args.verbose else contextlib.nullcontext():
+            results[name] = await getattr(bench, name)()
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "latency_ms": args.latency_ms,
+            "jitter": args.jitter,
+            "fail": args.fail,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=SCENARIOS, help="run only this scenario (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a smoke run")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated iTerm2 latency per API call")
+    parser.add_argument("--jitter", type=float, default=0.25, help="latency jitter, as a fraction")
+    parser.add_argument("--fail", action="append", default=[], metavar="CALL=P",
+                        help=f"inject failures with probability P; CALL is one of {', '.join(iterm2.CALLS)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression for --compare")
+    parser.add_argument("--verbose", action="store_true", help="show daemon stderr")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""Headless stand-in for the `iterm2` package, for benchmarking iterm2_daemon.py.
+
+Put this directory first on sys.path and `import iterm2` resolves here. It
+implements the subset of the API the daemon uses: the App/Window/Tab/Session
+model, the focus, termination, layout and variable monitors, profiles and
+write-only profiles.
+
+A Backend on each Connection holds the topology and the knobs:
+
+- `latency`: seconds per API call, by call name (see CALLS) with a
+  `"default"` fallback, plus `jitter` (a fraction of the latency).
+- `failures`: probability per call name that the call raises RPCException.
+
+Every API call goes through `connection.async_send_message`, the same choke
+point the daemon's stats wrap on the real connection, so API-call counts
+line up. Tests drive the model with `Backend.focus()`, `close_session()`,
+`add_tab()`, `split()`, `set_variable()` and `layout_changed()`.
+
+`run_until_complete` lets the daemon script run unmodified against the fake
+(PYTHONPATH=scripts/perf/fake_iterm2), configured through the *_ENV
+variables below.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Callable, Optional
+
+# For running the daemon script itself (`run_until_complete`): simulated cost
+# of importing the real library and of the websocket handshake, and the
+# topology to start with, as WINDOWSxTABSxPANES.
+IMPORT_MS_ENV = "FAKE_ITERM2_IMPORT_MS"
+CONNECT_MS_ENV = "FAKE_ITERM2_CONNECT_MS"
+GRID_ENV = "FAKE_ITERM2_GRID"
+
+time.sleep(float(os.environ.get(IMPORT_MS_ENV) or 0) / 1000)
+
+# Call names accepted as keys of Backend.latency / Backend.failures
+CALLS = (
+    "app.activate",
+    "window.activate",
+    "window.get_variable",
+    "tab.get_variable",
+    "session.activate",
+    "session.get_profile",
+    "session.set_profile_properties",
+    "session.inject",
+    "profile.get_background_color",
+)
+
+
+class RPCException(Exception):
+    pass
+
+
+class VariableScopes:
+    SESSION = "session"
+    TAB = "tab"
+    WINDOW = "window"
+    APP = "app"
+
+
+class Color:
+    def __init__(self, red: int, green: int, blue: int, alpha: int = 255) -> None:
+        self.red = red
+        self.green = green
+        self.blue = blue
+        self.alpha = alpha
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Color) and (self.red, self.green, self.blue) == (other.red, other.green, other.blue)
+
+    def __repr__(self) -> str:
+        return f"Color({self.red}, {self.green}, {self.blue})"
+
+
+class LocalWriteOnlyProfile:
+    """Records every set_* call as {property: value}."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Callable[[Any], None]:
+        if not name.startswith("set_"):
+            raise AttributeError(name)
+        prop = name[len("set_"):]
+        return lambda value: self.values.__setitem__(prop, value)
+
+
+class Backend:
+    def __init__(
+        self,
+        latency: Optional[dict[str, float]] = None,
+        jitter: float = 0.0,
+        failures: Optional[dict[str, float]] = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency: dict[str, float] = dict(latency or {})
+        self.jitter: float = jitter
+        self.failures: dict[str, float] = dict(failures or {})
+        self.random: random.Random = random.Random(seed)
+        self.calls: dict[str, int] = {}
+        # Every profile write and escape injection, as (session_id, values)
+        self.writes: list[tuple[str, Any]] = []
+        self.app: App = App(self)
+        self.variables: dict[tuple[str, str, str], Any] = {}
+        self.listeners: dict[Any, list[asyncio.Queue]] = {}
+        self.connection: Optional[Connection] = None
+        self._next_id: int = 0
+
+    # --- API-call cost model ---
+
+    async def call(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        delay = self.latency.get(name, self.latency.get("default", 0.0))
+        if delay and self.jitter:
+            delay *= 1 + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+        if self.random.random() < self.failures.get(name, 0.0):
+            raise RPCException(f"injected failure: {name}")
+
+    # --- topology ---
+
+    def new_id(self, prefix: str) -> str:
+        self._next_id += 1
+        if prefix == "session":
+            return f"{self._next_id:08X}-0000-4000-8000-{self._next_id:012X}"
+        return f"{prefix}{self._next_id}"
+
+    def build(self, windows: int, tabs_per_window: int, panes_per_tab: int) -> list[Session]:
+        """Create a windows x tabs x panes grid. Returns the sessions in order."""
+        sessions: list[Session] = []
+        for _ in range(windows):
+            window = Window(self, self.new_id("window"))
+            self.app.terminal_windows.append(window)
+            for _ in range(tabs_per_window):
+                tab = self.add_tab(window, panes_per_tab, notify=False)
+                sessions.extend(tab.sessions)
+        return sessions
+
+    def add_tab(self, window: Window, panes: int = 1, notify: bool = True) -> Tab:
+        tab = Tab(self, self.new_id("tab"), window)
+        tab.sessions = [Session(self, self.new_id("session"), tab) for _ in range(panes)]
+        tab.active_session = tab.sessions[0]
+        self.variables[(VariableScopes.TAB, tab.tab_id, "title")] = f"Tab {tab.tab_id}"
+        window.tabs.append(tab)
+        if window.selected_tab is None:
+            window.selected_tab = tab
+        if notify:
+            self.layout_changed()
+        return tab
+
+    def split(self, tab: Tab, notify: bool = True) -> Session:
+        session = Session(self, self.new_id("session"), tab)
+        tab.sessions.append(session)
+        if notify:
+            self.layout_changed()
+        return session
+
+    def close_session(self, session: Session, notify: bool = True) -> None:
+        tab = session.tab
+        tab.sessions.remove(session)
+        if tab.active_session is session:
+            tab.active_session = tab.sessions[0] if tab.sessions else None
+        if not tab.sessions:
+            window = tab.window
+            window.tabs.remove(tab)
+            if window.selected_tab is tab:
+                window.selected_tab = window.tabs[0] if window.tabs else None
+            if not window.tabs:
+                self.app.terminal_windows.remove(window)
+        session.tab = None
+        if notify:
+            self.layout_changed()
+            self._emit(SessionTerminationMonitor, session.session_id)
+
+    def move_session(self, session: Session, tab: Tab, notify: bool = True) -> None:
+        old = session.tab
+        old.sessions.remove(session)
+        if old.active_session is session:
+            old.active_session = old.sessions[0] if old.sessions else None
+        session.tab = tab
+        tab.sessions.append(session)
+        if notify:
+            self.layout_changed()
+
+    def focus(self, session: Session) -> None:
+        tab = session.tab
+        tab.active_session = session
+        tab.window.selected_tab = tab
+        self.app.current_terminal_window = tab.window
+        self._emit(FocusMonitor, FocusUpdate(session.session_id))
+
+    def layout_changed(self) -> None:
+        self._emit(LayoutChangeMonitor, None)
+
+    def set_variable(self, scope: str, identifier: str, name: str, value: Any) -> None:
+        self.variables[(scope, identifier, name)] = value
+        self._emit((scope, identifier, name), value)
+
+    # --- monitor plumbing ---
+
+    def _listen(self, key: Any) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self.listeners.setdefault(key, []).append(queue)
+        return queue
+
+    def _unlisten(self, key: Any, queue: asyncio.Queue) -> None:
+        queues = self.listeners.get(key, [])
+        if queue in queues:
+            queues.remove(queue)
+
+    def _emit(self, key: Any, value: Any) -> None:
+        for queue in self.listeners.get(key, []):
+            queue.put_nowait(value)
+
+
+class Connection:
+    def __init__(self, backend: Optional[Backend] = None) -> None:
+        self.backend: Backend = backend or Backend()
+        self.backend.connection = self
+
+    async def async_send_message(self, message: Any) -> None:
+        await self.backend.call(message)
+
+
+async def _send(backend: Backend, name: str) -> None:
+    # Looked up on every call: the daemon's stats replace this attribute
+    await backend.connection.async_send_message(name)
+
+
+class _Profile:
+    def __init__(self, backend: Backend, session: Session) -> None:
+        self.backend = backend
+        self.session = session
+
+    async def async_get_background_color(self) -> Color:
+        await _send(self.backend, "profile.get_background_color")
+        return self.session.background
+
+
+class Session:
+    def __init__(self, backend: Backend, session_id: str, tab: Tab) -> None:
+        self.backend = backend
+        self.session_id = session_id
+        self.tab: Optional[Tab] = tab
+        self.background: Color = Color(0, 0, 0)
+
+    async def async_activate(self, select_tab: bool = True, order_window_front: bool = True) -> None:
+        await _send(self.backend, "session.activate")
+        if self.tab is not None:
+            self.tab.active_session = self
+            if select_tab:
+                self.tab.window.selected_tab = self.tab
+
+    async def async_get_profile(self) -> _Profile:
+        await _send(self.backend, "session.get_profile")
+        return _Profile(self.backend, self)
+
+    async def async_set_profile_properties(self, profile: LocalWriteOnlyProfile) -> None:
+        await _send(self.backend, "session.set_profile_properties")
+        self.backend.writes.append((self.session_id, dict(profile.values)))
+        if "background_color" in profile.values:
+            self.background = profile.values["background_color"]  # What the next profile read returns
+
+    async def async_inject(self, data: bytes) -> None:
+        await _send(self.backend, "session.inject")
+        self.backend.writes.append((self.session_id, data))
+
+
+class Tab:
+    def __init__(self, backend: Backend, tab_id: str, window: Window) -> None:
+        self.backend = backend
+        self.tab_id = tab_id
+        self.window = window
+        self.sessions: list[Session] = []
+        self.active_session: Optional[Session] = None
+
+    @property
+    def current_session(self) -> Optional[Session]:
+        return self.active_session
+
+    async def async_get_variable(self, name: str) -> Any:
+        await _send(self.backend, "tab.get_variable")
+        return self.backend.variables.get((VariableScopes.TAB, self.tab_id, name))
+
+
+class Window:
+    def __init__(self, backend: Backend, window_id: str) -> None:
+        self.backend = backend
+        self.window_id = window_id
+        self.tabs: list[Tab] = []
+        self.selected_tab: Optional[Tab] = None
+
+    @property
+    def current_tab(self) -> Optional[Tab]:
+        return self.selected_tab
+
+    async def async_get_variable(self, name: str) -> Any:
+        await _send(self.backend, "window.get_variable")
+        if name == "number":
+            return self.backend.app.terminal_windows.index(self) if self in self.backend.app.terminal_windows else 0
+        return self.backend.variables.get((VariableScopes.WINDOW, self.window_id, name))
+
+    async def async_activate(self) -> None:
+        await _send(self.backend, "window.activate")
+        self.backend.app.current_terminal_window = self
+
+
+class App:
+    def __init__(self, backend: Backend) -> None:
+        self.backend = backend
+        self.terminal_windows: list[Window] = []
+        self._current_window: Optional[Window] = None
+
+    @property
+    def current_terminal_window(self) -> Optional[Window]:
+        if self._current_window in self.terminal_windows:
+            return self._current_window
+        return self.terminal_windows[0] if self.terminal_windows else None
+
+    @current_terminal_window.setter
+    def current_terminal_window(self, window: Window) -> None:
+        self._current_window = window
+
+    def get_window_by_id(self, window_id: str) -> Optional[Window]:
+        return next((w for w in self.terminal_windows if w.window_id == window_id), None)
+
+    def get_tab_by_id(self, tab_id: str) -> Optional[Tab]:
+        return next((t for w in self.terminal_windows for t in w.tabs if t.tab_id == tab_id), None)
+
+    def get_session_by_id(self, session_id: str) -> Optional[Session]:
+        return next(
+            (s for w in self.terminal_windows for t in w.tabs for s in t.sessions if s.session_id == session_id),
+            None,
+        )
+
+    async def async_activate(self) -> None:
+        await _send(self.backend, "app.activate")
+
+
+async def async_get_app(connection: Connection) -> App:
+    return connection.backend.app
+
+
+class FocusUpdate:
+    class _Changed:
+        def __init__(self, session_id: str) -> None:
+            self.session_id = session_id
+
+    def __init__(self, session_id: str) -> None:
+        self.active_session_changed = FocusUpdate._Changed(session_id)
+
+
+class _Monitor:
+    def __init__(self, connection: Connection, *args: Any) -> None:
+        self.backend = connection.backend
+        self.queue: Optional[asyncio.Queue] = None
+
+    def _key(self) -> Any:
+        return type(self)
+
+    async def __aenter__(self) -> _Monitor:
+        self.queue = self.backend._listen(self._key())
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.backend._unlisten(self._key(), self.queue)
+
+    async def async_get(self) -> Any:
+        return await self.queue.get()
+
+
+class FocusMonitor(_Monitor):
+    async def async_get_next_update(self) -> FocusUpdate:
+        return await self.queue.get()
+
+
+class SessionTerminationMonitor(_Monitor):
+    pass
+
+
+class LayoutChangeMonitor(_Monitor):
+    pass
+
+
+class VariableMonitor(_Monitor):
+    def __init__(self, connection: Connection, scope: str, name: str, identifier: str) -> None:
+        super().__init__(connection)
+        self.scope = scope
+        self.name = name
+        self.identifier = identifier
+
+    def _key(self) -> Any:
+        return (self.scope, self.identifier, self.name)
+
+
+def run_until_complete(coro: Callable[[Connection], Any], retry: bool = False) -> None:
+    """Like the real library: connect on asyncio's current event loop, then run `coro`."""
+    asyncio.get_event_loop().run_until_complete(_connect_and_run(coro))
+
+
+async def _connect_and_run(coro: Callable[[Connection], Any]) -> None:
+    await asyncio.sleep(float(os.environ.get(CONNECT_MS_ENV) or 0) / 1000)
+    backend = Backend()
+    grid = os.environ.get(GRID_ENV)
+    if grid:
+        backend.build(*(int(n) for n in grid.split("x")))
+    await coro(Connection(backend))
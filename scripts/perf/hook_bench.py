@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""Benchmark the agent hook scripts' direct path against a local HTTP sink.
+
+Runs notify.sh (and the Codex/Antigravity variants) the way an agent does:
+event name as $1, hook JSON on stdin, cwd inside a throwaway git repository,
+JUGGLER_PORT pointed at a sink that answers every POST. The scripts are laid
+out next to hook_payload.py as the installers do. The relay is disabled
+(JUGGLER_HOOK_RELAY=0) and TMPDIR is private to the run, so the git cache
+starts empty and nothing touches a running Juggler.
+
+    python3 scripts/perf/hook_bench.py --baseline-rev HEAD~1 --output bench.json
+    python3 scripts/perf/hook_bench.py --only startup --compare bench.json
+
+Scenarios (select with --only):
+  lookup   git metadata per event, in-process: the two `git rev-parse` calls
+           the hooks used to make, against the cached resolver cold and warm
+  startup  the payload builder alone, interpreter start to exit: a bare
+           `python3 -I -S`, the module compiled from source with full site
+           initialization (what the per-script heredocs cost), and the module
+           launched as notify.sh launches it. Also lists any module the
+           builder imports beyond json/os/re/time.
+  hook     whole-hook wall time per event: the scripts at --baseline-rev (when
+           given) against the working tree, with the git cache cold and warm.
+           Coalescing is off (heartbeat 0), so every run posts.
+  turn     one Claude Code turn (a prompt, --turn-tools tool calls, a stop)
+           with coalescing off and on: posts reaching the sink, and wall time
+
+Runs of the variants are interleaved, so drift on a busy machine hits them alike.
+
+Exits 1 when the builder imports more than it should, or with --compare when a
+`*_ms` metric grew by more than --tolerance (default 25%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import json
+import os
+import platform
+import py_compile
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[2]
+RESOURCES = ROOT / "juggler" / "Resources"
+sys.path.insert(0, str(RESOURCES))
+
+import hook_payload  # noqa: E402
+
+SCENARIOS = ("lookup", "startup", "hook", "turn")
+
+# Script per agent, its event and a representative stdin. PreToolUse-style
+# events are the ones that fire on every tool call.
+AGENTS = {
+    "claude-code": (
+        "hooks/notify.sh",
+        "PreToolUse",
+        {"session_id": "bench", "transcript_path": "/tmp/bench.jsonl", "tool_name": "Bash",
+         "tool_input": {"command": "ls"}},
+    ),
+    "codex": (
+        "codex-hooks/codex-notify.sh",
+        "PreToolUse",
+        {"session_id": "bench", "transcript_path": "/tmp/bench.jsonl", "tool_name": "shell"},
+    ),
+    "antigravity": (
+        "antigravity-hooks/antigravity-notify.sh",
+        "PreInvocation",
+        {"conversationId": "bench", "transcriptPath": "/tmp/bench.jsonl", "workspacePaths": []},
+    ),
+}
+
+
+def percentiles(samples: list[float]) -> dict[str, Any]:
+    """count/p50/p95/p99/max in milliseconds, from samples in seconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": at(0.50),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+class Sink(http.server.BaseHTTPRequestHandler):
+    """Accepts every /hook POST, like Juggler's HookServer, and keeps nothing."""
+
+    posts = 0
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        Sink.posts += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def make_repository(base: Path) -> Path:
+    """A repository with one commit; returns a subdirectory to run hooks from."""
+    repo = base / "repo"
+    cwd = repo / "src" / "module"
+    cwd.mkdir(parents=True)
+    env = dict(os.environ, GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@example.com",
+               GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@example.com")
+    (cwd / "file.txt").write_text("bench\n")
+    for args in (["init", "-q"], ["checkout", "-q", "-b", "main"], ["add", "."], ["commit", "-q", "-m", "bench"]):
+        subprocess.run(["git", "-C", str(repo), *args], check=True, env=env, stdout=subprocess.DEVNULL)
+    return cwd
+
+
+def git_subprocess_info(cwd: str) -> dict:
+    """What the hooks did before: two `git rev-parse` calls per event."""
+    branch = subprocess.run(["git", "-C", cwd, "rev-parse", "--abbrev-ref", "HEAD"],
+                            capture_output=True, text=True).stdout.strip()
+    toplevel = subprocess.run(["git", "-C", cwd, "rev-parse", "--show-toplevel"],
+                              capture_output=True, text=True).stdout.strip()
+    return {"branch": branch, "repo": os.path.basename(toplevel)}
+
+
+def bench_lookup(cwd: Path, runs: int) -> dict[str, Any]:
+    samples: dict[str, list[float]] = {"git_subprocess": [], "cached_cold": [], "cached_warm": []}
+    for _ in range(runs):
+        started = time.perf_counter()
+        before = git_subprocess_info(str(cwd))
+        samples["git_subprocess"].append(time.perf_counter() - started)
+
+        remove_git_cache()
+        started = time.perf_counter()
+        cold = hook_payload.git_info(str(cwd))
+        samples["cached_cold"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        warm = hook_payload.git_info(str(cwd))
+        samples["cached_warm"].append(time.perf_counter() - started)
+        if not before == cold == warm:
+            raise RuntimeError(f"git info mismatch: {before} / {cold} / {warm}")
+    return {name: percentiles(values) for name, values in samples.items()}
+
+
+def remove_git_cache() -> None:
+    try:
+        os.unlink(hook_payload.GIT_CACHE_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def install_scripts(into: Path, rev: str | None = None) -> dict[str, Path]:
+    """Lay the agent scripts out next to hook_payload.py (precompiled), as the installers do.
+
+    With `rev`, the files as of that revision; agents whose script is missing
+    there are left out, and a revision from before the module gets the scripts alone.
+    """
+
+    def read(relative: str) -> bytes | None:
+        if rev is None:
+            return (RESOURCES / relative).read_bytes()
+        shown = subprocess.run(["git", "-C", str(ROOT), "show", f"{rev}:juggler/Resources/{relative}"],
+                               capture_output=True)
+        return shown.stdout if shown.returncode == 0 else None
+
+    into.mkdir()
+    module = read("hook_payload.py")
+    if module is not None:
+        (into / "hook_payload.py").write_bytes(module)
+        py_compile.compile(str(into / "hook_payload.py"), doraise=True)
+    scripts = {}
+    for agent, (relative, _, _) in AGENTS.items():
+        content = read(relative)
+        if content is None:
+            print(f"{agent}: no {relative} at {rev}, skipping its baseline", file=sys.stderr)
+            continue
+        path = into / Path(relative).name
+        path.write_bytes(content)
+        scripts[agent] = path
+    return scripts
+
+
+def launcher(script: Path) -> str:
+    """The `python3 -I -S -c` program the script starts hook_payload with."""
+    found = re.search(r"python3 -I -S -c '([^']+)'", script.read_text())
+    if found is None:
+        raise RuntimeError(f"{script.name} does not launch hook_payload")
+    return found.group(1)
+
+
+def run_python(args: list[str], body: bytes, cwd: Path, env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run(["python3", *args], input=body, cwd=cwd, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - started
+
+
+def loaded_modules(program: str, args: list[str], body: bytes, cwd: Path, env: dict) -> set[str]:
+    """sys.modules at exit of `python3 -I -S -c program`; the builder takes over stdout, so via stderr."""
+    probe = program + "; sys.stderr.write(' '.join(sys.modules))"
+    result = subprocess.run(["python3", "-I", "-S", "-c", probe, *args], input=body, cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    return set(result.stderr.decode().split())
+
+
+def bench_startup(hooks: dict[str, Path], cwd: Path, runs: int, env: dict) -> dict[str, Any]:
+    script = hooks["claude-code"]
+    _, event, body = AGENTS["claude-code"]
+    stdin = json.dumps(body).encode()
+    program = launcher(script)
+    source = (script.parent / "hook_payload.py").read_text()
+    env = dict(env, JUGGLER_HOOK_HEARTBEAT_SECONDS="0")
+    variants = {
+        "interpreter": ["-I", "-S", "-c", "pass"],
+        "source": ["-c", source + "\nclaude_code(*sys.argv[1:])\n", event, str(cwd)],
+        "module": ["-I", "-S", "-c", program, str(script.parent), event, str(cwd)],
+    }
+    samples: dict[str, list[float]] = {name: [] for name in variants}
+    for args in variants.values():
+        run_python(args, stdin, cwd, env)  # Warm the git cache and the OS file cache
+    for _ in range(runs):
+        for name, args in variants.items():
+            samples[name].append(run_python(args, stdin, cwd, env))
+
+    allowed = loaded_modules("import sys, json, os, re, time", [], b"", cwd, env)
+    loaded = loaded_modules(program, [str(script.parent), event, str(cwd)], stdin, cwd, env)
+    results: dict[str, Any] = {name: percentiles(values) for name, values in samples.items()}
+    results["extra_imports"] = sorted(loaded - allowed - {"hook_payload"})
+    return results
+
+
+def run_hook(script: Path, event: str, body: dict, cwd: Path, env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run(["/bin/bash", str(script), event], input=json.dumps(body).encode(), cwd=cwd, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - started
+
+
+def bench_hook(
+    cwd: Path, runs: int, env: dict, hooks: dict[str, Path], baselines: dict[str, Path]
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    env = dict(env, JUGGLER_HOOK_HEARTBEAT_SECONDS="0")
+    for agent, (_, event, body) in AGENTS.items():
+        current = hooks[agent]
+        if agent == "antigravity":
+            body = dict(body, workspacePaths=[str(cwd)])
+        samples: dict[str, list[float]] = {"baseline": []} if agent in baselines else {}
+        samples.update(current_cold=[], current_warm=[])
+        print(f"  {agent}...", file=sys.stderr, flush=True)
+        for _ in range(runs):
+            if agent in baselines:
+                samples["baseline"].append(run_hook(baselines[agent], event, body, cwd, env))
+            remove_git_cache()
+            samples["current_cold"].append(run_hook(current, event, body, cwd, env))
+            samples["current_warm"].append(run_hook(current, event, body, cwd, env))
+        results[agent] = {name: percentiles(values) for name, values in samples.items()}
+    return results
+
+
+def bench_turn(cwd: Path, tools: int, env: dict, hooks: dict[str, Path]) -> dict[str, Any]:
+    script = hooks["claude-code"]
+    results: dict[str, Any] = {}
+    for variant, heartbeat in (("every_event", "0"), ("coalesced", None)):
+        variant_env = dict(env)
+        if heartbeat is None:
+            variant_env.pop("JUGGLER_HOOK_HEARTBEAT_SECONDS", None)  # The hooks' default
+        else:
+            variant_env["JUGGLER_HOOK_HEARTBEAT_SECONDS"] = heartbeat
+        base = {"session_id": f"bench-turn-{variant}", "transcript_path": "/tmp/bench.jsonl"}
+        events = [("UserPromptSubmit", base)]
+        for index in range(tools):
+            tool = dict(base, tool_name="Read" if index % 2 else "Bash")
+            events += [("PreToolUse", tool), ("PostToolUse", tool)]
+        events.append(("Stop", base))
+
+        posts_before = Sink.posts
+        started = time.perf_counter()
+        samples = [run_hook(script, event, body, cwd, variant_env) for event, body in events]
+        results[variant] = {
+            "events": len(events),
+            "posts": Sink.posts - posts_before,
+            "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+            "per_hook": percentiles(samples),
+        }
+    return results
+
+
+def summarize(results: dict[str, Any]) -> None:
+    for scenario, groups in results.items():
+        if scenario == "turn":
+            for variant, stats in groups.items():
+                print(f"turn {variant:15} {stats['posts']}/{stats['events']} events posted, "
+                      f"{stats['wall_ms']:.0f} ms, p50 {stats['per_hook']['p50_ms']:.2f} per hook", file=sys.stderr)
+            continue
+        rows = groups.items() if scenario == "hook" else [("", groups)]
+        for agent, variants in rows:
+            label = f"{scenario} {agent}".strip()
+            cells = "  ".join(
+                f"{name} p50 {stats['p50_ms']:.2f} p95 {stats['p95_ms']:.2f}"
+                for name, stats in variants.items()
+                if isinstance(stats, dict)
+            )
+            print(f"{label:20} {cells}", file=sys.stderr)
+        if scenario == "startup" and groups["extra_imports"]:
+            print(f"startup: the builder imports {', '.join(groups['extra_imports'])}", file=sys.stderr)
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Print per-metric deltas and return the regressed metric paths."""
+    regressions: list[str] = []
+
+    def walk(now: Any, then: Any, path: str) -> None:
+        if isinstance(now, dict) and isinstance(then, dict):
+            for key in now:
+                if key in then:
+                    walk(now[key], then[key], f"{path}.{key}" if path else key)
+            return
+        if not isinstance(now, (int, float)) or not isinstance(then, (int, float)) or not then:
+            return
+        if not path.endswith("_ms"):
+            return
+        change = (now - then) / then
+        regressed = change > tolerance
+        marker = "REGRESSION" if regressed else ""
+        print(f"{path:60} {then:>12} -> {now:>12} {change:+8.1%} {marker}")
+        if regressed:
+            regressions.append(path)
+
+    walk(current["results"], baseline.get("results", {}), "")
+    return regressions
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="juggler-hook-bench-") as temp:
+        base = Path(temp)
+        private_tmp = base / "tmp"
+        private_tmp.mkdir()
+        # The hooks, and hook_payload's cache path, resolve TMPDIR when they start
+        os.environ["TMPDIR"] = str(private_tmp)
+        hook_payload.GIT_CACHE_PATH = os.path.join(str(private_tmp), os.path.basename(hook_payload.GIT_CACHE_PATH))
+        cwd = make_repository(base)
+        hooks = install_scripts(base / "current")
+        runs = 10 if args.quick else args.runs
+        scenarios = args.only or SCENARIOS
+
+        if "lookup" in scenarios:
+            print("Running lookup...", file=sys.stderr, flush=True)
+            results["lookup"] = bench_lookup(cwd, runs * 4)
+
+        if not {"startup", "hook", "turn"} & set(scenarios):
+            return results
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Sink)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        env = dict(os.environ, JUGGLER_PORT=str(server.server_address[1]), JUGGLER_HOOK_RELAY="0")
+        for name in ("ITERM_SESSION_ID", "KITTY_WINDOW_ID", "WEZTERM_PANE", "TMUX", "TMUX_PANE", "SSH_CONNECTION"):
+            env.pop(name, None)
+        try:
+            if "startup" in scenarios:
+                print("Running startup...", file=sys.stderr, flush=True)
+                results["startup"] = bench_startup(hooks, cwd, runs, env)
+            if "hook" in scenarios:
+                print("Running hook...", file=sys.stderr, flush=True)
+                baselines = install_scripts(base / "baseline", args.baseline_rev) if args.baseline_rev else {}
+                results["hook"] = bench_hook(cwd, runs, env, hooks, baselines)
+            if "turn" in scenarios:
+                print("Running turn...", file=sys.stderr, flush=True)
+                results["turn"] = bench_turn(cwd, 10 if args.quick else args.turn_tools, env, hooks)
+        finally:
+            server.shutdown()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=SCENARIOS, help="run only this scenario (repeatable)")
+    parser.add_argument("--runs", type=int, default=50, help="hook runs per variant (lookup runs 4x as many)")
+    parser.add_argument("--quick", action="store_true", help="10 runs, for a smoke run")
+    parser.add_argument("--turn-tools", type=int, default=50, help="tool calls in the turn scenario")
+    parser.add_argument("--baseline-rev", metavar="REV", help="also run the hook scripts as of this git revision")
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression for --compare")
+    args = parser.parse_args()
+
+    if shutil.which("git") is None or shutil.which("curl") is None:
+        print("hook_bench needs git and curl on PATH", file=sys.stderr)
+        return 2
+
+    results = run(args)
+    summarize({key: value for key, value in results.items() if key in SCENARIOS})
+    document = {
+        "meta": {
+            "runs": 10 if args.quick else args.runs,
+            "baseline_rev": args.baseline_rev,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    text = json.dumps(document, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    status = 0
+    if results.get("startup", {}).get("extra_imports"):
+        print("hook_payload imports modules beyond json/os/re/time; keep them off the startup path", file=sys.stderr)
+        status = 1
+    if args.compare:
+        regressions = compare(document, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}", file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())